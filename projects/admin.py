@@ -1,14 +1,73 @@
+from django.conf import settings
 from django.contrib import admin, messages
+from django.contrib.admin import helpers
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth import get_user_model
 from django.shortcuts import render, redirect
+from django.template.response import TemplateResponse
 from django.urls import path
+from django.db.models import Q
+from django.utils import timezone
 from django.utils.html import format_html
-from .models import UserProfile, Project, Task
+from .forms import TaskReassignForm
+from .models import UserProfile, Project, Task, ArchivedProject, ArchivedTask, TaskEvent, TaskReminder
+from .pagination import EstimatedCountPaginator
+from . import archive, event_log, transitions
+
+
+# Performance mode for large changelists
+class PerformanceModeAdmin(admin.ModelAdmin):
+    """
+    وضع الأداء (ADMIN_PERFORMANCE_MODE) للجداول الكبيرة:
+    عدد تقديري بدل COUNT(*) للجدول كاملًا، وعدم حساب العدد الكلي بجانب نتائج الفلترة،
+    والبحث ببداية العبارة كاملة على أعمدة مفهرسة (indexed_search_fields) بدل icontains.
+    """
+    indexed_search_fields = ()
+
+    @property
+    def search_help_text(self):
+        if settings.ADMIN_PERFORMANCE_MODE and self.indexed_search_fields:
+            return "وضع الأداء: البحث عن القيم التي تبدأ بالعبارة كاملة (وليس أي كلمة في أي موضع)."
+        return None
+
+    @property
+    def show_full_result_count(self):
+        return not settings.ADMIN_PERFORMANCE_MODE
+
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        if settings.ADMIN_PERFORMANCE_MODE:
+            return EstimatedCountPaginator(queryset, per_page, orphans, allow_empty_first_page)
+        return super().get_paginator(request, queryset, per_page, orphans, allow_empty_first_page)
+
+    def get_search_results(self, request, queryset, search_term):
+        if not settings.ADMIN_PERFORMANCE_MODE or not self.indexed_search_fields:
+            return super().get_search_results(request, queryset, search_term)
+
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+
+        query = Q()
+        for lookup in self.indexed_search_fields:
+            query |= Q(**{lookup: search_term})
+        # البحث عبر علاقات ForeignKey فقط، فلا تتكرر الصفوف
+        return queryset.filter(query), False
+
+class TaskEventAdminMixin:
+    """ تغييرات الحالة عبر نماذج لوحة الإدارة تُنسب للمستخدم وتُكتب أحداثها معًا (event_log.py) """
+
+    def save_model(self, request, obj, form, change):
+        with event_log.acting_as(request.user), event_log.batch():
+            super().save_model(request, obj, form, change)
+
+    def save_related(self, request, form, formsets, change):
+        with event_log.acting_as(request.user), event_log.batch():
+            super().save_related(request, form, formsets, change)
 
 # UserProfile Admin
 class UserProfileAdmin(admin.ModelAdmin):
     list_display = ('user', 'whatsapp_number')
+    list_select_related = ('user',)
     search_fields = ('user__username', 'whatsapp_number')
 
 # Task Inline for Project Admin
@@ -19,23 +78,160 @@ class TaskInline(admin.TabularInline):
     readonly_fields = ('start_date', 'end_date')
 
 # Project Admin
-class ProjectAdmin(admin.ModelAdmin):
+class ProjectAdmin(TaskEventAdminMixin, PerformanceModeAdmin):
     list_display = ('title', 'status', 'created_by', 'created_at', 'current_task_display')
     search_fields = ('title', 'created_by__username')
+    indexed_search_fields = ('title__istartswith', 'created_by__username__istartswith')
     list_filter = ('status', 'created_at')
+    list_select_related = ('created_by',)
     inlines = [TaskInline]
-    
+    actions = ['complete_projects', 'hold_projects', 'archive_projects']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_current_task()
+
     def current_task_display(self, obj):
         task = obj.current_task()
         return format_html('<strong>{}</strong>', task) if task else "لا توجد مهام حالية"
     current_task_display.short_description = "المهمة الحالية"
+    current_task_display.admin_order_field = 'current_task_name'
+
+    @admin.action(description="إكمال جميع مهام المشاريع المحددة", permissions=['change'])
+    def complete_projects(self, request, queryset):
+        tasks = Task.objects.filter(project__in=queryset.values('pk'))
+        updated = transitions.bulk_set_status(tasks, 'مكتمل', request.user)
+        self.message_user(request, f"تم إكمال {updated} مهمة.", messages.SUCCESS)
+
+    @admin.action(description="تعليق المشاريع المحددة", permissions=['change'])
+    def hold_projects(self, request, queryset):
+        tasks = Task.objects.filter(project__in=queryset.values('pk'), status='قيد التنفيذ')
+        updated = transitions.bulk_set_status(tasks, 'معلق', request.user)
+        self.message_user(request, f"تم تعليق {updated} مهمة.", messages.WARNING)
+
+    @admin.action(description="أرشفة المشاريع المكتملة المحددة", permissions=['delete'])
+    def archive_projects(self, request, queryset):
+        # دون شرط العمر: نفس تاريخ الاكتمال الذي يحسبه الأمر archive_projects
+        completed_on = dict(
+            archive.archivable_projects(days=-1).filter(pk__in=queryset.values('pk')).values_list('pk', 'completed_on')
+        )
+        archived = archive.archive_batch(completed_on) if completed_on else 0
+        self.message_user(request, f"تمت أرشفة {archived} مشروع مكتمل.", messages.SUCCESS)
 
 # Task Admin
-class TaskAdmin(admin.ModelAdmin):
-    list_display = ('task_name', 'project', 'assigned_to', 'status', 'start_date', 'end_date')
+class TaskAdmin(TaskEventAdminMixin, PerformanceModeAdmin):
+    list_display = ('task_name', 'project', 'assigned_to', 'status', 'start_date', 'due_date', 'end_date')
     search_fields = ('task_name', 'project__title', 'assigned_to__username')
+    indexed_search_fields = (
+        'task_name__istartswith', 'project__title__istartswith', 'assigned_to__username__istartswith',
+    )
     list_filter = ('status', 'start_date', 'end_date')
+    list_select_related = ('project', 'assigned_to')
     ordering = ('-start_date',)
+    actions = ['mark_completed', 'mark_in_progress', 'mark_held', 'mark_not_started', 'reassign_tasks']
+
+    def _set_status(self, request, queryset, status):
+        updated = transitions.bulk_set_status(queryset, status, request.user)
+        self.message_user(request, f"تم تغيير حالة {updated} مهمة إلى «{status}».", messages.SUCCESS)
+
+    @admin.action(description="تغيير الحالة إلى: مكتمل", permissions=['change'])
+    def mark_completed(self, request, queryset):
+        self._set_status(request, queryset, 'مكتمل')
+
+    @admin.action(description="تغيير الحالة إلى: قيد التنفيذ", permissions=['change'])
+    def mark_in_progress(self, request, queryset):
+        self._set_status(request, queryset, 'قيد التنفيذ')
+
+    @admin.action(description="تغيير الحالة إلى: معلق", permissions=['change'])
+    def mark_held(self, request, queryset):
+        self._set_status(request, queryset, 'معلق')
+
+    @admin.action(description="تغيير الحالة إلى: لم يبدأ بعد", permissions=['change'])
+    def mark_not_started(self, request, queryset):
+        self._set_status(request, queryset, 'لم يبدأ بعد')
+
+    @admin.action(description="إسناد المهام المحددة لمستخدم آخر", permissions=['change'])
+    def reassign_tasks(self, request, queryset):
+        form = TaskReassignForm(request.POST if 'apply' in request.POST else None)
+        if form.is_valid():
+            updated = transitions.bulk_reassign(queryset, form.cleaned_data['assigned_to'])
+            self.message_user(request, f"تم إسناد {updated} مهمة إلى {form.cleaned_data['assigned_to']}.", messages.SUCCESS)
+            return None
+
+        # صفحة وسيطة لاختيار المسؤول، تعيد إرسال نفس التحديد (أو select_across) عند التأكيد
+        return TemplateResponse(request, 'admin/projects/task/reassign.html', {
+            **self.admin_site.each_context(request),
+            'title': "إسناد المهام",
+            'opts': self.model._meta,
+            'form': form,
+            'count': queryset.count(),
+            'selected': request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+            'select_across': request.POST.get('select_across', '0'),
+            'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+        })
+
+# Archive Admin (قراءة فقط مع الاستعادة)
+class ArchivedTaskInline(admin.TabularInline):
+    model = ArchivedTask
+    extra = 0
+    can_delete = False
+    fields = ('task_name', 'assigned_to', 'status', 'start_date', 'end_date')
+    readonly_fields = fields
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+class ArchivedProjectAdmin(PerformanceModeAdmin):
+    list_display = ('title', 'created_by', 'created_at', 'completed_on', 'archived_at')
+    search_fields = ('title', 'created_by__username')
+    indexed_search_fields = ('title__istartswith', 'created_by__username__istartswith')
+    list_filter = ('completed_on',)
+    list_select_related = ('created_by',)
+    readonly_fields = ('title', 'description', 'status', 'created_by', 'created_at', 'completed_on', 'archived_at')
+    inlines = [ArchivedTaskInline]
+    actions = ['restore_projects']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.action(description="استعادة المشاريع المحددة إلى المشاريع النشطة", permissions=['delete'])
+    def restore_projects(self, request, queryset):
+        restored = archive.restore_projects(list(queryset.values_list('pk', flat=True)))
+        self.message_user(request, f"تمت استعادة {restored} مشروع.", messages.SUCCESS)
+
+# سجل الانتقالات (قراءة فقط)
+class TaskEventAdmin(PerformanceModeAdmin):
+    list_display = ('occurred_at', 'task_id', 'project_id', 'task_name', 'old_status', 'new_status', 'assignee', 'actor')
+    list_filter = ('new_status', 'task_name')
+    list_select_related = ('assignee', 'actor')
+    date_hierarchy = 'occurred_at'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+# تذكيرات المهام المتأخرة (يضيفها الأمر scan_overdue)
+class TaskReminderAdmin(PerformanceModeAdmin):
+    list_display = ('task', 'user', 'due_date', 'created_at', 'sent_at')
+    list_filter = (('sent_at', admin.EmptyFieldListFilter), 'due_date')
+    list_select_related = ('task__project', 'user')
+    raw_id_fields = ('task', 'user')
+    actions = ['mark_sent']
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.action(description="تعليم التذكيرات المحددة كمُرسلة", permissions=['change'])
+    def mark_sent(self, request, queryset):
+        updated = queryset.filter(sent_at__isnull=True).update(sent_at=timezone.now())
+        self.message_user(request, f"تم تعليم {updated} تذكير كمُرسل.", messages.SUCCESS)
 
 def create_superuser_view(request):
     if request.method == "POST":
@@ -63,6 +259,9 @@ def create_superuser_view(request):
 admin.site.register(UserProfile, UserProfileAdmin)
 admin.site.register(Project, ProjectAdmin)
 admin.site.register(Task, TaskAdmin)
+admin.site.register(ArchivedProject, ArchivedProjectAdmin)
+admin.site.register(TaskEvent, TaskEventAdmin)
+admin.site.register(TaskReminder, TaskReminderAdmin)
 
 # Admin Site Customization
 admin.site.site_header = "لوحة تحكم المشاريع"
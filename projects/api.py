@@ -0,0 +1,151 @@
+"""
+واجهة JSON للقراءة فقط: المشاريع والمهام ومهامي.
+
+- ?fields=id,title لاختيار الحقول (الافتراضي كلها)
+- ?cursor=... و ?limit=... للترقيم بالمؤشر (pagination.CursorPaginator)
+- ?status=... وللمهام ?project=<id> للتصفية
+السلسلة عبر values() مباشرة دون إنشاء كائنات النماذج، والردود مضغوطة (gzip)
+وتدعم الطلبات الشرطية بنفس طوابع الإصدار التي تستخدمها الصفحات (versioning.py).
+"""
+import functools
+
+from django.http import JsonResponse
+from django.views.decorators.gzip import gzip_page
+from django.views.decorators.http import require_GET
+
+from . import versioning
+from .models import Project, Task
+from .pagination import CursorPaginator
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+# اسم الحقل في الرد → المسار في values()
+PROJECT_FIELDS = {
+    'id': 'id',
+    'title': 'title',
+    'description': 'description',
+    'status': 'status',
+    'created_by': 'created_by__username',
+    'created_at': 'created_at',
+    'current_task': 'current_task_name',
+}
+
+TASK_FIELDS = {
+    'id': 'id',
+    'task_name': 'task_name',
+    'status': 'status',
+    'start_date': 'start_date',
+    'end_date': 'end_date',
+    'project_id': 'project_id',
+    'project': 'project__title',
+    'assigned_to': 'assigned_to__username',
+}
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def api_view(func):
+    """ GET فقط، تسجيل الدخول مطلوب (401 بدل التحويل لصفحة الدخول)، وأخطاء الطلب بصيغة JSON """
+    @gzip_page
+    @require_GET
+    @functools.wraps(func)
+    def wrapper(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return JsonResponse({'error': 'authentication required'}, status=401)
+        try:
+            return func(request, *args, **kwargs)
+        except ApiError as e:
+            return JsonResponse({'error': str(e)}, status=e.status)
+    return wrapper
+
+
+def _selected_fields(request, available):
+    fields = request.GET.get('fields')
+    if not fields:
+        return list(available)
+    selected = [name.strip() for name in fields.split(',') if name.strip()]
+    unknown = set(selected) - set(available)
+    if unknown:
+        raise ApiError(f"unknown fields: {', '.join(sorted(unknown))}")
+    return selected
+
+
+def _limit(request):
+    try:
+        limit = int(request.GET.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        raise ApiError("limit must be an integer")
+    return max(1, min(limit, MAX_LIMIT))
+
+
+def _paginated_response(request, queryset, available):
+    """ صفحة من values() بالحقول المطلوبة فقط، مع رابط الصفحة التالية """
+    fields = _selected_fields(request, available)
+    paths = {available[name] for name in fields} | {'id'}  # id مفتاح المؤشر دائمًا
+    paginator = CursorPaginator(queryset.values(*paths), _limit(request))
+    try:
+        rows, next_cursor = paginator.page(request.GET.get('cursor'))
+    except ValueError:
+        raise ApiError("invalid cursor")
+
+    next_url = None
+    if next_cursor:
+        params = request.GET.copy()
+        params['cursor'] = next_cursor
+        next_url = request.build_absolute_uri(f'{request.path}?{params.urlencode()}')
+
+    return JsonResponse(
+        {
+            'results': [{name: row[available[name]] for name in fields} for row in rows],
+            'next': next_url,
+        },
+        json_dumps_params={'ensure_ascii': False},
+    )
+
+
+def _filter_tasks(request, queryset):
+    status = request.GET.get('status')
+    if status:
+        queryset = queryset.filter(status=status)
+    project = request.GET.get('project')
+    if project:
+        if not project.isdigit():
+            raise ApiError("project must be an id")
+        queryset = queryset.filter(project_id=project)
+    return queryset
+
+
+@api_view
+def project_list(request):
+    def render():
+        queryset = Project.objects.all()
+        if request.GET.get('status'):
+            queryset = queryset.filter(status=request.GET['status'])
+        if 'current_task' in _selected_fields(request, PROJECT_FIELDS):
+            queryset = queryset.with_current_task()
+        return _paginated_response(request, queryset, PROJECT_FIELDS)
+
+    return versioning.conditional_response(request, [versioning.PROJECTS_SCOPE], render)
+
+
+@api_view
+def task_list(request):
+    def render():
+        return _paginated_response(request, _filter_tasks(request, Task.objects.all()), TASK_FIELDS)
+
+    # كل تغيير في مهمة يغير طابع قائمة المشاريع أيضًا
+    return versioning.conditional_response(request, [versioning.PROJECTS_SCOPE], render)
+
+
+@api_view
+def my_task_list(request):
+    def render():
+        queryset = _filter_tasks(request, Task.objects.filter(assigned_to=request.user))
+        return _paginated_response(request, queryset, TASK_FIELDS)
+
+    return versioning.conditional_response(request, [versioning.user_scope(request.user.pk)], render)
@@ -0,0 +1,130 @@
+"""
+أرشفة المشاريع المكتملة منذ أكثر من ARCHIVE_AFTER_DAYS يومًا.
+
+تُنقل المشاريع ومهامها على دفعات إلى ArchivedProject و ArchivedTask (بنفس المعرفات)
+وتُحذف من الجداول النشطة، فيتناسب حجم Project و Task (ومعه عدّ لوحة التحكم والقوائم
+والتصدير) مع العمل الجاري لا مع التاريخ كله. الأرشيف يُعرض للقراءة فقط، ويمكن
+استعادة أي مشروع إلى الجداول النشطة بنفس معرفه.
+
+تاريخ اكتمال المشروع هو آخر تاريخ انتهاء لمهامه (أو تاريخ إنشائه إذا لم يُسجل أي
+تاريخ انتهاء). المشروع المستعاد يُؤرشف مجددًا في التشغيل التالي إذا بقي مكتملًا.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models import Max
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from . import cycle_times, search, versioning
+from .models import ArchivedProject, ArchivedTask, Project, SearchEntry, Task, TaskReminder, VersionStamp
+
+
+def archivable_projects(days=None):
+    days = settings.ARCHIVE_AFTER_DAYS if days is None else days
+    cutoff = timezone.localdate() - timedelta(days=days)
+    return (
+        Project.objects.filter(status='مكتمل')
+        .annotate(completed_on=Coalesce(Max('tasks__end_date'), TruncDate('created_at')))
+        .filter(completed_on__lt=cutoff)
+    )
+
+
+def _raw_delete(queryset):
+    # حذف مباشر دون جلب الصفوف ولا إرسال إشارة لكل صف (تُحدَّث الطوابع والفهرس دفعة واحدة)
+    return queryset._raw_delete(router.db_for_write(queryset.model))
+
+
+def archive_batch(completed_on):
+    """ {معرف المشروع: تاريخ الاكتمال} → عدد المشاريع المؤرشفة """
+    with transaction.atomic():
+        # إعادة التحقق من الحالة بعد القفل: قد يُعاد فتح المشروع بين الاختيار والنقل
+        projects = list(Project.objects.select_for_update().filter(pk__in=completed_on, status='مكتمل'))
+        project_ids = [project.pk for project in projects]
+        if not project_ids:
+            return 0
+        tasks = Task.objects.filter(project_id__in=project_ids)
+
+        ArchivedProject.objects.bulk_create([
+            ArchivedProject(
+                id=project.pk, title=project.title, description=project.description, status=project.status,
+                created_by_id=project.created_by_id, created_at=project.created_at,
+                completed_on=completed_on[project.pk],
+            )
+            for project in projects
+        ])
+        ArchivedTask.objects.bulk_create([
+            ArchivedTask(
+                id=task.pk, project_id=task.project_id, task_name=task.task_name,
+                assigned_to_id=task.assigned_to_id, status=task.status,
+                start_date=task.start_date, end_date=task.end_date,
+            )
+            for task in tasks
+        ])
+
+        versioning.bump_projects(project_ids)  # قبل حذف المهام لمعرفة مسؤوليها
+        SearchEntry.objects.filter(project_id__in=project_ids).delete()
+        TaskReminder.objects.filter(task__project_id__in=project_ids).delete()
+        VersionStamp.objects.filter(scope__in=[versioning.project_scope(pk) for pk in project_ids]).delete()
+        _raw_delete(tasks)
+        _raw_delete(Project.objects.filter(pk__in=project_ids))
+        cycle_times.invalidate()
+    return len(project_ids)
+
+
+def archive_projects(days=None, batch_size=500, dry_run=False):
+    """ أرشفة كل المشاريع المستحقة على دفعات (معاملة لكل دفعة) وإرجاع عددها """
+    queryset = archivable_projects(days).order_by('pk')
+    if dry_run:
+        return queryset.count()
+
+    archived = 0
+    last_pk = 0
+    while True:
+        completed_on = dict(
+            queryset.filter(pk__gt=last_pk).values_list('pk', 'completed_on')[:batch_size]
+        )
+        if not completed_on:
+            return archived
+        archived += archive_batch(completed_on)
+        last_pk = max(completed_on)
+
+
+def restore_projects(project_ids):
+    """ إعادة مشاريع مؤرشفة إلى الجداول النشطة بنفس معرفاتها """
+    with transaction.atomic():
+        archived = list(
+            ArchivedProject.objects.select_for_update().filter(pk__in=project_ids).prefetch_related('tasks')
+        )
+        project_ids = [project.pk for project in archived]
+        if not project_ids:
+            return 0
+
+        projects = Project.objects.bulk_create([
+            Project(
+                id=project.pk, title=project.title, description=project.description, status=project.status,
+                created_by_id=project.created_by_id, created_at=project.created_at,
+            )
+            for project in archived
+        ])
+        # auto_now_add يستبدل created_at عند الإدراج؛ bulk_update يكتب القيمة الأصلية كما هي
+        for project, original in zip(projects, archived):
+            project.created_at = original.created_at
+        Project.objects.bulk_update(projects, ['created_at'])
+        Task.objects.bulk_create([
+            Task(
+                id=task.pk, project_id=project.pk, task_name=task.task_name,
+                assigned_to_id=task.assigned_to_id, status=task.status,
+                start_date=task.start_date, end_date=task.end_date,
+                due_date=Task.sla_due_date(task.task_name, task.start_date),
+            )
+            for project in archived
+            for task in project.tasks.all()
+        ])
+        ArchivedProject.objects.filter(pk__in=project_ids).delete()
+
+        search.index_projects(project_ids)
+        versioning.bump_projects(project_ids)
+        cycle_times.invalidate()
+    return len(project_ids)
@@ -0,0 +1,16 @@
+from django.urls import path
+
+from . import async_views
+from .urls import urlpatterns as sync_urlpatterns
+
+# نفس الروابط والأسماء، مع استبدال صفحات القراءة الأكثر طلبًا بنسخها غير المتزامنة
+ASYNC_VIEWS = {
+    'index': async_views.index,
+    'task_list': async_views.task_list,
+    'project_detail': async_views.project_detail,
+}
+
+urlpatterns = [
+    path(str(pattern.pattern), ASYNC_VIEWS[pattern.name], name=pattern.name) if pattern.name in ASYNC_VIEWS else pattern
+    for pattern in sync_urlpatterns
+]
@@ -0,0 +1,98 @@
+"""
+نسخ غير متزامنة من صفحات القراءة الأكثر طلبًا، تُخدم عبر ASGI فقط (asgi_urls.py):
+لوحة التحكم، وقائمة المهام (GET)، وتفاصيل المشروع.
+
+أثناء انتظار قاعدة البيانات لا يُحجز خيط عامل كامل كما في WSGI، واستعلامات لوحة
+التحكم المستقلة تُنفذ بالتوازي. عرض القوالب يبقى متزامنًا (في خيط منفصل) لأن بعض
+القيم تُقرأ منها بشكل كسول (مثل user.profile).
+النسخ المتزامنة في views.py تبقى كما هي لخادم WSGI، وتشترك مع هذه في الاستعلامات.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.views import redirect_to_login
+from django.db import connections
+from django.http import Http404
+from django.shortcuts import render
+
+from . import events, versioning, views
+
+arender = sync_to_async(render)
+
+
+async def gather_queries(queries):
+    """
+    تنفيذ دوال استعلام مستقلة ({الاسم: دالة}) وإرجاع {الاسم: النتيجة}.
+
+    دوال ORM غير المتزامنة في Django تنفذ استعلامات الطلب الواحد بالتتابع على خيط واحد،
+    لذلك مع ASYNC_PARALLEL_QUERIES تُنفذ كل دالة في خيط من مجمع الخيوط باتصاله الخاص،
+    ويعود الاتصال لمجمع الاتصالات (DB_POOL) بعدها حتى لا تحجز الخيوط الخاملة اتصالات. على SQLite لا فائدة من ذلك (الكتابة والقراءة على نفس الملف) فتُنفذ بالتتابع.
+    """
+    if not settings.ASYNC_PARALLEL_QUERIES:
+        run = sync_to_async(lambda: {name: query() for name, query in queries.items()})
+        return await run()
+
+    def in_worker_thread(query):
+        try:
+            return query()
+        finally:
+            connections.close_all()  # اتصالات هذا الخيط فقط
+
+    results = await asyncio.gather(*(
+        sync_to_async(in_worker_thread, thread_sensitive=False)(query) for query in queries.values()
+    ))
+    return dict(zip(queries, results))
+
+
+async def _authenticated_user(request):
+    user = await request.auser()
+    request.user = user  # القوالب ومعالجات السياق تقرأ request.user بشكل متزامن
+    return user
+
+
+async def index(request):
+    user = await _authenticated_user(request)
+    if not user.is_authenticated:
+        return redirect_to_login(request.get_full_path())
+
+    results = await gather_queries(views.dashboard_queries(user))
+    context = views.dashboard_context(results)
+    context['user'] = user
+    return await arender(request, 'index.html', context)
+
+
+async def task_list(request):
+    if request.method != 'GET':
+        # تنفيذ الانتقالات متزامن (معاملة وأقفال)
+        return await sync_to_async(views.TaskListView.as_view())(request)
+
+    user = await _authenticated_user(request)
+    if not user.is_authenticated:
+        return redirect_to_login(request.get_full_path())
+
+    async def render_page():
+        view = views.TaskListView(request=request, args=(), kwargs={})
+        tasks = [task async for task in view.get_queryset()]
+        return await arender(request, 'tasks/list.html', {
+            'tasks': tasks,
+            'object_list': tasks,
+            'filter_form': view.filter_form,
+            'grouped_tasks': views.group_tasks(tasks),
+            'live_updates': events.supports_streaming(request),
+        })
+
+    return await versioning.aconditional_response(request, [versioning.user_scope(user.pk)], render_page)
+
+
+async def project_detail(request, pk):
+    user = await _authenticated_user(request)
+
+    async def render_page():
+        project = await views.ProjectDetailView.queryset.filter(pk=pk).afirst()
+        if project is None:
+            raise Http404("No project found matching the query")
+        return await arender(request, 'projects/detail.html', {'project': project, 'object': project})
+
+    scopes = [versioning.user_scope(user.pk), versioning.project_scope(pk)]
+    return await versioning.aconditional_response(request, scopes, render_page)
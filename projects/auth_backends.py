@@ -0,0 +1,41 @@
+"""
+كاش المستخدم وصلاحياته بين الطلبات.
+
+ModelBackend يحمّل المستخدم من قاعدة البيانات في كل طلب، ثم تستعلم
+PermissionRequiredMixin والقائمة الجانبية عن صلاحياته ومجموعاته. هنا يُحفظ كائن
+المستخدم في الكاش مع ملفه الشخصي (profile) وصلاحياته المحسوبة (_perm_cache)،
+فلا تحتاج الصفحات في الحالة المستقرة أي استعلام للمصادقة.
+
+يُلغى الكاش عند تغيير المستخدم أو ملفه أو مجموعاته أو صلاحياته أو صلاحيات
+مجموعاته (signals.py)، وإلا ينتهي بعد AUTH_CACHE_TIMEOUT ثانية.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+
+def user_cache_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def invalidate_users(user_ids):
+    cache.delete_many([user_cache_key(pk) for pk in set(user_ids) - {None}])
+
+
+class CachedModelBackend(ModelBackend):
+    def get_user(self, user_id):
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            UserModel = get_user_model()
+            user = UserModel._default_manager.select_related('profile').filter(pk=user_id).first()
+            if user is None:
+                return None
+            self.get_all_permissions(user)  # يملأ _perm_cache فيُحفظ مع الكائن
+            cache.set(key, user, settings.AUTH_CACHE_TIMEOUT)
+        return user if self.user_can_authenticate(user) else None
+
+    async def aget_user(self, user_id):
+        return await sync_to_async(self.get_user)(user_id)
@@ -0,0 +1,418 @@
+"""
+أدوات قياس أداء الواجهات عبر عميل الاختبار (Test Client).
+
+كل سيناريو يُنفذ عدة مرات لقياس زمن الاستجابة (p50/p90/p99)، ثم مرة إضافية
+لقياس عدد الاستعلامات وذروة الذاكرة. تُحفظ النتائج في ملف JSON يُستخدم
+كخط أساس لاكتشاف التراجع في الأداء لاحقًا.
+
+سيناريوهات الكتابة (إكمال المهام والاستيراد) تُنفذ داخل معاملة يُتراجع عنها في
+النهاية، فلا يغير القياس بيانات قاعدة البيانات المستخدمة.
+"""
+import asyncio
+import io
+import json
+import math
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from datetime import timedelta
+
+from asgiref.sync import ThreadSensitiveContext
+from django.contrib.auth.models import User
+from django.core import serializers
+from django.db import connection, connections, transaction
+from django.db.models import Count
+from django.template import engines
+from django.test import AsyncClient, Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from . import cycle_times, data_export
+from .fragments import fragment_stats
+from .models import Project, Task
+from .views import SECRET_KEY
+
+# الفروق المسموح بها قبل اعتبار النتيجة تراجعًا
+DEFAULT_TOLERANCE = 0.25
+
+
+class Scenario:
+    """ طلب واحد يُقاس: الطريقة والرابط والبيانات (يمكن أن تكون دوال تُستدعى قبل كل طلب) """
+
+    def __init__(self, name, url, method='get', data=None):
+        self.name = name
+        self.url = url
+        self.method = method
+        self.data = data
+
+    @property
+    def writes(self):
+        return self.method not in ('get', 'head')
+
+    def request(self, client):
+        data = self.data() if callable(self.data) else self.data
+        if data is False:
+            return None  # لا توجد بيانات صالحة لهذا التكرار (مثل نفاد المهام قيد التنفيذ)
+        url = self.url() if callable(self.url) else self.url
+        return getattr(client, self.method)(url, data or {})
+
+
+def percentile(values, pct):
+    """ حساب المئين بطريقة nearest-rank """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)) - 1, 0)
+    return ordered[rank]
+
+
+@contextmanager
+def rolled_back():
+    """ تنفيذ الكتابات داخل معاملة يُتراجع عنها عند الخروج """
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def get_benchmark_user():
+    """ المدير الذي لديه أكبر عدد من المهام (ينشئه seed_data --admin كأول مستخدم) """
+    return (
+        User.objects.filter(is_superuser=True)
+        .annotate(task_count=Count('task'))
+        .order_by('-task_count', 'pk')
+        .first()
+    )
+
+
+def build_view_scenarios(user):
+    """ سيناريوهات الواجهات الأكثر استخدامًا """
+    project = Project.objects.filter(tasks__isnull=False).order_by('pk').first()
+    project_pk = project.pk if project else 0
+
+    def next_task_action():
+        task_id = (
+            Task.objects.filter(assigned_to=user, status='قيد التنفيذ')
+            .order_by('pk').values_list('pk', flat=True).first()
+        )
+        if task_id is None:
+            return False
+        return {'task_id': task_id, 'action': 'complete'}
+
+    def import_payload():
+        projects = list(Project.objects.order_by('pk')[:20])
+        tasks = Task.objects.filter(project__in=projects)
+        data = {
+            'projects.project': json.loads(serializers.serialize('json', projects)),
+            'projects.task': json.loads(serializers.serialize('json', tasks)),
+        }
+        upload = io.BytesIO(json.dumps(data, ensure_ascii=False).encode())
+        upload.name = 'backup.json'
+        return {'file': upload}
+
+    key = f'?key={SECRET_KEY}'
+    return [
+        Scenario('index', reverse('index')),
+        Scenario('project_list', reverse('project_list')),
+        Scenario('project_detail', reverse('project_detail', args=[project_pk])),
+        Scenario('project_update', reverse('project_update', args=[project_pk])),
+        Scenario('task_list', reverse('task_list')),
+        Scenario('task_complete', reverse('task_list'), method='post', data=next_task_action),
+        Scenario('export', reverse('export_all_data') + key),
+        Scenario('import', reverse('import_all_data') + key, method='post', data=import_payload),
+    ]
+
+
+def measure(client, scenario, iterations):
+    """ قياس سيناريو واحد وإرجاع ملخص النتائج """
+    timings = []
+    fragment_stats.reset()
+    for _ in range(iterations):
+        start = time.perf_counter()
+        response = scenario.request(client)
+        elapsed = time.perf_counter() - start
+        if response is not None:
+            timings.append(elapsed * 1000)
+
+    # تشغيل إضافي لقياس الاستعلامات والذاكرة حتى لا يؤثر التتبع على الأزمنة
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            response = scenario.request(client)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'iterations': len(timings),
+        'status_code': response.status_code if response is not None else None,
+        'p50_ms': percentile(timings, 50),
+        'p90_ms': percentile(timings, 90),
+        'p99_ms': percentile(timings, 99),
+        'mean_ms': sum(timings) / len(timings) if timings else None,
+        'queries': len(queries) if response is not None else None,
+        'peak_memory_kb': round(peak / 1024, 1),
+        # إصابات كاش أجزاء القوالب خلال التكرارات (الأولى فقط تعرض كل البطاقات)
+        'fragment_hits': fragment_stats.hits,
+        'fragment_misses': fragment_stats.misses,
+    }
+
+
+def run_view_benchmarks(user=None, iterations=20, only=None):
+    """ تشغيل جميع سيناريوهات الواجهات وإرجاع النتائج مرتبة بالاسم """
+    user = user or get_benchmark_user()
+    if user is None:
+        raise ValueError("لا يوجد مستخدم مدير لتشغيل القياس، شغّل seed_data --admin أولًا")
+
+    client = Client()
+    client.force_login(user)
+
+    results = {}
+    for scenario in build_view_scenarios(user):
+        if only and scenario.name not in only:
+            continue
+        with rolled_back() if scenario.writes else nullcontext():
+            results[scenario.name] = measure(client, scenario, iterations)
+    return results
+
+
+def measure_callable(func, iterations):
+    """ قياس دالة مباشرة (دون طلب HTTP) بنفس مقاييس measure """
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'iterations': len(timings),
+        'p50_ms': percentile(timings, 50),
+        'p90_ms': percentile(timings, 90),
+        'p99_ms': percentile(timings, 99),
+        'mean_ms': sum(timings) / len(timings) if timings else None,
+        'queries': len(queries),
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+
+
+def run_cycle_time_benchmarks(iterations=20, days=90):
+    """
+    محرك زمن الدورة (cycle_times.py) على البيانات الحالية؛ للقياس على مليون مهمة:
+    seed_data --projects 170000 --tasks-per-project 6.
+    cold يحسب من قاعدة البيانات في كل تكرار، و warm يقرأ النتيجة من الكاش.
+    """
+    if not Task.objects.exists():
+        raise ValueError("لا توجد مهام للقياس، شغّل seed_data أولًا")
+
+    cycle_times.cycle_time_stats(days)  # تعبئة الكاش قبل قياس warm
+    results = {
+        'cycle_times_cold': measure_callable(lambda: cycle_times.compute(days), iterations),
+        'cycle_times_warm': measure_callable(lambda: cycle_times.cycle_time_stats(days), iterations),
+    }
+    results['cycle_times_cold'].update({
+        'tasks': Task.objects.count(),
+        'histogram_rows': len(cycle_times.histogram_rows(timezone.localdate() - timedelta(days=days))),
+    })
+    return results
+
+
+# شارة الحالة لكل صف كما كانت في القوالب قبل مكتبة status_badges، ومقابلها بالفلتر
+BADGE_IF_CHAIN = """{% for row in rows %}<span class="badge
+    {% if row.status == 'قيد التنفيذ' %} bg-warning text-dark
+    {% elif row.status == 'مكتمل' %} bg-success
+    {% elif row.status == 'معلق' %} bg-danger
+    {% else %} bg-secondary {% endif %}">{{ row.status }}</span>{% endfor %}"""
+BADGE_FILTER = """{% load status_badges %}{% for row in rows %}{{ row.status|status_badge }}{% endfor %}"""
+
+
+def run_template_benchmarks(iterations=20, rows=5000, template_name='tasks/list.html'):
+    """
+    عرض شارات الحالة في قائمة من rows صفًا: سلسلة if/elif مقابل الفلتر المحسوب مسبقًا
+    (per_row_us زمن الصف الواحد من p50)، وتحميل template_name بكاش المُحمِّل ودونه.
+    """
+    engine = engines['django']
+    statuses = [status for status, _ in Task.STATUS_CHOICES]
+    context = {'rows': [{'status': statuses[i % len(statuses)]} for i in range(rows)]}
+
+    results = {}
+    for name, source in (('badges_if_chain', BADGE_IF_CHAIN), ('badges_filter', BADGE_FILTER)):
+        template = engine.from_string(source)
+        results[name] = measure_callable(lambda: template.render(context), iterations)
+        results[name].update({'rows': rows, 'per_row_us': round(results[name]['p50_ms'] * 1000 / rows, 3)})
+    results['badges_filter']['saved_per_row_us'] = round(
+        results['badges_if_chain']['per_row_us'] - results['badges_filter']['per_row_us'], 3,
+    )
+
+    [loader] = engine.engine.template_loaders
+
+    def load_uncached():
+        loader.reset()
+        engine.get_template(template_name)
+
+    results['template_load_uncached'] = measure_callable(load_uncached, iterations)
+    results['template_load_cached'] = measure_callable(lambda: engine.get_template(template_name), iterations)
+    return results
+
+
+def run_export_benchmarks(workers=(1, 2, 4), executor='process', iterations=3):
+    """
+    التصدير الكامل دون أجزاء الكاش بعدد عمال مختلف؛ speedup نسبة p50 لعامل واحد إلى p50
+    لكل عدد (لا يتجاوز عدد المعالجات cpu_count). شغّل seed_data أولًا.
+    """
+    if not Task.objects.exists():
+        raise ValueError("لا توجد مهام للقياس، شغّل seed_data أولًا")
+
+    results = {}
+    for count in sorted(set(workers) | {1}):
+        name = f'export_{executor}_{count}'
+        results[name] = measure_callable(
+            lambda: data_export.export_json(workers=count, executor=executor, use_cache=False), iterations,
+        )
+    single = results[f'export_{executor}_1']['p50_ms']
+    for result in results.values():
+        result.update({'speedup': round(single / result['p50_ms'], 2), 'cpu_count': os.cpu_count()})
+    results[f'export_{executor}_1']['tasks'] = Task.objects.count()
+    return results
+
+
+def concurrency_urls(user):
+    """ الصفحات التي لها نسخ غير متزامنة (async_views) """
+    project = Project.objects.filter(tasks__isnull=False).order_by('pk').first()
+    return [reverse('index'), reverse('task_list'), reverse('project_detail', args=[project.pk if project else 0])]
+
+
+def _summary(timings, statuses, elapsed):
+    return {
+        'requests': len(timings),
+        'elapsed_s': round(elapsed, 3),
+        'throughput_rps': round(len(timings) / elapsed, 1) if elapsed else None,
+        'p50_ms': percentile(timings, 50),
+        'p90_ms': percentile(timings, 90),
+        'p99_ms': percentile(timings, 99),
+        'statuses': {str(code): statuses.count(code) for code in sorted(set(statuses))},
+    }
+
+
+def run_wsgi_concurrency(client, urls, concurrency, requests, worker_threads):
+    """
+    عدد concurrency من العملاء يرسلون الطلبات في نفس الوقت إلى worker_threads عامل متزامن
+    (مثل gunicorn بعمال sync): كل طلب يحجز عاملًا طوال انتظاره لقاعدة البيانات،
+    والزمن المقاس يشمل انتظار عامل متاح.
+    """
+    workers = threading.Semaphore(worker_threads)
+    jobs = iter(range(requests))
+    jobs_lock, results_lock = threading.Lock(), threading.Lock()
+    timings, statuses = [], []
+
+    def run_client():
+        thread_client = Client()
+        thread_client.cookies = client.cookies
+        try:
+            while True:
+                with jobs_lock:
+                    job = next(jobs, None)
+                if job is None:
+                    return
+                started = time.perf_counter()
+                with workers:
+                    response = thread_client.get(urls[job % len(urls)])
+                with results_lock:
+                    timings.append((time.perf_counter() - started) * 1000)
+                    statuses.append(response.status_code)
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=run_client) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return _summary(timings, statuses, time.perf_counter() - started)
+
+
+def run_asgi_concurrency(client, urls, concurrency, requests):
+    """ نفس الحمل عبر معالج ASGI وروابط asgi_urls (الصفحات غير المتزامنة) في حلقة أحداث واحدة """
+    async def run():
+        async_client = AsyncClient()
+        async_client.cookies = client.cookies
+        jobs = iter(range(requests))
+        timings, statuses = [], []
+
+        async def run_client():
+            for job in jobs:
+                started = time.perf_counter()
+                # كما يفعل ASGIHandler لكل طلب: الأجزاء المتزامنة للطلب في خيطها الخاص
+                async with ThreadSensitiveContext():
+                    response = await async_client.get(urls[job % len(urls)])
+                timings.append((time.perf_counter() - started) * 1000)
+                statuses.append(response.status_code)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(run_client() for _ in range(concurrency)))
+        return _summary(timings, statuses, time.perf_counter() - started)
+
+    with override_settings(ROOT_URLCONF='tasks_manager.asgi_urls'):
+        return asyncio.run(run())
+
+
+def run_concurrency_benchmarks(user=None, concurrency=20, requests=200, worker_threads=4):
+    """ مقارنة إنتاجية الطلبات المتزامنة بين مسار WSGI ومسار ASGI لنفس الصفحات """
+    user = user or get_benchmark_user()
+    if user is None:
+        raise ValueError("لا يوجد مستخدم مدير لتشغيل القياس، شغّل seed_data --admin أولًا")
+
+    client = Client()
+    client.force_login(user)
+    urls = concurrency_urls(user)
+    results = {
+        'wsgi': run_wsgi_concurrency(client, urls, concurrency, requests, worker_threads),
+        'asgi': run_asgi_concurrency(client, urls, concurrency, requests),
+    }
+    for result in results.values():
+        result.update(concurrency=concurrency, urls=urls)
+    results['wsgi']['worker_threads'] = worker_threads
+    return results
+
+
+def load_baseline(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_baseline(path, results):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=4, ensure_ascii=False, sort_keys=True)
+
+
+def compare_with_baseline(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    مقارنة النتائج بخط الأساس وإرجاع قائمة التراجعات.
+    الزمن والذاكرة يُقارنان بنسبة تسامح، أما عدد الاستعلامات فيجب ألا يزيد أبدًا.
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+
+        for metric in ('p50_ms', 'p90_ms', 'peak_memory_kb'):
+            old, new = previous.get(metric), current.get(metric)
+            if old and new and new > old * (1 + tolerance):
+                regressions.append(f"{name}: {metric} {old:.1f} → {new:.1f}")
+
+        old, new = previous.get('queries'), current.get('queries')
+        if old is not None and new is not None and new > old:
+            regressions.append(f"{name}: queries {old} → {new}")
+
+    return regressions
@@ -0,0 +1,117 @@
+"""
+زمن دورة المهام (من start_date إلى end_date بالأيام) لكل مرحلة ولكل مسؤول.
+
+لا تُحمَّل المهام ككائنات: قاعدة البيانات تجمع المهام المكتملة خلال الفترة في
+مدرج تكراري (المرحلة، المسؤول، عدد الأيام ← عدد المهام) باستعلام واحد بفهرس
+(status, end_date)، فعدد الصفوف المنقولة بعدد المراحل × المسؤولين × قيم المدة
+المختلفة لا بعدد المهام. المئينات (nearest-rank كما في benchmarks.percentile)
+والمتوسط والإنتاجية تُحسب من المدرج مباشرة.
+
+النتيجة في الكاش حتى يصل حدث اكتمال جديد (أو إعادة فتح مهمة مكتملة) في TaskEvent،
+أو يتغير اليوم (تنزاح الفترة). الكتابات التي لا تسجل أحداثًا (الأرشفة والاستعادة
+والاستيراد الخام) تستدعي invalidate.
+"""
+import math
+import uuid
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Q
+from django.utils import timezone
+
+from .models import Task, TaskEvent
+
+PERCENTILES = (50, 90, 99)
+CACHE_TIMEOUT = 60 * 60 * 24
+GENERATION_KEY = 'cycle_times:generation'
+
+
+def histogram_rows(since):
+    """ (المرحلة، معرف المسؤول، اسمه، المدة، العدد) للمهام المكتملة منذ since """
+    cycle = ExpressionWrapper(F('end_date') - F('start_date'), output_field=DurationField())
+    return (
+        Task.objects.filter(status='مكتمل', end_date__gte=since, start_date__lte=F('end_date'))
+        .annotate(cycle=cycle)
+        .values_list('task_name', 'assigned_to_id', 'assigned_to__username', 'cycle')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+
+
+def summarize(histogram, weeks):
+    """ histogram: {عدد الأيام: عدد المهام} → العدد والمتوسط والمئينات والإنتاجية الأسبوعية """
+    total = sum(histogram.values())
+    summary = {
+        'count': total,
+        'mean': round(sum(days * count for days, count in histogram.items()) / total, 2) if total else None,
+        'throughput': round(total / weeks, 2),
+    }
+    ranks = {pct: max(math.ceil(pct / 100 * total) - 1, 0) for pct in PERCENTILES}
+    seen = 0
+    for days, count in sorted(histogram.items()):
+        seen += count
+        for pct, rank in ranks.items():
+            if rank < seen:
+                summary.setdefault(f'p{pct}', days)
+    for pct in PERCENTILES:
+        summary.setdefault(f'p{pct}', None)
+    return summary
+
+
+def compute(days=90):
+    """ حساب الإحصاءات دون كاش (انظر cycle_time_stats) """
+    since = timezone.localdate() - timedelta(days=days)
+    weeks = days / 7
+    by_stage = defaultdict(Counter)
+    by_user = defaultdict(Counter)
+    usernames = {}
+    overall = Counter()
+    for task_name, user_id, username, cycle, count in histogram_rows(since):
+        by_stage[task_name][cycle.days] += count
+        by_user[user_id][cycle.days] += count
+        usernames[user_id] = username
+        overall[cycle.days] += count
+
+    stages = [
+        {'task_name': name, **summarize(by_stage[name], weeks)}
+        for name, _ in Task.TASK_CHOICES
+    ]
+    assignees = sorted(
+        (
+            {'user_id': user_id, 'username': usernames[user_id], **summarize(histogram, weeks)}
+            for user_id, histogram in by_user.items()
+        ),
+        key=lambda row: (-row['count'], row['user_id'] or 0),
+    )
+    return {
+        'since': since,
+        'days': days,
+        'overall': summarize(overall, weeks),
+        'stages': stages,
+        'assignees': assignees,
+    }
+
+
+def invalidate():
+    """ بعد تثبيت المعاملة: تغيير المهام المكتملة دون المرور بـ TaskEvent """
+    transaction.on_commit(lambda: cache.set(GENERATION_KEY, uuid.uuid4().hex, None))
+
+
+def completions_version():
+    """ معرف آخر حدث يغير مجموعة المهام المكتملة، مع جيل invalidate """
+    last_event = (
+        TaskEvent.objects.filter(Q(new_status='مكتمل') | Q(old_status='مكتمل'))
+        .order_by('-id').values_list('id', flat=True).first()
+    ) or 0
+    return f'{last_event}.{cache.get(GENERATION_KEY, 0)}'
+
+
+def cycle_time_stats(days=90):
+    key = f'cycle_times:{days}:{timezone.localdate().isoformat()}:{completions_version()}'
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute(days)
+        cache.set(key, stats, CACHE_TIMEOUT)
+    return stats
@@ -0,0 +1,151 @@
+"""
+تصدير كل البيانات (export_all_data) كملف JSON واحد: {"app.model": [كائنات مسلسلة]}.
+
+كل نموذج يُسلسل إلى جزء نصي مستقل ('    "app.model": [...]') بنفس تنسيق
+json.dumps(indent=4)، ويُجمع الملف من الأجزاء بترتيب apps.get_models() والكائنات
+بترتيب المفتاح الأساسي.
+
+أجزاء النماذج قليلة التغير (EXPORT_CACHED_MODELS: المستخدمون والمجموعات والصلاحيات
+وأنواع المحتوى والملفات الشخصية) تُحفظ في الكاش بمفتاح طابع إصدار النموذج
+(versioning.export_scope) الذي تغيّره إشارات الحفظ والحذف في signals.py. التصدير
+التالي يقرأ الطوابع باستعلام واحد ويعيد استخدام أجزاء ما لم يتغير، فلا يُسلسل إلا
+النماذج التي تغيرت والنماذج غير المخزنة.
+
+مع workers > 1 تُسلسل النماذج الباقية بالتوازي: كل نموذج يُقسم إلى نطاقات مفاتيح
+(PK_RANGE_SIZE) ويُنفذ كل نطاق في خيط (executor='thread') أو عملية (executor='process')
+باتصال قاعدة بيانات خاص به. النتائج تُجمع بترتيب المهام لا بترتيب انتهائها، فالملف
+مطابق حرفيًا للتصدير المتسلسل. العمليات تتجاوز قفل GIL (التسلسل عمل Python خالص)
+لكنها تُنشأ بالتفرع، فهي لأوامر الإدارة لا لعمال الخادم. قبل التفرع تُغلق الاتصالات
+ومجمعاتها (warmup.release_connections): عملية ترث مجمع psycopg مفتوحًا تتشارك مقابسه
+وخيوطه مع الأب، فتُفسد بروتوكول الاتصال.
+"""
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.apps import apps
+from django.conf import settings
+from django.core import serializers
+from django.core.cache import cache
+from django.db import connections, router
+from django.db.models import Max, Min
+
+from . import versioning, warmup
+from .models import DailyStat, RollupWatermark, SearchEntry, VersionStamp
+
+# بيانات مشتقة: فهرس البحث يُعاد بناؤه بالأمر rebuild_search_index والملخصات بـ rollup_stats --full
+EXCLUDED_MODELS = (SearchEntry, VersionStamp, DailyStat, RollupWatermark)
+
+# عدد قيم المفتاح الأساسي في كل مهمة من مهام التصدير المتوازي
+PK_RANGE_SIZE = 50000
+
+EXECUTORS = {'thread': ThreadPoolExecutor, 'process': ProcessPoolExecutor}
+
+
+def export_models():
+    return [model for model in apps.get_models() if model not in EXCLUDED_MODELS]
+
+
+def _queryset(model):
+    queryset = model.objects.order_by('pk')
+    # جلب علاقات many-to-many مسبقًا بدل استعلام لكل كائن أثناء التسلسل
+    m2m_fields = [field.name for field in model._meta.many_to_many]
+    if m2m_fields:
+        queryset = queryset.prefetch_related(*m2m_fields)
+    return queryset
+
+
+def _serialize_objects(queryset):
+    """ كائنات queryset مفصولة بفواصل وبمسافة بادئة 8 (داخل قائمة النموذج)، أو '' """
+    objects = json.loads(serializers.serialize("json", queryset, ensure_ascii=False))
+    if not objects:
+        return ''
+    # القائمة داخل قائمة تعطي الكائنات مسافة البادئة المطلوبة؛ نحذف الأقواس المحيطة
+    return json.dumps([objects], indent=4, ensure_ascii=False)[len('[\n    [\n'):-len('\n    ]\n]')]
+
+
+def _chunk(label, parts):
+    parts = [part for part in parts if part]
+    if not parts:
+        return f'    {json.dumps(label)}: []'
+    return f'    {json.dumps(label)}: [\n' + ',\n'.join(parts) + '\n    ]'
+
+
+def serialize_model(model):
+    """ جزء النموذج في ملف التصدير """
+    return _chunk(model._meta.label_lower, [_serialize_objects(_queryset(model))])
+
+
+def pk_ranges(model, size=None, using=None):
+    """ نطاقات [بداية، نهاية) للمفتاح الأساسي الرقمي، أو [None] للنموذج كاملًا """
+    size = size or PK_RANGE_SIZE
+    bounds = model.objects.using(using).aggregate(low=Min('pk'), high=Max('pk'))
+    low, high = bounds['low'], bounds['high']
+    if not isinstance(low, int) or high - low < size:
+        return [None]
+    return [(start, start + size) for start in range(low, high + 1, size)]
+
+
+def serialize_range(label, pk_range, using=None):
+    """ مهمة العامل: كائنات النموذج في النطاق باتصال العامل الخاص (يُغلق بعد المهمة) """
+    queryset = _queryset(apps.get_model(label)).using(using)
+    if pk_range is not None:
+        queryset = queryset.filter(pk__gte=pk_range[0], pk__lt=pk_range[1])
+    try:
+        return _serialize_objects(queryset)
+    finally:
+        connections.close_all()
+
+
+def serialize_parallel(models, workers, executor='thread'):
+    """ {النموذج: جزؤه} بتسلسل نطاقات النماذج على workers عاملًا """
+    jobs = []
+    for model in models:
+        # العمال لا يرثون سياق الطلب (ReplicaRouter)، فتُحدد قاعدة القراءة هنا وتُمرر لكل مهمة
+        using = router.db_for_read(model)
+        jobs += [(model._meta.label_lower, pk_range, using) for pk_range in pk_ranges(model, using=using)]
+    options = {}
+    if executor == 'process':
+        # العمليات تُنشأ بالتفرع وترث إعدادات Django المحملة؛ لا ترث اتصالًا ولا مجمعًا مفتوحًا
+        warmup.release_connections()
+        options['mp_context'] = multiprocessing.get_context('fork')
+    with EXECUTORS[executor](max_workers=workers, **options) as pool:
+        results = list(pool.map(serialize_range, *zip(*jobs))) if jobs else []
+
+    parts = {model._meta.label_lower: [] for model in models}
+    for (label, _, _), part in zip(jobs, results):
+        parts[label].append(part)
+    return {model: _chunk(model._meta.label_lower, parts[model._meta.label_lower]) for model in models}
+
+
+def _chunk_key(label, version):
+    return f'export_chunk:{label}:{version}'
+
+
+def model_chunks(models, workers=1, executor='thread', use_cache=True):
+    """ أجزاء النماذج بالترتيب، من الكاش لما لم يتغير منها """
+    cached = {label.lower() for label in settings.EXPORT_CACHED_MODELS} if use_cache else set()
+    scopes = {
+        model: versioning.export_scope(model._meta.label_lower)
+        for model in models if model._meta.label_lower in cached
+    }
+    versions = versioning.current_versions(list(scopes.values())) if scopes else {}
+    keys = {model: _chunk_key(model._meta.label_lower, versions[scope][0]) for model, scope in scopes.items()}
+    hits = cache.get_many(list(keys.values())) if keys else {}
+
+    chunks = {model: hits[keys[model]] for model in models if keys.get(model) in hits}
+    missing = [model for model in models if model not in chunks]
+    if workers > 1 and missing:
+        fresh = serialize_parallel(missing, workers, executor)
+    else:
+        fresh = {model: serialize_model(model) for model in missing}
+    for model, chunk in fresh.items():
+        if model in keys:
+            cache.set(keys[model], chunk, settings.EXPORT_CACHE_TIMEOUT)
+    chunks.update(fresh)
+    return [chunks[model] for model in models]
+
+
+def export_json(workers=1, executor='thread', use_cache=True):
+    chunks = model_chunks(export_models(), workers, executor, use_cache)
+    return '{\n' + ',\n'.join(chunks) + '\n}' if chunks else '{}'
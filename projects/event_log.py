@@ -0,0 +1,93 @@
+"""
+تسجيل انتقالات حالة المهام في TaskEvent.
+
+- record(): يُستدعى بجوار كل تغيير حالة وداخل نفس المعاملة (transitions.py،
+  وإشارة حفظ Task في signals.py لما يمر عبر Task.save).
+- batch(): داخل هذا السياق تُجمع السجلات وتُكتب بـ bulk_create واحد عند الخروج
+  (قبل تثبيت المعاملة المحيطة)، للعمليات الجماعية ونماذج المهام المتعددة.
+- acting_as(user): المستخدم المنسوب إليه التغيير للتغييرات التي تمر عبر Task.save.
+
+السجل مفهرس بالوقت (occurred_at) وبالمعرف المتزايد، فتُحسب التحليلات تدريجيًا
+على الأحداث الجديدة فقط بدل إعادة مسح جدول المهام.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.utils import timezone
+
+from .models import TaskEvent
+
+BATCH_SIZE = 1000
+
+_buffer = ContextVar('task_event_buffer', default=None)
+_actor = ContextVar('task_event_actor', default=None)
+
+
+def _actor_id(actor):
+    if actor is None:
+        actor = _actor.get()
+    return actor.pk if actor is not None and actor.is_authenticated else None
+
+
+def record(task, old_status, new_status, actor=None, occurred_at=None):
+    """ task كائن مهمة أو أي كائن فيه pk و project_id و task_name و assigned_to_id """
+    event = TaskEvent(
+        task_id=task.pk,
+        project_id=task.project_id,
+        task_name=task.task_name,
+        assignee_id=task.assigned_to_id,
+        old_status=old_status,
+        new_status=new_status,
+        actor_id=_actor_id(actor),
+        occurred_at=occurred_at or timezone.now(),
+    )
+    buffer = _buffer.get()
+    if buffer is None:
+        event.save()
+    else:
+        buffer.append(event)
+    return event
+
+
+def record_many(rows, new_status, actor=None):
+    """ rows: (pk, project_id, task_name, assigned_to_id, old_status) لكل مهمة تغيرت حالتها بتحديث جماعي """
+    now = timezone.now()
+    actor_id = _actor_id(actor)
+    events = [
+        TaskEvent(
+            task_id=pk, project_id=project_id, task_name=task_name, assignee_id=assignee_id,
+            old_status=old_status, new_status=new_status, actor_id=actor_id, occurred_at=now,
+        )
+        for pk, project_id, task_name, assignee_id, old_status in rows
+    ]
+    buffer = _buffer.get()
+    if buffer is None:
+        TaskEvent.objects.bulk_create(events, batch_size=BATCH_SIZE)
+    else:
+        buffer.extend(events)
+    return events
+
+
+@contextmanager
+def batch():
+    if _buffer.get() is not None:  # سياق متداخل: يكتب السياق الخارجي
+        yield
+        return
+    buffer = []
+    token = _buffer.set(buffer)
+    try:
+        yield
+    finally:
+        _buffer.reset(token)
+    # عند الاستثناء لا نكتب شيئًا (تتراجع المعاملة المحيطة عن التغييرات نفسها)
+    if buffer:
+        TaskEvent.objects.bulk_create(buffer, batch_size=BATCH_SIZE)
+
+
+@contextmanager
+def acting_as(user):
+    token = _actor.set(user)
+    try:
+        yield
+    finally:
+        _actor.reset(token)
@@ -0,0 +1,135 @@
+"""
+بث تغييرات المهام للمستخدمين المعنيين عبر Server-Sent Events.
+
+Broadcaster ناشر/مشترك داخل العملية: كل اتصال SSE مفتوح طابور asyncio في حلقة
+الأحداث الخاصة بخادم ASGI، والنشر يمكن أن يأتي من أي خيط (منطق الانتقالات في
+transitions.py والإشارات في signals.py) بعد تثبيت المعاملة (on_commit).
+الاتصال الخامل لا يحجز خيطًا ولا اتصال قاعدة بيانات، فيتحمل العامل الواحد اتصالات كثيرة.
+
+البث داخل العملية فقط: يصل الحدث للمتصفحات المتصلة بنفس العملية التي نفذت الكتابة.
+
+عبر WSGI يُستهلك المولّد غير المتزامن بـ async_to_sync فيحجز كل اتصال خيط عامل حتى
+TASK_EVENTS_MAX_SECONDS؛ لذلك لا يُفتح البث إلا لطلبات ASGI (supports_streaming).
+"""
+import asyncio
+import itertools
+import json
+import threading
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+
+# المدة التي ينتظرها المتصفح قبل إعادة الاتصال (EventSource يعيد الاتصال تلقائيًا)
+RETRY_MS = 3000
+
+
+class Broadcaster:
+    def __init__(self, max_queue=100):
+        self.max_queue = max_queue
+        self._lock = threading.Lock()
+        self._subscribers = {}  # user_id → {(loop, queue)}
+        self._ids = itertools.count(1)
+
+    def subscribe(self, user_id):
+        """ يُستدعى من داخل حلقة الأحداث """
+        subscription = (asyncio.get_running_loop(), asyncio.Queue(maxsize=self.max_queue))
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, user_id, subscription):
+        with self._lock:
+            subscriptions = self._subscribers.get(user_id, set())
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                self._subscribers.pop(user_id, None)
+
+    def connection_count(self):
+        with self._lock:
+            return sum(len(subscriptions) for subscriptions in self._subscribers.values())
+
+    def publish(self, user_ids, event, data):
+        """ آمن للاستدعاء من أي خيط؛ لا ينتظر المستهلكين """
+        message = {'id': next(self._ids), 'event': event, 'data': data}
+        with self._lock:
+            targets = [
+                subscription
+                for user_id in set(user_ids) - {None}
+                for subscription in self._subscribers.get(user_id, ())
+            ]
+        for loop, queue in targets:
+            try:
+                loop.call_soon_threadsafe(self._deliver, queue, message)
+            except RuntimeError:
+                pass  # أُغلقت الحلقة؛ يُزال الاشتراك عند انتهاء الاتصال
+        return len(targets)
+
+    @staticmethod
+    def _deliver(queue, message):
+        if queue.full():
+            queue.get_nowait()  # المستهلك البطيء يفقد الأقدم بدل حجز الذاكرة
+        queue.put_nowait(message)
+
+
+broadcaster = Broadcaster()
+
+
+def task_payload(task, project=None):
+    project = project or task.project
+    return {
+        'task_id': task.pk,
+        'task_name': task.task_name,
+        'status': task.status,
+        'project_id': project.pk,
+        'project': project.title,
+    }
+
+
+def publish_on_commit(user_ids, event, data):
+    """ النشر بعد تثبيت المعاملة فقط، حتى لا يعيد المتصفح التحميل قبل ظهور التغيير """
+    user_ids = set(user_ids) - {None}
+    if user_ids:
+        transaction.on_commit(lambda: broadcaster.publish(user_ids, event, data))
+
+
+def publish_tasks(tasks, project=None):
+    """ حدث task لمسؤول كل مهمة """
+    for task in tasks:
+        publish_on_commit([task.assigned_to_id], 'task', task_payload(task, project))
+
+
+def supports_streaming(request):
+    """ البث متاح فقط عندما يخدم الطلبَ خادم ASGI """
+    return isinstance(request, ASGIRequest)
+
+
+def format_event(message):
+    data = json.dumps(message['data'], ensure_ascii=False)
+    return f"id: {message['id']}\nevent: {message['event']}\ndata: {data}\n\n"
+
+
+async def stream(user_id):
+    """
+    مولّد SSE لاتصال واحد: الأحداث فور وصولها، وتعليق keepalive عند الخمول ليكتشف
+    الخادم الاتصالات المقطوعة. يُغلق الاتصال بعد TASK_EVENTS_MAX_SECONDS ليعيد المتصفح
+    الاتصال (يوزع الاتصالات على العمال بعد إعادة التشغيل أو التوسع).
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.TASK_EVENTS_MAX_SECONDS
+    subscription = broadcaster.subscribe(user_id)
+    _, queue = subscription
+    try:
+        yield f'retry: {RETRY_MS}\n\n'
+        while True:
+            timeout = min(settings.TASK_EVENTS_HEARTBEAT_SECONDS, deadline - loop.time())
+            if timeout <= 0:
+                return
+            try:
+                message = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            yield format_event(message)
+    finally:
+        broadcaster.unsubscribe(user_id, subscription)
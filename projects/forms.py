@@ -152,3 +152,9 @@ class TaskFilterForm(forms.Form):
         required=False,
         widget=forms.CheckboxSelectMultiple(attrs={"class": "custom-checkbox"})
     )
+
+class TaskReassignForm(forms.Form):
+    assigned_to = forms.ModelChoiceField(
+        queryset=User.objects.filter(is_active=True).order_by('username'),
+        label="المسؤول الجديد",
+    )
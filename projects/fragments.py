@@ -0,0 +1,61 @@
+"""
+كاش أجزاء القوالب (بطاقات المشاريع والمهام) بمفتاح يتضمن طابع إصدار المشروع.
+
+أي كتابة تمس المشروع أو مهامه تغيّر الطابع (versioning.py)، فيتغير المفتاح ويُعاد
+عرض الجزء مرة واحدة، بينما تُقرأ بقية البطاقات من الكاش. لا حاجة لحذف المفاتيح
+القديمة؛ تنتهي بانتهاء مدتها أو بإزاحتها من الكاش.
+الأجزاء لا تحتوي رمز CSRF ولا بيانات المستخدم الحالي، فتُشارك بين كل المستخدمين.
+"""
+import hashlib
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+
+CACHE_ALIAS = 'fragments'
+
+
+class FragmentStats:
+    """ عداد الإصابات والإخفاقات (يعرضه أمر benchmark) """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+
+fragment_stats = FragmentStats()
+
+
+def fragment_key(name, vary_on):
+    digest = hashlib.md5(':'.join(str(part) for part in vary_on).encode(), usedforsecurity=False).hexdigest()
+    return f'fragment:{name}:{digest}'
+
+
+def get_or_render(name, version, vary_on, render):
+    """
+    إرجاع الجزء من الكاش أو عرضه بـ render() وتخزينه.
+    بدون طابع إصدار (version=None) يُعرض الجزء دائمًا لأنه لا يوجد ما يدل على صلاحيته.
+    """
+    if version is None or not settings.FRAGMENT_CACHE_ENABLED:
+        return render()
+
+    cache = caches[CACHE_ALIAS]
+    key = fragment_key(name, [version, *vary_on])
+    content = cache.get(key)
+    fragment_stats.record(content is not None)
+    if content is None:
+        content = render()
+        cache.set(key, content)
+    return content
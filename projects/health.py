@@ -0,0 +1,51 @@
+"""
+فحص صحة قواعد البيانات وإحصاءات مجمع الاتصالات.
+
+check_databases ينفذ SELECT 1 على كل قاعدة في DATABASES (الأساسية ونسخة القراءة)
+ويقيس زمنه. pool_stats يقرأ إحصاءات psycopg_pool عند تفعيل DB_POOL مع PostgreSQL:
+متوسط انتظار الطلبات لاتصال، والطلبات المنتظرة حاليًا، ونسبة التشبع (الاتصالات
+المستخدمة من الحد الأقصى). بدون مجمع (SQLite أو DB_POOL=False) يُرجع None.
+"""
+import time
+
+from django.db import DatabaseError, connections
+
+
+def pool_stats(alias):
+    pool = getattr(connections[alias], 'pool', None)
+    if pool is None:
+        return None
+    stats = pool.get_stats()
+    in_use = stats.get('pool_size', 0) - stats.get('pool_available', 0)
+    requests = stats.get('requests_num', 0)
+    return {
+        'size': stats.get('pool_size', 0),
+        'max_size': stats.get('pool_max', pool.max_size),
+        'available': stats.get('pool_available', 0),
+        'waiting': stats.get('requests_waiting', 0),
+        'saturation': round(in_use / pool.max_size, 2),
+        'requests': requests,
+        'avg_wait_ms': round(stats.get('requests_wait_ms', 0) / requests, 2) if requests else 0,
+        'timeouts': stats.get('requests_errors', 0),
+        'connections_lost': stats.get('connections_lost', 0),
+    }
+
+
+def check_database(alias):
+    started = time.perf_counter()
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute('SELECT 1')
+    except DatabaseError as e:
+        return {'ok': False, 'error': str(e)}
+    return {'ok': True, 'latency_ms': round((time.perf_counter() - started) * 1000, 2)}
+
+
+def check_databases(include_pool_stats=False):
+    results = {}
+    for alias in connections:
+        results[alias] = check_database(alias)
+        results[alias]['vendor'] = connections[alias].vendor
+        if include_pool_stats:
+            results[alias]['pool'] = pool_stats(alias)
+    return results
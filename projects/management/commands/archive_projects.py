@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from projects import archive
+
+
+class Command(BaseCommand):
+    help = "نقل المشاريع المكتملة القديمة ومهامها إلى جداول الأرشيف"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None, help="الافتراضي ARCHIVE_AFTER_DAYS")
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--dry-run', action='store_true', help="عرض عدد المشاريع المستحقة دون نقلها")
+
+    def handle(self, *args, **options):
+        count = archive.archive_projects(options['days'], options['batch_size'], options['dry_run'])
+        if options['dry_run']:
+            self.stdout.write(f"{count} مشروع مستحق للأرشفة")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"تمت أرشفة {count} مشروع"))
@@ -0,0 +1,71 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from projects import benchmarks
+
+
+class Command(BaseCommand):
+    help = "قياس أداء الواجهات ومقارنته بخط أساس محفوظ (شغّل seed_data --admin أولًا)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('suite', nargs='?', default='views', choices=['views', 'asgi', 'cycle_times', 'templates', 'export'])
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--concurrency', type=int, default=20, help="asgi: عدد الطلبات المتزامنة")
+        parser.add_argument('--requests', type=int, default=200, help="asgi: مجموع الطلبات لكل مسار")
+        parser.add_argument('--worker-threads', type=int, default=4, help="asgi: عدد عمال WSGI المتزامنين")
+        parser.add_argument('--rows', type=int, default=5000, help="templates: عدد صفوف القائمة")
+        parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4], help="export: أعداد العمال")
+        parser.add_argument('--executor', choices=['thread', 'process'], default='process', help="export: نوع العمال")
+        parser.add_argument('--only', nargs='*', help="أسماء السيناريوهات المطلوب تشغيلها فقط")
+        parser.add_argument('--output', help="حفظ النتائج في ملف JSON (خط أساس جديد)")
+        parser.add_argument('--baseline', help="ملف JSON لخط الأساس المراد المقارنة به")
+        parser.add_argument('--tolerance', type=float, default=benchmarks.DEFAULT_TOLERANCE)
+        parser.add_argument('--fail-on-regression', action='store_true')
+
+    def handle(self, *args, **options):
+        # عميل الاختبار يرسل الطلبات باسم المضيف testserver
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            try:
+                if options['suite'] == 'export':
+                    results = benchmarks.run_export_benchmarks(
+                        workers=options['workers'], executor=options['executor'], iterations=options['iterations'],
+                    )
+                elif options['suite'] == 'templates':
+                    results = benchmarks.run_template_benchmarks(
+                        iterations=options['iterations'], rows=options['rows'],
+                    )
+                elif options['suite'] == 'cycle_times':
+                    results = benchmarks.run_cycle_time_benchmarks(iterations=options['iterations'])
+                elif options['suite'] == 'asgi':
+                    results = benchmarks.run_concurrency_benchmarks(
+                        concurrency=options['concurrency'],
+                        requests=options['requests'],
+                        worker_threads=options['worker_threads'],
+                    )
+                else:
+                    results = benchmarks.run_view_benchmarks(
+                        iterations=options['iterations'], only=options['only'],
+                    )
+            except ValueError as e:
+                raise CommandError(str(e))
+
+        self.stdout.write(json.dumps(results, indent=4, ensure_ascii=False))
+
+        if options['output']:
+            benchmarks.save_baseline(options['output'], results)
+            self.stdout.write(self.style.SUCCESS(f"تم حفظ النتائج في {options['output']}"))
+
+        if options['baseline']:
+            regressions = benchmarks.compare_with_baseline(
+                results, benchmarks.load_baseline(options['baseline']), options['tolerance'],
+            )
+            if not regressions:
+                self.stdout.write(self.style.SUCCESS("لا يوجد تراجع في الأداء مقارنة بخط الأساس"))
+                return
+            for line in regressions:
+                self.stdout.write(self.style.WARNING(f"تراجع: {line}"))
+            if options['fail_on_regression']:
+                raise CommandError(f"تم اكتشاف {len(regressions)} تراجع في الأداء")
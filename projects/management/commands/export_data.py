@@ -0,0 +1,34 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from projects import data_export
+
+
+class Command(BaseCommand):
+    help = "تصدير كل البيانات (نفس ملف export_all_data) مع تسلسل النماذج ونطاقاتها بالتوازي"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help="مسار ملف JSON (الافتراضي: المخرجات القياسية)")
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+        parser.add_argument(
+            '--executor', choices=list(data_export.EXECUTORS), default='thread',
+            help="process يتجاوز قفل GIL بعمليات متفرعة (تُغلق مجمعات الاتصالات قبل التفرع)",
+        )
+        parser.add_argument('--no-cache', action='store_true', help="تسلسل كل النماذج دون أجزاء الكاش")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        data = data_export.export_json(
+            workers=options['workers'], executor=options['executor'], use_cache=not options['no_cache'],
+        )
+        if not options['output']:
+            self.stdout.write(data)
+            return
+        with open(options['output'], 'w', encoding='utf-8') as f:
+            f.write(data)
+        self.stdout.write(self.style.SUCCESS(
+            f"تم تصدير {len(data.encode()) / 1024 / 1024:.1f}MB إلى {options['output']} "
+            f"خلال {time.perf_counter() - started:.1f} ثانية ({options['workers']} عامل)"
+        ))
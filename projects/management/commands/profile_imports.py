@@ -0,0 +1,46 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from projects import startup
+
+
+class Command(BaseCommand):
+    help = "قياس تكلفة بدء العامل: زمن الاستيراد وذروة الذاكرة وأبطأ وحدات tasks_manager و projects"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=20, help="عدد أبطأ الاستيرادات المعروضة")
+        parser.add_argument('--all', action='store_true', help="عرض كل الوحدات لا وحدات المشروع فقط")
+        parser.add_argument('--json', action='store_true', help="إخراج النتائج بصيغة JSON")
+        parser.add_argument('--fail-over-budget', action='store_true', help="خطأ إذا تجاوز القياس STARTUP_BUDGET")
+
+    def handle(self, *args, **options):
+        stats = startup.measure_cold_start()
+        prefixes = {name.split('.')[0] for name in stats['imports_us']} if options['all'] else ('tasks_manager', 'projects')
+        slowest = startup.slowest_imports(stats['imports_us'], prefixes=tuple(prefixes), top=options['top'])
+        eager = [name for name in startup.LAZY_MODULES if name in stats['modules']]
+
+        if options['json']:
+            self.stdout.write(json.dumps({
+                'seconds': round(stats['seconds'], 4),
+                'peak_memory_kb': stats['peak_memory_kb'],
+                'modules': len(stats['modules']),
+                'eager_optional': eager,
+                'slowest_us': dict(slowest),
+            }, indent=4, ensure_ascii=False))
+        else:
+            self.stdout.write(f"زمن البدء: {stats['seconds'] * 1000:.1f}ms (الحد {startup.STARTUP_BUDGET['seconds'] * 1000:.0f}ms)")
+            self.stdout.write(
+                f"ذروة الذاكرة: {stats['peak_memory_kb'] / 1024:.1f}MB "
+                f"(الحد {startup.STARTUP_BUDGET['peak_memory_kb'] / 1024:.0f}MB) — {len(stats['modules'])} حزمة محملة"
+            )
+            for name, us in slowest:
+                self.stdout.write(f"{us / 1000:10.2f}ms  {name}")
+            for name in eager:
+                self.stdout.write(self.style.WARNING(f"تكامل اختياري محمل عند البدء: {name}"))
+
+        over = [
+            key for key, limit in startup.STARTUP_BUDGET.items() if stats[key] > limit
+        ]
+        if over and options['fail_over_budget']:
+            raise CommandError(f"تجاوز حد البدء: {', '.join(over)}")
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from projects import search
+
+
+class Command(BaseCommand):
+    help = "إعادة بناء فهرس البحث للمشاريع والمهام بالكامل"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        count = search.rebuild_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"تمت فهرسة {count} عنصر"))
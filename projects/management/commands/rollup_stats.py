@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from projects import rollups
+
+
+class Command(BaseCommand):
+    help = "تحديث الملخصات اليومية (DailyStat) للأيام التي وصلتها انتقالات جديدة"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help="إعادة حساب كل الأيام من بداية السجل")
+        parser.add_argument('--max-days', type=int, default=31, help="أقصى عدد أيام في معاملة واحدة")
+
+    def handle(self, *args, **options):
+        days = rollups.rollup(full=options['full'], max_days=options['max_days'])
+        self.stdout.write(self.style.SUCCESS(f"تم تحديث ملخصات {days} يوم"))
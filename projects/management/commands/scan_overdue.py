@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from projects import sla
+
+
+class Command(BaseCommand):
+    help = "إضافة تذكير لكل مهمة قيد التنفيذ تجاوزت موعد استحقاقها (بدون تكرار)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500)
+        parser.add_argument('--dry-run', action='store_true', help="عرض عدد المهام المتأخرة دون إضافة تذكيرات")
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            self.stdout.write(f"{sla.overdue_tasks().count()} مهمة متأخرة")
+            return
+        overdue, queued = sla.scan_overdue(options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"{overdue} مهمة متأخرة، أُضيف {queued} تذكير جديد"))
@@ -0,0 +1,194 @@
+import random
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from projects import search, versioning
+from projects.auth_backends import invalidate_users
+from projects.models import Project, Task, TaskEvent, UserProfile
+
+# توزيع حالات المشاريع المولدة (قريب من الاستخدام الفعلي)
+PROJECT_STATUS_MIX = [
+    ('مكتمل', 30),
+    ('قيد التنفيذ', 45),
+    ('معلق', 10),
+    ('لم يبدأ بعد', 15),
+]
+
+
+class Command(BaseCommand):
+    help = "توليد بيانات تجريبية (مستخدمون، مشاريع، مهام) بأعداد كبيرة لقياس الأداء"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20)
+        parser.add_argument('--projects', type=int, default=500)
+        parser.add_argument(
+            '--tasks-per-project', type=int, default=len(Task.TASK_CHOICES),
+            help="عدد مراحل كل مشروع (بحد أقصى عدد المراحل المعرفة)",
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--seed', type=int, default=None, help="بذرة المولد العشوائي لنتائج قابلة للتكرار")
+        parser.add_argument('--prefix', default='seed', help="بادئة أسماء المستخدمين والمشاريع المولدة")
+        parser.add_argument(
+            '--admin', action='store_true',
+            help="إنشاء أول مستخدم ({prefix}_user_0) كمدير بكلمة المرور 'password' لقياس الواجهات المحمية",
+        )
+
+    def handle(self, *args, **options):
+        tasks_per_project = options['tasks_per_project']
+        if not 1 <= tasks_per_project <= len(Task.TASK_CHOICES):
+            raise CommandError(f"--tasks-per-project يجب أن يكون بين 1 و {len(Task.TASK_CHOICES)}")
+        if options['users'] < 1:
+            raise CommandError("--users يجب أن يكون 1 على الأقل")
+
+        counts = seed_database(
+            users=options['users'],
+            projects=options['projects'],
+            tasks_per_project=tasks_per_project,
+            batch_size=options['batch_size'],
+            seed=options['seed'],
+            prefix=options['prefix'],
+            admin=options['admin'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            "تم إنشاء {users} مستخدم و {projects} مشروع و {tasks} مهمة".format(**counts)
+        ))
+
+
+def _at(day, rng, hour):
+    """ وقت عشوائي خلال أربع ساعات من hour؛ البدء صباحًا والانتهاء بعد الظهر فلا يسبق الانتهاء البدء """
+    moment = datetime.combine(day, time(hour)) + timedelta(minutes=rng.randrange(4 * 60))
+    return timezone.make_aware(moment)
+
+
+def _create_tasks(tasks, batch_size, rng):
+    """ إنشاء المهام مع أحداث انتقالاتها (TaskEvent) المطابقة لتواريخها، ليجد التحليل تاريخًا """
+    Task.objects.bulk_create(tasks, batch_size=batch_size)
+    events = []
+    for task in tasks:
+        def event(old_status, new_status, day, hour):
+            events.append(TaskEvent(
+                task_id=task.pk, project_id=task.project_id, task_name=task.task_name,
+                old_status=old_status, new_status=new_status,
+                actor_id=task.assigned_to_id, assignee_id=task.assigned_to_id,
+                occurred_at=_at(day, rng, hour),
+            ))
+
+        if task.start_date:
+            event('لم يبدأ بعد', 'قيد التنفيذ', task.start_date, 9)
+        if task.status == 'مكتمل':
+            event('قيد التنفيذ', 'مكتمل', task.end_date, 13)
+        elif task.status == 'معلق':
+            event('قيد التنفيذ', 'معلق', task.start_date, 13)
+    TaskEvent.objects.bulk_create(events, batch_size=batch_size)
+
+
+def _task_plan(project_status, stage_count, rng):
+    """ إرجاع حالة كل مرحلة بحسب حالة المشروع: المراحل السابقة مكتملة والمرحلة الحالية نشطة """
+    if project_status == 'مكتمل':
+        return ['مكتمل'] * stage_count
+    if project_status == 'لم يبدأ بعد':
+        return ['لم يبدأ بعد'] * stage_count
+
+    current = rng.randrange(stage_count)
+    active = 'معلق' if project_status == 'معلق' else 'قيد التنفيذ'
+    return ['مكتمل'] * current + [active] + ['لم يبدأ بعد'] * (stage_count - current - 1)
+
+
+@transaction.atomic
+def seed_database(users=20, projects=500, tasks_per_project=6, batch_size=1000, seed=None, prefix='seed', admin=False):
+    """
+    إنشاء البيانات بعمليات bulk_create لتجاوز Project.save و Task.save
+    (التي تنشئ المهام وتغير الحالات مهمةً بمهمة).
+    مع admin يُنشأ أول مستخدم كمدير حتى يمكن استخدامه في قياس الواجهات المحمية بالصلاحيات.
+    """
+    rng = random.Random(seed)
+    today = timezone.now().date()
+    stages = [name for name, _ in Task.TASK_CHOICES[:tasks_per_project]]
+
+    # كلمة مرور واحدة مشفرة مسبقًا لتفادي تكلفة التشفير لكل مستخدم
+    password = make_password('password')
+    offset = User.objects.filter(username__startswith=f'{prefix}_user_').count()
+    new_users = User.objects.bulk_create(
+        [
+            User(
+                username=f'{prefix}_user_{offset + i}',
+                password=password,
+                is_superuser=admin and offset + i == 0,
+                is_staff=admin and offset + i == 0,
+            )
+            for i in range(users)
+        ],
+        batch_size=batch_size,
+    )
+    UserProfile.objects.bulk_create(
+        [UserProfile(user=user, whatsapp_number=f'9665{rng.randrange(10**7, 10**8)}') for user in new_users],
+        batch_size=batch_size,
+    )
+
+    statuses = [status for status, _ in PROJECT_STATUS_MIX]
+    weights = [weight for _, weight in PROJECT_STATUS_MIX]
+    project_statuses = rng.choices(statuses, weights=weights, k=projects)
+
+    new_projects = Project.objects.bulk_create(
+        [
+            Project(
+                title=f'{prefix} مشروع {i}',
+                description=' '.join(rng.choices(['فيديو', 'شرح', 'محتوى', 'تعليمي', 'سلسلة', 'حلقة', 'مقدمة'], k=40)),
+                status=status,
+                created_by=rng.choice(new_users),
+            )
+            for i, status in enumerate(project_statuses)
+        ],
+        batch_size=batch_size,
+    )
+
+    tasks = []
+    for project in new_projects:
+        # تواريخ متتابعة للمراحل المكتملة بدءًا من تاريخ عشوائي خلال السنة الماضية
+        day = today - timedelta(days=rng.randrange(30, 365))
+        for stage, status in zip(stages, _task_plan(project.status, len(stages), rng)):
+            start_date = end_date = None
+            if status == 'مكتمل':
+                start_date = day
+                end_date = min(day + timedelta(days=rng.randrange(0, 10)), today)
+                day = end_date
+            elif status in ('قيد التنفيذ', 'معلق'):
+                start_date = min(day, today)
+
+            tasks.append(Task(
+                project=project,
+                task_name=stage,
+                assigned_to=rng.choice(new_users),
+                status=status,
+                start_date=start_date,
+                end_date=end_date,
+                due_date=Task.sla_due_date(stage, start_date),
+            ))
+
+        if len(tasks) >= batch_size:
+            _create_tasks(tasks, batch_size, rng)
+            tasks = []
+
+    _create_tasks(tasks, batch_size, rng)
+
+    # bulk_create لا يرسل إشارات الحفظ، فنفهرس البيانات الجديدة للبحث ونغير طوابع الإصدار مباشرة
+    project_ids = [project.pk for project in new_projects]
+    for start in range(0, len(project_ids), batch_size):
+        search.index_projects(project_ids[start:start + batch_size])
+        versioning.bump_projects(project_ids[start:start + batch_size])
+    versioning.bump(
+        [versioning.user_scope(user.pk) for user in new_users]
+        + [versioning.export_scope('auth.user'), versioning.export_scope('projects.userprofile')]
+    )
+    invalidate_users([user.pk for user in new_users])
+
+    return {
+        'users': len(new_users),
+        'projects': len(new_projects),
+        'tasks': len(new_projects) * len(stages),
+    }
@@ -0,0 +1,183 @@
+import json
+import random
+import threading
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, close_old_connections, connections
+
+from projects.benchmarks import percentile
+from projects.models import Project, Task
+from projects import transitions
+
+STRESS_PREFIX = 'stress'
+
+
+class Command(BaseCommand):
+    help = "اختبار ضغط لانتقالات المهام المتزامنة (إكمال / تعليق) والتحقق من سلامة الحالات"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--projects', type=int, default=20)
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--hold-ratio', type=float, default=0.2, help="نسبة عمليات التعليق من مجموع العمليات")
+        parser.add_argument('--max-operations', type=int, default=10000)
+        parser.add_argument('--seed', type=int, default=None)
+        parser.add_argument('--keep', action='store_true', help="عدم حذف بيانات الاختبار بعد الانتهاء")
+
+    def handle(self, *args, **options):
+        settings_dict = connections['default'].settings_dict
+        if settings_dict['ENGINE'].endswith('sqlite3') and settings_dict['NAME'] in ('', ':memory:'):
+            raise CommandError("يجب تشغيل اختبار الضغط على قاعدة بيانات ملف وليست في الذاكرة")
+
+        project_ids = create_stress_projects(options['projects'])
+        try:
+            report = run_stress(
+                project_ids,
+                threads=options['threads'],
+                hold_ratio=options['hold_ratio'],
+                max_operations=options['max_operations'],
+                seed=options['seed'],
+            )
+        finally:
+            if not options['keep']:
+                Project.objects.filter(pk__in=project_ids).delete()
+
+        self.stdout.write(json.dumps(report, indent=4, ensure_ascii=False))
+        if report['violations']:
+            raise CommandError(f"تم اكتشاف {len(report['violations'])} خرق لسلامة الحالات")
+        self.stdout.write(self.style.SUCCESS("جميع الحالات سليمة"))
+
+
+def create_stress_projects(count):
+    """ إنشاء مشاريع بمهامها الافتراضية، كلها مسندة لمستخدم الاختبار والمرحلة الأولى قيد التنفيذ """
+    user, _ = User.objects.get_or_create(username=f'{STRESS_PREFIX}_user')
+    project_ids = []
+    for i in range(count):
+        project = Project.objects.create(title=f'{STRESS_PREFIX} {i}', created_by=user, status='قيد التنفيذ')
+        project.tasks.update(assigned_to=user)
+        first = project.tasks.order_by('id').first()
+        first.status = 'قيد التنفيذ'
+        first.save()
+        project_ids.append(project.pk)
+    return project_ids
+
+
+def run_stress(project_ids, threads=8, hold_ratio=0.2, max_operations=10000, seed=None):
+    """
+    تشغيل عدة خيوط تنفذ إكمال/تعليق المهمة النشطة لمشاريع عشوائية في نفس الوقت.
+    عدد المشاريع أقل من عدد العمليات فتتزاحم الخيوط على نفس المشروع ونفس المهمة عمدًا.
+    """
+    rng = random.Random(seed)
+    operations = [(rng.choice(project_ids), rng.random() < hold_ratio) for _ in range(max_operations)]
+    cursor = iter(operations)
+    cursor_lock = threading.Lock()
+    timings, outcomes, errors = [], {'changed': 0, 'noop': 0}, []
+    results_lock = threading.Lock()
+    start_barrier = threading.Barrier(threads)
+
+    def worker():
+        start_barrier.wait()
+        try:
+            while True:
+                with cursor_lock:
+                    item = next(cursor, None)
+                if item is None:
+                    return
+                project_id, hold = item
+
+                started = time.perf_counter()
+                try:
+                    task = (
+                        Task.objects.filter(project_id=project_id, status__in=['قيد التنفيذ', 'معلق'])
+                        .order_by('id').first()
+                    )
+                except Exception as e:
+                    if isinstance(e, OperationalError) and 'locked' in str(e):
+                        # قراءة تعارضت مع قفل كتابة (SQLite): تُحسب كانتظار وتُتجاوز العملية
+                        transitions.lock_stats.record(time.perf_counter() - started)
+                    else:
+                        with results_lock:
+                            errors.append(f"{type(e).__name__}: {e}")
+                    continue
+                if task is None:
+                    continue  # اكتمل المشروع
+                try:
+                    if hold and task.status == 'قيد التنفيذ':
+                        result = transitions.hold_task(task)
+                    else:
+                        result = transitions.complete_task(task)
+                except Exception as e:
+                    # يشمل القفل الذي استنفد MAX_LOCK_RETRIES: انتقال فاشل وليس انتظارًا
+                    with results_lock:
+                        errors.append(f"{type(e).__name__}: {e}")
+                    continue
+                elapsed = time.perf_counter() - started
+
+                with results_lock:
+                    timings.append(elapsed * 1000)
+                    outcomes['changed' if result.changed else 'noop'] += 1
+        finally:
+            close_old_connections()
+            connections.close_all()
+
+    transitions.lock_stats.reset()
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    return {
+        'threads': threads,
+        'operations': len(timings),
+        'changed': outcomes['changed'],
+        'lost_races': outcomes['noop'],
+        'errors': errors[:20],
+        'error_count': len(errors),
+        'elapsed_s': round(elapsed, 3),
+        'throughput_ops_s': round(len(timings) / elapsed, 1) if elapsed else None,
+        'p50_ms': percentile(timings, 50),
+        'p99_ms': percentile(timings, 99),
+        'lock_retries': transitions.lock_stats.retries,
+        'lock_wait_ms': round(transitions.lock_stats.wait_seconds * 1000, 1),
+        'violations': check_invariants(project_ids),
+    }
+
+
+def check_invariants(project_ids):
+    """
+    قواعد يجب أن تبقى صحيحة مهما كان ترتيب الطلبات المتزامنة:
+    - مهمة نشطة واحدة بالضبط (قيد التنفيذ أو معلقة) لكل مشروع غير مكتمل، ولا شيء للمكتمل
+    - المراحل المكتملة تسبق المرحلة النشطة دون تخطي أي مرحلة
+    - حالة المشروع مطابقة لحالة مهامه
+    """
+    stages = [name for name, _ in Task.TASK_CHOICES]
+    tasks_by_project = {}
+    for project_id, task_name, status in (
+        Task.objects.filter(project_id__in=project_ids).values_list('project_id', 'task_name', 'status')
+    ):
+        tasks_by_project.setdefault(project_id, []).append((stages.index(task_name), status))
+
+    violations = []
+    for project_id, status in Project.objects.filter(pk__in=project_ids).values_list('pk', 'status'):
+        ordered = [task_status for _, task_status in sorted(tasks_by_project.get(project_id, []))]
+        active = [s for s in ordered if s in ('قيد التنفيذ', 'معلق')]
+
+        if all(s == 'مكتمل' for s in ordered):
+            expected_status = 'مكتمل'
+        elif len(active) != 1:
+            violations.append(f"project {project_id}: {len(active)} active tasks {ordered}")
+            continue
+        else:
+            expected_status = 'معلق' if active[0] == 'معلق' else 'قيد التنفيذ'
+            position = ordered.index(active[0])
+            if any(s != 'مكتمل' for s in ordered[:position]) or any(s != 'لم يبدأ بعد' for s in ordered[position + 1:]):
+                violations.append(f"project {project_id}: stages out of order {ordered}")
+
+        if status != expected_status:
+            violations.append(f"project {project_id}: status {status}, expected {expected_status}")
+
+    return violations
@@ -0,0 +1,118 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:58
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+FTS_TABLE = 'projects_searchentry_fts'
+
+# نسخة مجمدة من projects.search وقت كتابة التهجير: تغيير تلك الدوال لاحقًا لا يغير هذا التهجير
+# (rebuild_search_index يعيد بناء الفهرس بالنسخة الحالية)
+_DIACRITICS = re.compile('[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]')
+_FOLDING = str.maketrans({
+    '\u0623': '\u0627',  # أ → ا
+    '\u0625': '\u0627',  # إ → ا
+    '\u0622': '\u0627',  # آ → ا
+    '\u0671': '\u0627',  # ٱ → ا
+    '\u0649': '\u064a',  # ى → ي
+    '\u0629': '\u0647',  # ة → ه
+})
+
+
+def normalize_arabic(text):
+    if not text:
+        return ''
+    return _DIACRITICS.sub('', text).translate(_FOLDING).lower()
+
+
+def project_content(project):
+    return normalize_arabic(f"{project.title} {project.description or ''}")
+
+
+def task_content(task):
+    parts = [task.task_name, task.project.title]
+    if task.assigned_to_id:
+        user = task.assigned_to
+        parts += [user.username, user.first_name, user.last_name]
+    return normalize_arabic(' '.join(part for part in parts if part))
+
+
+def create_search_index(apps, schema_editor):
+    """ إنشاء الفهرس المعكوس حسب قاعدة البيانات ثم تعبئته بالبيانات الحالية """
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+            f"content, content='projects_searchentry', content_rowid='id', tokenize='unicode61')"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON projects_searchentry BEGIN "
+            f"INSERT INTO {FTS_TABLE}(rowid, content) VALUES (new.id, new.content); END"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON projects_searchentry BEGIN "
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, content) VALUES ('delete', old.id, old.content); END"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE ON projects_searchentry BEGIN "
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, content) VALUES ('delete', old.id, old.content); "
+            f"INSERT INTO {FTS_TABLE}(rowid, content) VALUES (new.id, new.content); END"
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute(
+            "CREATE INDEX projects_searchentry_tsv_idx ON projects_searchentry "
+            "USING GIN (to_tsvector('simple', content))"
+        )
+
+    Project = apps.get_model('projects', 'Project')
+    Task = apps.get_model('projects', 'Task')
+    SearchEntry = apps.get_model('projects', 'SearchEntry')
+    SearchEntry.objects.bulk_create(
+        (
+            SearchEntry(kind='project', object_id=project.pk, project_id=project.pk, content=project_content(project))
+            for project in Project.objects.iterator()
+        ),
+        batch_size=1000,
+    )
+    SearchEntry.objects.bulk_create(
+        (
+            SearchEntry(kind='task', object_id=task.pk, project_id=task.project_id, content=task_content(task))
+            for task in Task.objects.select_related('project', 'assigned_to').iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        for suffix in ('ai', 'ad', 'au'):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+    elif vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS projects_searchentry_tsv_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0004_performance_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('project', 'مشروع'), ('task', 'مهمة')], max_length=10)),
+                ('object_id', models.BigIntegerField()),
+                ('content', models.TextField()),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='projects.project')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id'), name='search_entry_unique_object')],
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
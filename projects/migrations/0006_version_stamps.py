@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:03
+
+import uuid
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_project_stamps(apps, schema_editor):
+    """ طابع لكل مشروع موجود، حتى تُخزن بطاقاته في كاش الأجزاء (بدون طابع تُعرض دائمًا) """
+    Project = apps.get_model('projects', 'Project')
+    VersionStamp = apps.get_model('projects', 'VersionStamp')
+    now = timezone.now()
+    project_ids = Project.objects.order_by('pk').values_list('pk', flat=True).iterator(chunk_size=2000)
+    batch = []
+    for pk in project_ids:
+        batch.append(VersionStamp(scope=f'project:{pk}', version=uuid.uuid4().hex, updated_at=now))
+        if len(batch) >= 2000:
+            VersionStamp.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    VersionStamp.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0005_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersionStamp',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=50, unique=True)),
+                ('version', models.CharField(max_length=32)),
+                ('updated_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.RunPython(backfill_project_stamps, migrations.RunPython.noop),
+    ]
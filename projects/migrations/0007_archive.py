@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:29
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0006_version_stamps'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedProject',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=255, verbose_name='اسم المشروع')),
+                ('description', models.TextField(blank=True, null=True, verbose_name='وصف المشروع')),
+                ('status', models.CharField(choices=[('لم يبدأ بعد', 'لم يبدأ بعد'), ('قيد التنفيذ', 'قيد التنفيذ'), ('مكتمل', 'مكتمل'), ('معلق', 'معلق')], max_length=20, verbose_name='حالة المشروع')),
+                ('created_at', models.DateTimeField(verbose_name='تاريخ الإنشاء')),
+                ('completed_on', models.DateField(verbose_name='تاريخ الاكتمال')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='تاريخ الأرشفة')),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='منشئ المشروع')),
+            ],
+            options={
+                'ordering': ['-completed_on', '-id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedTask',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('task_name', models.CharField(choices=[('اختيار الموضوع', 'اختيار الموضوع'), ('كتابة المحتوى', 'كتابة المحتوى'), ('التسجيل', 'التسجيل'), ('المونتاج', 'المونتاج'), ('الثامنايل', 'الثامنايل'), ('الرفع', 'الرفع')], max_length=50)),
+                ('status', models.CharField(choices=[('لم يبدأ بعد', 'لم يبدأ بعد'), ('قيد التنفيذ', 'قيد التنفيذ'), ('مكتمل', 'مكتمل'), ('معلق', 'معلق')], max_length=20)),
+                ('start_date', models.DateField(blank=True, null=True)),
+                ('end_date', models.DateField(blank=True, null=True)),
+                ('assigned_to', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tasks', to='projects.archivedproject')),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='archivedproject',
+            index=models.Index(fields=['title'], name='archived_title_prefix_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='archivedproject',
+            index=models.Index(fields=['-completed_on', '-id'], name='archived_completed_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:34
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0007_archive'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_id', models.BigIntegerField()),
+                ('project_id', models.BigIntegerField()),
+                ('task_name', models.CharField(choices=[('اختيار الموضوع', 'اختيار الموضوع'), ('كتابة المحتوى', 'كتابة المحتوى'), ('التسجيل', 'التسجيل'), ('المونتاج', 'المونتاج'), ('الثامنايل', 'الثامنايل'), ('الرفع', 'الرفع')], max_length=50)),
+                ('old_status', models.CharField(blank=True, choices=[('لم يبدأ بعد', 'لم يبدأ بعد'), ('قيد التنفيذ', 'قيد التنفيذ'), ('مكتمل', 'مكتمل'), ('معلق', 'معلق')], max_length=20, null=True)),
+                ('new_status', models.CharField(choices=[('لم يبدأ بعد', 'لم يبدأ بعد'), ('قيد التنفيذ', 'قيد التنفيذ'), ('مكتمل', 'مكتمل'), ('معلق', 'معلق')], max_length=20)),
+                ('occurred_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['occurred_at'], name='task_event_time_idx'), models.Index(fields=['task_id', 'occurred_at'], name='task_event_task_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:38
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_assignee(apps, schema_editor):
+    """ الأحداث السابقة تُنسب لمسؤول المهمة الحالي (المهام المؤرشفة أو المحذوفة تبقى بلا مسؤول) """
+    Task = apps.get_model('projects', 'Task')
+    TaskEvent = apps.get_model('projects', 'TaskEvent')
+    TaskEvent.objects.update(
+        assignee_id=Subquery(Task.objects.filter(pk=OuterRef('task_id')).values('assigned_to_id')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0008_task_events'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('last_event_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='taskevent',
+            name='assignee',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(backfill_assignee, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='DailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('task_name', models.CharField(choices=[('اختيار الموضوع', 'اختيار الموضوع'), ('كتابة المحتوى', 'كتابة المحتوى'), ('التسجيل', 'التسجيل'), ('المونتاج', 'المونتاج'), ('الثامنايل', 'الثامنايل'), ('الرفع', 'الرفع')], max_length=50)),
+                ('started', models.PositiveIntegerField(default=0)),
+                ('completed', models.PositiveIntegerField(default=0)),
+                ('held', models.PositiveIntegerField(default=0)),
+                ('user', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'day'], name='daily_stat_user_idx')],
+                'constraints': [models.UniqueConstraint(fields=('day', 'user', 'task_name'), name='daily_stat_unique')],
+            },
+        ),
+    ]
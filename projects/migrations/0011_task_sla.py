@@ -0,0 +1,76 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:58
+
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Case, DateField, ExpressionWrapper, F, Value, When
+
+# نسخة مجمّدة من settings.TASK_SLA_DAYS وقت كتابة الترحيل: تغيير الإعداد لاحقًا
+# يجب ألا يغيّر نتيجة الترحيل على قاعدة جديدة.
+TASK_SLA_DAYS = {
+    'اختيار الموضوع': 2,
+    'كتابة المحتوى': 5,
+    'التسجيل': 3,
+    'المونتاج': 7,
+    'الثامنايل': 2,
+    'الرفع': 1,
+}
+
+
+def backfill_due_dates(apps, schema_editor):
+    """ موعد استحقاق المهام التي بدأت سابقًا: تحديث واحد بتاريخ البدء مضافًا إليه مهلة كل مهمة """
+    Task = apps.get_model('projects', 'Task')
+    Task.objects.filter(start_date__isnull=False).update(due_date=Case(
+        *[
+            When(task_name=name, then=ExpressionWrapper(F('start_date') + timedelta(days=days), output_field=DateField()))
+            for name, days in TASK_SLA_DAYS.items()
+        ],
+        default=Value(None),
+        output_field=DateField(),
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0010_task_status_end_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskReminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('due_date', models.DateField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='due_date',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_due_dates, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['status', 'due_date'], name='task_status_due_idx'),
+        ),
+        migrations.AddField(
+            model_name='taskreminder',
+            name='task',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminders', to='projects.task'),
+        ),
+        migrations.AddField(
+            model_name='taskreminder',
+            name='user',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='taskreminder',
+            constraint=models.UniqueConstraint(fields=('task', 'due_date'), name='task_reminder_unique'),
+        ),
+    ]
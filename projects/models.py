@@ -1,4 +1,9 @@
+from datetime import timedelta
+
+from django.conf import settings
 from django.db import models
+from django.db.models import CharField, F, OuterRef, Subquery, Value
+from django.db.models.functions import Cast, Concat, Substr
 from django.contrib.auth.models import User
 from django.utils import timezone
 from django.urls import reverse
@@ -14,6 +19,37 @@ class UserProfile(models.Model):
         return f"{self.user.username} - {self.whatsapp_number if self.whatsapp_number else 'No WhatsApp'}"
 
 
+# يكفي لـ truncatewords:15 في بطاقات المشاريع
+DESCRIPTION_PREVIEW_CHARS = 300
+
+
+class ProjectQuerySet(models.QuerySet):
+    def with_current_task(self):
+        """ إضافة اسم المهمة الحالية لكل مشروع في نفس الاستعلام بدل استعلام لكل صف """
+        current = Task.objects.filter(
+            project=OuterRef('pk'), status='قيد التنفيذ'
+        ).order_by('start_date').values('task_name')[:1]
+        return self.annotate(current_task_name=Subquery(current))
+
+    def with_version(self):
+        """ إضافة طابع إصدار كل مشروع (مفتاح كاش بطاقاته) في نفس الاستعلام """
+        return self.annotate(version=VersionStamp.project_version(OuterRef('pk')))
+
+    def card_rows(self):
+        """
+        أعمدة بطاقة قائمة المشاريع فقط كصفوف خفيفة (namedtuple) بدل كائنات Project:
+        اسم المنشئ بـ JOIN في نفس الاستعلام، وأول DESCRIPTION_PREVIEW_CHARS حرفًا من الوصف
+        فقط (البطاقة تعرض 15 كلمة منه).
+        """
+        return self.with_current_task().with_version().annotate(
+            creator=F('created_by__username'),
+            description_preview=Substr('description', 1, DESCRIPTION_PREVIEW_CHARS),
+        ).values_list(
+            'pk', 'title', 'status', 'created_at', 'creator', 'description_preview', 'current_task_name', 'version',
+            named=True,
+        )
+
+
 class Project(models.Model):
     STATUS_CHOICES = [
         ('لم يبدأ بعد', 'لم يبدأ بعد'),
@@ -28,8 +64,19 @@ class Project(models.Model):
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, verbose_name='تاريخ الإنشاء')
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='منشئ المشروع')
 
+    objects = ProjectQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # varchar_pattern_ops يسمح لـ Postgres باستخدام الفهرس في البحث بالبادئة (LIKE 'abc%')
+            models.Index(fields=['title'], name='project_title_prefix_idx', opclasses=['varchar_pattern_ops']),
+            models.Index(fields=['status'], name='project_status_idx'),
+        ]
+
     def current_task(self):
         """ إرجاع أول مهمة لم تكتمل بعد """
+        if hasattr(self, 'current_task_name'):  # محسوبة مسبقًا عبر with_current_task()
+            return self.current_task_name or "لا توجد مهام حالية"
         current_task = self.tasks.filter(status__in=['قيد التنفيذ']).order_by('start_date').first()
         return current_task.task_name if current_task else "لا توجد مهام حالية"
 
@@ -95,11 +142,31 @@ class Task(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='قيد التنفيذ')
     start_date = models.DateField(null=True, blank=True)
     end_date = models.DateField(null=True, blank=True)
+    due_date = models.DateField(null=True, blank=True, editable=False)  # start_date + مدة المرحلة (sla.py)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'start_date'], name='task_status_start_idx'),
+            # فحص المتأخرة: نطاق due_date داخل الحالة، بحجم المتأخرة لا بحجم الجدول (sla.py)
+            models.Index(fields=['status', 'due_date'], name='task_status_due_idx'),
+            models.Index(fields=['status', 'end_date'], name='task_status_end_idx'),  # زمن الدورة (cycle_times.py)
+            models.Index(fields=['start_date'], name='task_start_date_idx'),
+            models.Index(fields=['task_name'], name='task_name_idx'),
+        ]
+
+    @staticmethod
+    def sla_due_date(task_name, start_date):
+        """ موعد الاستحقاق: تاريخ البدء + مدة المرحلة في TASK_SLA_DAYS """
+        days = settings.TASK_SLA_DAYS.get(task_name)
+        if start_date is None or days is None:
+            return None
+        return start_date + timedelta(days=days)
 
     def save(self, *args, **kwargs):
         # تحديث تاريخ البدء عند تعيين المهمة "قيد التنفيذ"
         if self.status == "قيد التنفيذ":
             self.start_date = timezone.now().date()
+            self.due_date = self.sla_due_date(self.task_name, self.start_date)
 
         # عند اكتمال المهمة، حدد تاريخ الانتهاء وابحث عن المهمة التالية
         elif self.status == "مكتمل":
@@ -127,3 +194,175 @@ class Task(models.Model):
 
     def __str__(self):
         return f"{self.task_name} ({self.status}) - {self.project.title}"
+
+
+class SearchEntry(models.Model):
+    """ نص موحد لكل مشروع أو مهمة يُبنى عليه فهرس البحث (انظر search.py) """
+    KIND_CHOICES = [
+        ('project', 'مشروع'),
+        ('task', 'مهمة'),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='+')
+    content = models.TextField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='search_entry_unique_object'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.object_id}"
+
+
+class VersionStamp(models.Model):
+    """
+    طابع إصدار لنطاق من البيانات (مثل project:5 أو user:3) يتغير مع كل كتابة تمسه،
+    وتُشتق منه ETag و Last-Modified للصفحات (انظر versioning.py).
+    """
+    scope = models.CharField(max_length=50, unique=True)
+    version = models.CharField(max_length=32)
+    updated_at = models.DateTimeField()
+
+    @classmethod
+    def project_version(cls, project_ref):
+        """ طابع النطاق project:<id> (نفس صيغة versioning.project_scope) كاستعلام فرعي """
+        scope = Concat(Value('project:'), Cast(project_ref, CharField()), output_field=CharField())
+        return Subquery(cls.objects.filter(scope=scope).values('version')[:1])
+
+    def __str__(self):
+        return f"{self.scope} @ {self.version}"
+
+
+
+class ArchivedProject(models.Model):
+    """
+    مشروع مكتمل نُقل من الجداول النشطة (انظر archive.py). يحتفظ بنفس المعرف
+    حتى تبقى الروابط صالحة عند الاستعادة.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=255, verbose_name='اسم المشروع')
+    description = models.TextField(blank=True, null=True, verbose_name='وصف المشروع')
+    status = models.CharField(max_length=20, choices=Project.STATUS_CHOICES, verbose_name='حالة المشروع')
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='+', verbose_name='منشئ المشروع')
+    created_at = models.DateTimeField(verbose_name='تاريخ الإنشاء')
+    completed_on = models.DateField(verbose_name='تاريخ الاكتمال')
+    archived_at = models.DateTimeField(auto_now_add=True, verbose_name='تاريخ الأرشفة')
+
+    class Meta:
+        ordering = ['-completed_on', '-id']
+        indexes = [
+            models.Index(fields=['title'], name='archived_title_prefix_idx', opclasses=['varchar_pattern_ops']),
+            models.Index(fields=['-completed_on', '-id'], name='archived_completed_idx'),
+        ]
+
+    def __str__(self):
+        return self.title
+
+
+class ArchivedTask(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    project = models.ForeignKey(ArchivedProject, on_delete=models.CASCADE, related_name='tasks')
+    task_name = models.CharField(max_length=50, choices=Task.TASK_CHOICES)
+    assigned_to = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='+')
+    status = models.CharField(max_length=20, choices=Task.STATUS_CHOICES)
+    start_date = models.DateField(null=True, blank=True)
+    end_date = models.DateField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['id']
+
+    def __str__(self):
+        return f"{self.task_name} ({self.status}) - {self.project.title}"
+
+
+
+class TaskEvent(models.Model):
+    """
+    سجل إلحاقي لانتقالات حالة المهام (انظر event_log.py): صف لكل تغيير حالة لا يُعدّل
+    ولا يُحذف. معرفا المهمة والمشروع قيم مجردة لا مفاتيح أجنبية، فيبقى السجل بعد حذف
+    المهمة أو أرشفتها، واسم المرحلة منسوخ فيه لنفس السبب.
+    """
+    task_id = models.BigIntegerField()
+    project_id = models.BigIntegerField()
+    task_name = models.CharField(max_length=50, choices=Task.TASK_CHOICES)
+    old_status = models.CharField(max_length=20, choices=Task.STATUS_CHOICES, null=True, blank=True)  # None عند الإنشاء
+    new_status = models.CharField(max_length=20, choices=Task.STATUS_CHOICES)
+    actor = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    assignee = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')  # مسؤول المهمة وقت الانتقال
+    occurred_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['occurred_at'], name='task_event_time_idx'),
+            models.Index(fields=['task_id', 'occurred_at'], name='task_event_task_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("سجل الانتقالات للإضافة فقط")
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"#{self.task_id} {self.old_status or '-'} → {self.new_status}"
+
+
+class DailyStat(models.Model):
+    """
+    ملخص يومي لانتقالات المهام لكل مستخدم (مسؤول المهمة) ولكل مرحلة، يُبنى من
+    TaskEvent بأمر rollup_stats (انظر rollups.py). تقارير الاتجاهات تقرأ من هنا
+    فتكلفتها بعدد الأيام لا بعدد المهام.
+    """
+    day = models.DateField()
+    # بلا قيد مفتاح أجنبي: يبقى تاريخ المستخدم المحذوف في الإجماليات
+    user = models.ForeignKey(
+        User, on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True, related_name='+'
+    )
+    task_name = models.CharField(max_length=50, choices=Task.TASK_CHOICES)
+    started = models.PositiveIntegerField(default=0)
+    completed = models.PositiveIntegerField(default=0)
+    held = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'user', 'task_name'], name='daily_stat_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'day'], name='daily_stat_user_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.task_name}"
+
+
+class RollupWatermark(models.Model):
+    """ آخر حدث (TaskEvent.id) دخل في ملخصات rollup_stats """
+    name = models.CharField(max_length=50, unique=True)
+    last_event_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name}: {self.last_event_id}"
+
+
+class TaskReminder(models.Model):
+    """
+    تذكير بمهمة تجاوزت موعد استحقاقها، يضيفه أمر scan_overdue (sla.py). القيد
+    الفريد (task, due_date) يمنع تكرار التذكير لنفس الموعد بين التشغيلات؛ المهمة
+    التي تُستأنف بموعد جديد تستحق تذكيرًا جديدًا. sent_at فارغ = في الطابور.
+    """
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='reminders')
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    due_date = models.DateField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['task', 'due_date'], name='task_reminder_unique'),
+        ]
+
+    def __str__(self):
+        return f"#{self.task_id} ({self.due_date})"
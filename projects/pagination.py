@@ -0,0 +1,92 @@
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import OperationalError, connections
+from django.db.models import QuerySet
+from django.utils.encoding import force_bytes
+from django.utils.functional import cached_property
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+
+def estimate_row_count(model, using='default'):
+    """
+    تقدير عدد صفوف الجدول دون COUNT(*):
+    - Postgres: من إحصاءات pg_class (يحدّثها ANALYZE / autovacuum)
+    - SQLite: من sqlite_stat1 إن وُجد (يحدّثه ANALYZE)؛ أكبر معرف ليس تقديرًا بعد الحذف أو الأرشفة
+    يرجع None إذا لم يتوفر تقدير.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [table])
+            row = cursor.fetchone()
+        elif connection.vendor == 'sqlite':
+            # أول رقم في stat هو عدد صفوف الجدول (لكل فهرس صف بنفس العدد)
+            try:
+                cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1", [table])
+            except OperationalError:
+                return None  # لم يُنفذ ANALYZE بعد فلا يوجد الجدول (لا يُفسد الخطأ المعاملة على SQLite)
+            row = cursor.fetchone()
+            row = row and (int(row[0].split()[0]),)
+        else:
+            return None
+
+    if not row or row[0] is None or row[0] < 0:  # reltuples = -1 قبل أول ANALYZE
+        return None
+    return row[0]
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    مُرقّم صفحات يستخدم العدد التقديري للجداول الكبيرة عندما لا يوجد أي فلتر،
+    ويعود إلى العدد الدقيق للجداول الصغيرة أو النتائج المفلترة.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if isinstance(queryset, QuerySet) and not queryset.query.where and not queryset.query.distinct:
+            estimate = estimate_row_count(queryset.model, using=queryset.db)
+            if estimate is not None and estimate > settings.ESTIMATED_COUNT_THRESHOLD:
+                return estimate
+        return super().count
+
+
+class CursorPaginator:
+    """
+    ترقيم بالمؤشر (keyset): كل صفحة WHERE key > آخر قيمة ORDER BY key LIMIT n،
+    فتبقى تكلفة الصفحة ثابتة مهما تقدم التصفح (بخلاف OFFSET) ولا تتكرر الصفوف
+    أو تُفقد عند إضافة بيانات أثناء التصفح. المفتاح عمود فريد مفهرس (id افتراضيًا).
+    يعمل مع values() (قواميس) ومع الكائنات.
+    """
+
+    def __init__(self, queryset, per_page, key='id'):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.key = key
+
+    @staticmethod
+    def encode_cursor(value):
+        return urlsafe_base64_encode(force_bytes(value))
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """ يرفع ValueError إذا كان المؤشر غير صالح """
+        try:
+            return int(urlsafe_base64_decode(cursor))
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"invalid cursor: {cursor!r}") from e
+
+    def page(self, cursor=None):
+        """ (صفوف الصفحة, مؤشر الصفحة التالية أو None) """
+        queryset = self.queryset.order_by(self.key)
+        if cursor:
+            queryset = queryset.filter(**{f'{self.key}__gt': self.decode_cursor(cursor)})
+        rows = list(queryset[:self.per_page + 1])  # صف إضافي لمعرفة وجود صفحة تالية دون COUNT
+
+        next_cursor = None
+        if len(rows) > self.per_page:
+            rows = rows[:self.per_page]
+            last = rows[-1]
+            next_cursor = self.encode_cursor(last[self.key] if isinstance(last, dict) else getattr(last, self.key))
+        return rows, next_cursor
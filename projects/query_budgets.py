@@ -0,0 +1,51 @@
+"""
+الحد الأقصى لعدد استعلامات قاعدة البيانات لكل رابط.
+
+تُختبر هذه الحدود في projects/tests.py بحجمين مختلفين من البيانات، ويجب أن
+يبقى العدد ثابتًا مهما زاد عدد الصفوف (لا استعلامات لكل صف).
+تُقاس الطلبات في الحالة المستقرة مع كاش مشترك (SHARED_CACHE): الجلسة والمستخدم وصلاحياته
+في الكاش (auth_backends.py).
+عند إضافة رابط جديد في projects/urls.py يجب إضافة حده هنا.
+"""
+
+QUERY_BUDGETS = {
+    'index': 5,
+    'login': 0,
+    'logout': 2,
+    'profile': 0,
+
+    'user_list': 1,
+    'user_create': 0,
+    'user_update': 4,
+    'user_delete': 1,
+
+    'project_list': 2,
+    'project_detail': 3,
+    'project_create': 0,
+    'project_update': 12,
+    'project_delete': 8,
+
+    'archive_list': 3,
+    'archive_detail': 2,
+    'archive_restore': 17,
+    'reports': 5,
+
+    'task_list': 2,
+    'task_events': 0,
+    'search': 3,
+    'send_whatsapp': 0,
+
+    'data_portal': 0,
+    'export_all_data': 16,
+    'import_all_data': 7,
+    'health_check': 1,
+
+    'api_project_list': 2,
+    'api_task_list': 2,
+    'api_my_task_list': 2,
+
+    # صفحات لوحة الإدارة
+    'admin:projects_project_changelist': 3,  # التقدير ثم COUNT(*) إذا كان الجدول صغيرًا أو بلا إحصاءات
+    'admin:projects_task_changelist': 3,
+    'admin:projects_userprofile_changelist': 3,
+}
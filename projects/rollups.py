@@ -0,0 +1,120 @@
+"""
+ملخصات يومية لإنتاجية المستخدمين والمراحل (DailyStat) من سجل الانتقالات.
+
+rollup() يقرأ الأحداث بعد آخر معرف مُلخَّص (RollupWatermark) فقط ليعرف الأيام التي
+وصلتها أحداث جديدة، ثم يعيد حساب تلك الأيام وحدها من TaskEvent (بفهرس occurred_at)
+ويستبدل صفوفها. التشغيل الدوري (أمر rollup_stats من cron) يعالج إذن اليوم الجاري
+وأي يوم وصلته أحداث متأخرة، والنتيجة واحدة مهما تكرر التشغيل.
+
+الحدث الذي حصل على معرفه قبل العلامة ولم تُثبَّت معاملته إلا بعدها يدخل عند إعادة
+حساب يومه؛ لذلك يُعاد حساب اليوم الجاري والسابق في كل تشغيل فيه أحداث جديدة.
+
+اليوم بحسب TIME_ZONE، والمستخدم هو مسؤول المهمة وقت الانتقال (TaskEvent.assignee).
+التقارير (monthly_trend و user_totals) تقرأ من DailyStat فقط، فتكلفة تقرير سنة
+بعدد الأيام لا بعدد المهام.
+"""
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Count, Max, Q, Sum
+from django.db.models.functions import TruncDate, TruncMonth
+from django.utils import timezone
+
+from .models import DailyStat, RollupWatermark, TaskEvent
+
+WATERMARK = 'daily_stats'
+
+# الحالة الجديدة ← عمود الملخص
+COUNTED = {'قيد التنفيذ': 'started', 'مكتمل': 'completed', 'معلق': 'held'}
+FIELDS = list(COUNTED.values())
+
+
+def _runs(days, max_days):
+    """ تجميع الأيام المتتالية في نطاقات [أول يوم، آخر يوم] لا يتجاوز طولها max_days """
+    runs = []
+    for day in sorted(days):
+        if runs and day == runs[-1][1] + timedelta(days=1) and (day - runs[-1][0]).days < max_days:
+            runs[-1][1] = day
+        else:
+            runs.append([day, day])
+    return runs
+
+
+def rebuild_days(first, last):
+    """ إعادة حساب ملخصات الأيام من first إلى last (شاملًا) وإرجاع عدد الصفوف """
+    start = timezone.make_aware(datetime.combine(first, time.min))
+    end = timezone.make_aware(datetime.combine(last + timedelta(days=1), time.min))
+    rows = (
+        TaskEvent.objects.filter(occurred_at__gte=start, occurred_at__lt=end, new_status__in=COUNTED)
+        .annotate(day=TruncDate('occurred_at'))
+        .values('day', 'assignee_id', 'task_name')
+        .annotate(**{field: Count('id', filter=Q(new_status=status)) for status, field in COUNTED.items()})
+        .order_by()
+    )
+    with transaction.atomic():
+        DailyStat.objects.filter(day__range=(first, last)).delete()
+        stats = DailyStat.objects.bulk_create([
+            DailyStat(
+                day=row['day'], user_id=row['assignee_id'], task_name=row['task_name'],
+                **{field: row[field] for field in FIELDS},
+            )
+            for row in rows
+        ], batch_size=1000)
+    return len(stats)
+
+
+def rollup(full=False, max_days=31):
+    """ تلخيص الأيام التي وصلتها أحداث منذ التشغيل السابق وإرجاع عدد الأيام المعاد حسابها """
+    watermark, _ = RollupWatermark.objects.get_or_create(name=WATERMARK)
+    if full:
+        watermark.last_event_id = 0
+    last_id = TaskEvent.objects.aggregate(last=Max('id'))['last'] or 0
+    if last_id <= watermark.last_event_id:
+        return 0
+
+    days = set(
+        TaskEvent.objects.filter(id__gt=watermark.last_event_id, id__lte=last_id)
+        .annotate(day=TruncDate('occurred_at')).values_list('day', flat=True).distinct()
+    )
+    today = timezone.localdate()
+    days.update({today, today - timedelta(days=1)})
+    for first, last in _runs(days, max_days):
+        rebuild_days(first, last)
+
+    watermark.last_event_id = last_id
+    watermark.save()
+    return len(days)
+
+
+def last_rollup():
+    return RollupWatermark.objects.filter(name=WATERMARK).values_list('updated_at', flat=True).first()
+
+
+def _since(months):
+    """ أول يوم في آخر months شهرًا (مع الشهر الجاري) """
+    today = timezone.localdate()
+    month = today.year * 12 + today.month - months
+    return today.replace(year=month // 12, month=month % 12 + 1, day=1)
+
+
+def _sums():
+    return {field: Sum(field) for field in FIELDS}
+
+
+def monthly_trend(months=12, user_id=None):
+    """ مجموع كل شهر لكل مرحلة: [{month, task_name, started, completed, held}] """
+    stats = DailyStat.objects.filter(day__gte=_since(months))
+    if user_id is not None:
+        stats = stats.filter(user_id=user_id)
+    return list(
+        stats.annotate(month=TruncMonth('day'))
+        .values('month', 'task_name').annotate(**_sums()).order_by('month', 'task_name')
+    )
+
+
+def user_totals(months=12):
+    """ مجموع كل مستخدم خلال الفترة مرتبًا بعدد المهام المكتملة """
+    return list(
+        DailyStat.objects.filter(day__gte=_since(months))
+        .values('user_id', 'user__username').annotate(**_sums()).order_by('-completed', 'user_id')
+    )
@@ -0,0 +1,79 @@
+"""
+توجيه قراءات صفحات القراءة الثقيلة إلى نسخة القراءة (replica).
+
+تُقرأ صفحات REPLICA_READ_VIEWS (القوائم والتفاصيل ولوحة التحكم والتصدير) من
+REPLICA_DATABASE بطلبات GET/HEAD، وكل ما عداها (الكتابة، النماذج، الجلسات) من
+قاعدة البيانات الأساسية. بعد أي طلب كتابة (POST وغيره) يُضبط كوكي لمدة
+REPLICA_PIN_SECONDS تُقرأ خلالها صفحات هذا المستخدم من الأساسية، حتى يرى تغييره
+فورًا رغم تأخر النسخ.
+
+بدون REPLICA_DATABASE (الافتراضي) لا يغير الموجّه شيئًا.
+"""
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.decorators import sync_and_async_middleware
+
+PIN_COOKIE = 'primary_pin'
+
+# الطلب الحالي؛ ينتقل مع السياق إلى خيوط sync_to_async (مثل async_views.gather_queries)
+_current_request = ContextVar('replica_routing_request', default=None)
+
+# الجلسات تُكتب عند الدخول وتُقرأ في كل طلب، فتبقى على الأساسية دائمًا
+PRIMARY_ONLY_APPS = {'sessions'}
+
+
+def reads_from_replica(request):
+    if not settings.REPLICA_DATABASE or request is None or request.resolver_match is None:
+        return False
+    return (
+        request.method in ('GET', 'HEAD')
+        and request.resolver_match.view_name in settings.REPLICA_READ_VIEWS
+        and PIN_COOKIE not in request.COOKIES
+    )
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label in PRIMARY_ONLY_APPS:
+            return DEFAULT_DB_ALIAS
+        if reads_from_replica(_current_request.get()):
+            return settings.REPLICA_DATABASE
+        return None
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True  # نفس البيانات في القاعدتين
+
+
+def _pin_after_write(request, response):
+    if settings.REPLICA_DATABASE and request.method not in ('GET', 'HEAD', 'OPTIONS', 'TRACE'):
+        response.set_cookie(
+            PIN_COOKIE, '1', max_age=settings.REPLICA_PIN_SECONDS, httponly=True, samesite='Lax',
+        )
+    return response
+
+
+@sync_and_async_middleware
+def replica_routing_middleware(get_response):
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            token = _current_request.set(request)
+            try:
+                response = await get_response(request)
+            finally:
+                _current_request.reset(token)
+            return _pin_after_write(request, response)
+    else:
+        def middleware(request):
+            token = _current_request.set(request)
+            try:
+                response = get_response(request)
+            finally:
+                _current_request.reset(token)
+            return _pin_after_write(request, response)
+    return middleware
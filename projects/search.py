@@ -0,0 +1,191 @@
+"""
+البحث النصي في المشاريع والمهام عبر فهرس معكوس.
+
+كل مشروع وكل مهمة يمثلهما صف في SearchEntry يحتوي نصًا موحدًا (normalize_arabic)،
+ويُفهرس هذا النص حسب قاعدة البيانات:
+- SQLite: جدول FTS5 خارجي المحتوى تحدّثه triggers (انظر migration 0005)
+- Postgres: فهرس GIN على to_tsvector('simple', content)
+- غير ذلك: بحث icontains احتياطي بدون ترتيب بالصلة
+يُحدّث الفهرس تدريجيًا عند الحفظ (signals.py) ويمكن إعادة بنائه بالأمر rebuild_search_index.
+"""
+import re
+
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import Q
+
+from .models import Project, SearchEntry, Task
+
+FTS_TABLE = 'projects_searchentry_fts'
+
+# التشكيل (الحركات والتنوين والشدة والسكون) والألف الخنجرية وعلامات المصحف والتطويل
+_DIACRITICS = re.compile('[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]')
+_FOLDING = str.maketrans({
+    '\u0623': '\u0627',  # أ → ا
+    '\u0625': '\u0627',  # إ → ا
+    '\u0622': '\u0627',  # آ → ا
+    '\u0671': '\u0627',  # ٱ → ا
+    '\u0649': '\u064a',  # ى → ي
+    '\u0629': '\u0647',  # ة → ه
+})
+_TOKEN = re.compile(r'\w+')
+
+
+def normalize_arabic(text):
+    """ توحيد الكتابة العربية: حذف التشكيل والتطويل، وتوحيد الألف والياء والتاء المربوطة """
+    if not text:
+        return ''
+    return _DIACRITICS.sub('', text).translate(_FOLDING).lower()
+
+
+def tokenize(text):
+    return _TOKEN.findall(normalize_arabic(text))
+
+
+def project_content(project):
+    return normalize_arabic(f"{project.title} {project.description or ''}")
+
+
+def task_content(task):
+    parts = [task.task_name, task.project.title]
+    if task.assigned_to_id:
+        user = task.assigned_to
+        parts += [user.username, user.first_name, user.last_name]
+    return normalize_arabic(' '.join(part for part in parts if part))
+
+
+def _upsert(entries):
+    SearchEntry.objects.bulk_create(
+        entries,
+        update_conflicts=True,
+        unique_fields=['kind', 'object_id'],
+        update_fields=['project', 'content'],
+    )
+
+
+def index_projects(project_ids):
+    """ تحديث فهرس المشاريع ومهامها (عنوان المشروع جزء من نص كل مهمة) """
+    projects = Project.objects.filter(pk__in=project_ids)
+    _upsert([
+        SearchEntry(kind='project', object_id=project.pk, project=project, content=project_content(project))
+        for project in projects
+    ])
+    index_tasks(Task.objects.filter(project__in=project_ids).values_list('pk', flat=True))
+
+
+def index_tasks(task_ids, batch_size=1000):
+    task_ids = list(task_ids)
+    for start in range(0, len(task_ids), batch_size):
+        tasks = Task.objects.filter(pk__in=task_ids[start:start + batch_size]).select_related('project', 'assigned_to')
+        _upsert([
+            SearchEntry(kind='task', object_id=task.pk, project_id=task.project_id, content=task_content(task))
+            for task in tasks
+        ])
+
+
+def remove_task(task_id):
+    SearchEntry.objects.filter(kind='task', object_id=task_id).delete()
+
+
+def rebuild_index(batch_size=2000):
+    """ إعادة بناء الفهرس بالكامل على دفعات (بعد الاستيراد أو التوليد بـ bulk_create) """
+    SearchEntry.objects.all().delete()
+    project_ids = list(Project.objects.order_by('pk').values_list('pk', flat=True))
+    for start in range(0, len(project_ids), batch_size):
+        index_projects(project_ids[start:start + batch_size])
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+    return SearchEntry.objects.count()
+
+
+class SearchResults:
+    """
+    نتائج بحث مرتبة بالصلة تُجلب صفحةً بصفحة (LIMIT/OFFSET) بحيث يمكن تمريرها لـ Paginator.
+    كل عنصر قاموس: kind و object (Project أو Task) و score.
+    """
+
+    def __init__(self, query):
+        self.terms = tokenize(query)
+
+    def _fts_sql(self):
+        if connection.vendor == 'sqlite':
+            match = ' '.join(f'"{term}"*' for term in self.terms)
+            return (
+                f"FROM {FTS_TABLE} JOIN projects_searchentry e ON e.id = {FTS_TABLE}.rowid "
+                f"WHERE {FTS_TABLE} MATCH %s",
+                [match],
+                f"bm25({FTS_TABLE})",  # الأصغر أفضل
+            )
+        if connection.vendor == 'postgresql':
+            tsquery = ' & '.join(f'{term}:*' for term in self.terms)
+            return (
+                "FROM projects_searchentry e "
+                "WHERE to_tsvector('simple', e.content) @@ to_tsquery('simple', %s)",
+                [tsquery],
+                "-ts_rank(to_tsvector('simple', e.content), to_tsquery('simple', %s))",
+            )
+        return None
+
+    def _fallback_queryset(self):
+        query = Q()
+        for term in self.terms:
+            query &= Q(content__icontains=term)
+        return SearchEntry.objects.filter(query).order_by('kind', '-object_id')
+
+    def count(self):
+        if not self.terms:
+            return 0
+        fts = self._fts_sql()
+        if fts is None:
+            return self._fallback_queryset().count()
+        sql, params, _ = fts
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) {sql}", params)
+            return cursor.fetchone()[0]
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            raise TypeError("SearchResults supports slicing only")
+        if not self.terms:
+            return []
+        offset, limit = index.start or 0, index.stop - (index.start or 0)
+
+        fts = self._fts_sql()
+        if fts is None:
+            rows = [
+                (kind, object_id, 0.0)
+                for kind, object_id in self._fallback_queryset().values_list('kind', 'object_id')[offset:index.stop]
+            ]
+        else:
+            sql, params, rank = fts
+            rank_params = params if '%s' in rank else []
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"SELECT e.kind, e.object_id, {rank} AS score {sql} ORDER BY score, e.id LIMIT %s OFFSET %s",
+                    rank_params + params + [limit, offset],
+                )
+                rows = cursor.fetchall()
+        return self._hydrate(rows)
+
+    def _hydrate(self, rows):
+        """ جلب كائنات الصفحة الحالية فقط باستعلام واحد لكل نوع """
+        project_ids = [object_id for kind, object_id, _ in rows if kind == 'project']
+        task_ids = [object_id for kind, object_id, _ in rows if kind == 'task']
+        projects = Project.objects.select_related('created_by').in_bulk(project_ids) if project_ids else {}
+        tasks = Task.objects.select_related('project', 'assigned_to').in_bulk(task_ids) if task_ids else {}
+
+        results = []
+        for kind, object_id, score in rows:
+            obj = (projects if kind == 'project' else tasks).get(object_id)
+            if obj is not None:
+                results.append({'kind': kind, 'object': obj, 'score': score})
+        return results
+
+
+def search(query, page=1, per_page=20):
+    """ صفحة من نتائج البحث مرتبة بالصلة """
+    return Paginator(SearchResults(query), per_page).get_page(page)
@@ -0,0 +1,217 @@
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.models import Group, User
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import cycle_times, event_log, events, search, versioning
+from .auth_backends import invalidate_users
+from .models import Project, Task, UserProfile, VersionStamp
+
+
+# تحديث فهرس البحث تدريجيًا عند الحفظ والحذف
+@receiver(post_save, sender=Project)
+def index_project(sender, instance, update_fields=None, **kwargs):
+    """ نتجاهل الحفظ الذي لا يغير العنوان أو الوصف (مثل تغيير الحالة في transitions.py) """
+    if update_fields is not None and not {'title', 'description'} & set(update_fields):
+        return
+    search.index_projects([instance.pk])
+
+
+@receiver(post_save, sender=Task)
+def index_task(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not {'task_name', 'project', 'assigned_to'} & set(update_fields):
+        return
+    search.index_tasks([instance.pk])
+
+
+@receiver(post_delete, sender=Task)
+def unindex_task(sender, instance, origin=None, **kwargs):
+    # عند حذف المشروع تُحذف مدخلات مهامه مع مدخلته (CASCADE على SearchEntry.project)
+    if isinstance(origin, Project):
+        return
+    search.remove_task(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def index_assigned_tasks(sender, instance, update_fields=None, created=False, **kwargs):
+    """ اسم المسؤول جزء من نص المهمة؛ نتجاهل الحفظ الذي لا يغير الاسم (مثل last_login عند الدخول) """
+    if created or (update_fields is not None and not {'username', 'first_name', 'last_name'} & set(update_fields)):
+        return
+    search.index_tasks(Task.objects.filter(assigned_to=instance).values_list('pk', flat=True))
+
+
+# طوابع الإصدار للطلبات الشرطية (versioning.py)
+@receiver(post_save, sender=Project)
+@receiver(pre_delete, sender=Project)  # قبل الحذف ما دامت المهام موجودة لمعرفة مسؤوليها
+def bump_project(sender, instance, **kwargs):
+    versioning.bump_projects([instance.pk])
+
+
+@receiver(pre_save, sender=Task)
+def remember_previous_state(sender, instance, raw=False, **kwargs):
+    """ عند تغيير المسؤول تتغير قائمة مهام المسؤول السابق أيضًا، وتغيير الحالة يُسجل في TaskEvent """
+    instance._previous_assignee_id = instance._previous_status = None
+    if instance.pk and not raw:
+        instance._previous_assignee_id, instance._previous_status = (
+            Task.objects.filter(pk=instance.pk).values_list('assigned_to_id', 'status').first() or (None, None)
+        )
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def bump_task(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, Project):
+        return  # غيّر pre_delete للمشروع الطوابع مسبقًا
+    users = {instance.assigned_to_id, getattr(instance, '_previous_assignee_id', None)} - {None}
+    versioning.bump(
+        [versioning.PROJECTS_SCOPE, versioning.project_scope(instance.project_id)]
+        + [versioning.user_scope(pk) for pk in users]
+    )
+
+
+# سجل الانتقالات لما يمر عبر Task.save (النماذج ولوحة الإدارة)؛ transitions.py يسجل تحديثاته بنفسه
+@receiver(post_save, sender=Task)
+def log_task_transition(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        # الاستيراد لا يسجل أحداثًا، فلا يغير completions_version وحده
+        cycle_times.invalidate()
+        return
+    previous = None if created else getattr(instance, '_previous_status', None)
+    if created or previous != instance.status:
+        event_log.record(instance, previous, instance.status)
+
+
+# إشعار المسؤولين الحاليين والسابقين مباشرة (SSE، انظر events.py)
+@receiver(post_save, sender=Task)
+def publish_task(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous_assignee_id', None)
+    events.publish_tasks([instance])
+    if previous and previous != instance.assigned_to_id:
+        events.publish_on_commit([previous], 'refresh', {'project_ids': [instance.project_id]})
+
+
+@receiver(post_save, sender=User)
+def bump_user(sender, instance, update_fields=None, created=False, **kwargs):
+    if created:
+        return
+    if update_fields is not None and not {'username', 'first_name', 'last_name'} & set(update_fields):
+        versioning.bump([versioning.user_scope(instance.pk)])
+        return
+    # الاسم يظهر في صفحات المشاريع التي أنشأها أو أُسندت إليه مهامها
+    project_ids = (
+        Project.objects.filter(Q(created_by=instance) | Q(tasks__assigned_to=instance))
+        .values_list('pk', flat=True).distinct()
+    )
+    versioning.bump_projects(project_ids, [instance.pk])
+
+
+def _permission_users(instance, action, model, pk_set):
+    """ معرفات المستخدمين الذين تتغير صلاحياتهم بتغيير علاقة مجموعات أو صلاحيات، أو None """
+    if action not in ('post_add', 'post_remove', 'pre_clear', 'post_clear'):
+        return None
+    if isinstance(instance, User):
+        return {instance.pk}
+    if model is User:  # instance مجموعة أو صلاحية، و pk_set معرفات المستخدمين
+        if action == 'post_clear':
+            return None  # بعد الحذف لا نعرف من كانت له العلاقة
+        return set(pk_set) if action != 'pre_clear' else set(instance.user_set.values_list('pk', flat=True))
+    if isinstance(instance, Group):  # صلاحيات المجموعة: كل أعضائها
+        return set(instance.user_set.values_list('pk', flat=True))
+    # instance صلاحية، و pk_set معرفات المجموعات
+    if action == 'post_clear':
+        return None
+    groups = instance.group_set.all() if action == 'pre_clear' else pk_set
+    return set(User.objects.filter(groups__in=groups).values_list('pk', flat=True))
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+@receiver(m2m_changed, sender=Group.permissions.through)
+def bump_user_permissions(sender, instance, action, model, pk_set=None, **kwargs):
+    """ الصلاحيات تحدد روابط القائمة الجانبية """
+    user_ids = _permission_users(instance, action, model, pk_set)
+    if user_ids:
+        versioning.bump([versioning.user_scope(pk) for pk in user_ids])
+
+
+@receiver(pre_delete, sender=Group)
+def bump_group_users(sender, instance, **kwargs):
+    versioning.bump([versioning.user_scope(pk) for pk in instance.user_set.values_list('pk', flat=True)])
+
+
+# كاش المستخدم وصلاحياته (auth_backends.py)
+@receiver(post_save, sender=User)  # يشمل الإنشاء: قد يُعاد استخدام معرف مستخدم محذوف
+@receiver(post_delete, sender=User)
+def invalidate_user(sender, instance, **kwargs):
+    invalidate_users([instance.pk])
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def invalidate_profile_user(sender, instance, **kwargs):
+    invalidate_users([instance.user_id])
+
+
+@receiver(pre_delete, sender=Group)
+def invalidate_group_users(sender, instance, **kwargs):
+    invalidate_users(instance.user_set.values_list('pk', flat=True))
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+@receiver(m2m_changed, sender=Group.permissions.through)
+def invalidate_permission_users(sender, instance, action, model, pk_set=None, **kwargs):
+    user_ids = _permission_users(instance, action, model, pk_set)
+    if user_ids:
+        invalidate_users(user_ids)
+
+
+# أجزاء التصدير المخزنة (data_export.py): كل كتابة على نموذج منها تغيّر طابعه
+EXPORT_CACHED = [apps.get_model(label) for label in settings.EXPORT_CACHED_MODELS]
+
+
+def _export_dependents(model):
+    """ النماذج المخزنة التي تحوي علاقات many-to-many إلى model (يتغير جزؤها عند حذفه) """
+    return [
+        other for other in EXPORT_CACHED
+        if any(field.related_model is model for field in other._meta.many_to_many)
+    ]
+
+
+def bump_export(sender, **kwargs):
+    models = [sender] + (_export_dependents(sender) if kwargs.get('signal') is post_delete else [])
+    versioning.bump([versioning.export_scope(model._meta.label_lower) for model in models])
+
+
+# جدول العلاقة ← النموذج الذي يُسلسل الحقل ضمن كائناته
+EXPORT_M2M_OWNERS = {
+    field.remote_field.through: model for model in EXPORT_CACHED for field in model._meta.many_to_many
+}
+
+
+def bump_export_relations(sender, action, **kwargs):
+    if action.startswith('post_'):
+        bump_export(EXPORT_M2M_OWNERS[sender])
+
+
+for model in EXPORT_CACHED:
+    post_save.connect(bump_export, sender=model)
+    post_delete.connect(bump_export, sender=model)
+for through in EXPORT_M2M_OWNERS:
+    m2m_changed.connect(bump_export_relations, sender=through)
+
+
+def bump_export_after_migrate(sender, using=DEFAULT_DB_ALIAS, **kwargs):
+    """
+    migrate ينشئ الصلاحيات وأنواع المحتوى بـ bulk_create دون إشارات الحفظ. مربوط بتطبيق
+    projects فقط (apps.py)، ويُتخطى إذا لم يُنشأ جدول الطوابع بعد (migrate auth على قاعدة
+    جديدة أو الرجوع بتهجيرات projects إلى ما قبله).
+    """
+    if VersionStamp._meta.db_table not in connections[using].introspection.table_names():
+        return
+    versioning.bump([versioning.export_scope(model._meta.label_lower) for model in EXPORT_CACHED])
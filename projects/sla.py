@@ -0,0 +1,69 @@
+"""
+مواعيد استحقاق المهام (SLA) وفحص المتأخرة.
+
+لكل مرحلة مدة في TASK_SLA_DAYS، وموعد الاستحقاق (Task.due_date) هو تاريخ البدء
+مضافًا إليه المدة، ويُضبط في كل مكان يبدأ مهمة (Task.save و transitions.py و seed_data).
+
+الفهرس (status, due_date) يجعل فحص المتأخرة في scan_overdue استعلامات نطاق تكلفتها
+بعدد المهام المتأخرة لا بعدد المهام كلها. تُقرأ المتأخرة صفحةً بعد صفحة بالمفتاح
+(due_date, pk) وتُضاف تذكيرات كل صفحة (TaskReminder) في معاملتها، فلا تتجاوز الذاكرة
+صفحة واحدة مهما زاد عددها. القيد الفريد (task, due_date) يمنع التكرار بين التشغيلات وبين تشغيلين
+متزامنين.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, DateField, Q, Value, When
+from django.utils import timezone
+
+from .models import Task, TaskReminder
+
+
+def due_date_case(start_date):
+    """ موعد الاستحقاق لتحديث جماعي يبدأ مهامًا من مراحل مختلفة في تاريخ start_date """
+    return Case(
+        *[
+            When(task_name=name, then=Value(start_date + timedelta(days=days)))
+            for name, days in settings.TASK_SLA_DAYS.items()
+        ],
+        default=Value(None),
+        output_field=DateField(),
+    )
+
+
+def overdue_tasks(today=None):
+    today = today or timezone.localdate()
+    return Task.objects.filter(status='قيد التنفيذ', due_date__lt=today)
+
+
+def queue_reminders(rows):
+    """ rows: (pk, assigned_to_id, due_date) → عدد التذكيرات الجديدة """
+    existing = set(
+        TaskReminder.objects.filter(task_id__in=[pk for pk, _, _ in rows]).values_list('task_id', 'due_date')
+    )
+    reminders = [
+        TaskReminder(task_id=pk, user_id=user_id, due_date=due_date)
+        for pk, user_id, due_date in rows
+        if (pk, due_date) not in existing
+    ]
+    # ignore_conflicts لتشغيل متزامن أضاف نفس التذكير بين القراءة والإدراج
+    TaskReminder.objects.bulk_create(reminders, ignore_conflicts=True)
+    return len(reminders)
+
+
+def scan_overdue(chunk_size=500, today=None):
+    """ إضافة تذكير لكل مهمة متأخرة لم تُذكَّر بموعدها الحالي → (عدد المتأخرة، عدد التذكيرات الجديدة) """
+    queryset = overdue_tasks(today).order_by('due_date', 'pk').values_list('pk', 'assigned_to_id', 'due_date')
+    total = queued = 0
+    page = queryset
+    while True:
+        rows = list(page[:chunk_size])
+        if rows:
+            total += len(rows)
+            with transaction.atomic():
+                queued += queue_reminders(rows)
+        if len(rows) < chunk_size:
+            return total, queued
+        last_pk, _, last_due_date = rows[-1]
+        page = queryset.filter(Q(due_date__gt=last_due_date) | Q(due_date=last_due_date, pk__gt=last_pk))
@@ -0,0 +1,75 @@
+"""
+قياس تكلفة بدء العامل (cold start): استيراد الإعدادات والتطبيقات وملف الروابط كما
+يفعل كل عامل gunicorn قبل أول طلب.
+
+القياس في عملية Python جديدة (الاستيرادات في العملية الحالية محملة مسبقًا): تشغيل
+عادي للزمن وذروة الذاكرة (ru_maxrss) والوحدات المحملة، وتشغيل ثانٍ مع -X importtime
+لأبطأ الاستيرادات (يضيف importtime تكلفة فلا يُحسب زمنه). STARTUP_BUDGET هو الحد
+الذي يتحقق منه الاختبار.
+"""
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+
+STARTUP_BUDGET = {
+    'seconds': 1.5,
+    'peak_memory_kb': 80 * 1024,
+}
+
+# تكاملات اختيارية تُحمل عند أول استخدام فقط
+LAZY_MODULES = ('twilio', 'webbrowser')
+
+_BOOT = """
+import json, resource, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+from django.urls import get_resolver
+get_resolver().url_patterns  # الروابط والعروض والنماذج ولوحة الإدارة
+seconds = time.perf_counter() - started
+print(json.dumps({
+    'seconds': seconds,
+    'peak_memory_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,  # Linux: بالكيلوبايت
+    'modules': sorted(name.split('.')[0] for name in sys.modules),
+}))
+"""
+
+
+def parse_importtime(stderr):
+    """ أسطر -X importtime ← {الوحدة: الزمن التراكمي بالميكروثانية} """
+    cumulative = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, total, name = line[len('import time:'):].split('|')
+        if total.strip().isdigit():  # سطر العناوين ليس رقمًا
+            cumulative[name.strip()] = int(total)
+    return cumulative
+
+
+def _boot(settings_module, *options):
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings_module or os.environ.get(
+        'DJANGO_SETTINGS_MODULE', settings.SETTINGS_MODULE,
+    ))
+    return subprocess.run(
+        [sys.executable, *options, '-c', _BOOT],
+        capture_output=True, text=True, env=env, cwd=settings.BASE_DIR, check=True,
+    )
+
+
+def measure_cold_start(settings_module=None, importtime=True):
+    """ {seconds, peak_memory_kb, modules, imports_us} لعامل جديد """
+    result = _boot(settings_module)
+    stats = json.loads(result.stdout.strip().splitlines()[-1])
+    stats['modules'] = sorted(set(stats['modules']))
+    stats['imports_us'] = parse_importtime(_boot(settings_module, '-X', 'importtime').stderr) if importtime else {}
+    return stats
+
+
+def slowest_imports(imports_us, prefixes=('tasks_manager', 'projects'), top=20):
+    """ أبطأ استيرادات المشروع (الزمن التراكمي يشمل ما تستورده الوحدة) """
+    own = [(name, us) for name, us in imports_us.items() if name.split('.')[0] in prefixes]
+    return sorted(own, key=lambda item: -item[1])[:top]
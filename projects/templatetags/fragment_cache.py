@@ -0,0 +1,42 @@
+from django import template
+
+from projects.fragments import get_or_render
+
+register = template.Library()
+
+
+class VersionedFragmentNode(template.Node):
+    def __init__(self, nodelist, name, version, vary_on):
+        self.nodelist = nodelist
+        self.name = name
+        self.version = version
+        self.vary_on = vary_on
+
+    def render(self, context):
+        version = self.version.resolve(context)
+        vary_on = [var.resolve(context) for var in self.vary_on]
+        return get_or_render(self.name, version, vary_on, lambda: self.nodelist.render(context))
+
+
+@register.tag
+def versioned_fragment(parser, token):
+    """
+    {% versioned_fragment 'project_card' project.version project.pk %} ... {% endversioned_fragment %}
+
+    الوسيط الأول اسم الجزء، والثاني طابع الإصدار، والبقية تميّز الجزء (مثل المعرف).
+    """
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' يتطلب اسم الجزء وطابع الإصدار على الأقل")
+    name = bits[1]
+    if not (name[0] == name[-1] and name[0] in ('"', "'")):
+        raise template.TemplateSyntaxError(f"اسم الجزء في '{bits[0]}' يجب أن يكون نصًا بين علامتي تنصيص")
+
+    nodelist = parser.parse(('endversioned_fragment',))
+    parser.delete_first_token()
+    return VersionedFragmentNode(
+        nodelist,
+        name[1:-1],
+        parser.compile_filter(bits[2]),
+        [parser.compile_filter(bit) for bit in bits[3:]],
+    )
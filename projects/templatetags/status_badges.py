@@ -0,0 +1,51 @@
+"""
+ألوان شارات الحالة ونسبة الإنجاز.
+
+بدل سلسلة {% if %}/{% elif %} تُقيَّم لكل صف، الخريطة محسوبة مرة واحدة عند تحميل
+المكتبة: status_badge_class بحث واحد في قاموس، و status_badge يُرجع الشارة كاملة
+من HTML مُعد مسبقًا لكل حالة معروفة.
+
+    {% load status_badges %}
+    <span class="badge {{ project.status|status_badge_class }}">{{ project.status }}</span>
+    {{ task.status|status_badge }}
+"""
+from django import template
+from django.utils.html import format_html
+
+register = template.Library()
+
+STATUS_BADGE_CLASSES = {
+    'قيد التنفيذ': 'bg-warning text-dark',
+    'مكتمل': 'bg-success',
+    'معلق': 'bg-danger',
+}
+DEFAULT_BADGE_CLASS = 'bg-secondary'
+
+STATUS_BADGES = {
+    status: format_html('<span class="badge {}">{}</span>', css_class, status)
+    for status, css_class in STATUS_BADGE_CLASSES.items()
+}
+
+# (الحد الأدنى لنسبة الإنجاز، اللون) من الأعلى للأدنى
+COMPLETION_RATE_CLASSES = ((80, 'bg-success'), (50, 'bg-warning'), (0, 'bg-danger'))
+
+
+@register.filter
+def status_badge_class(status):
+    return STATUS_BADGE_CLASSES.get(status, DEFAULT_BADGE_CLASS)
+
+
+@register.filter
+def status_badge(status):
+    badge = STATUS_BADGES.get(status)
+    if badge is None:
+        badge = format_html('<span class="badge {}">{}</span>', DEFAULT_BADGE_CLASS, status)
+    return badge
+
+
+@register.filter
+def completion_rate_class(rate):
+    for minimum, css_class in COMPLETION_RATE_CLASSES:
+        if (rate or 0) >= minimum:
+            return css_class
+    return COMPLETION_RATE_CLASSES[-1][1]
@@ -1,3 +1,1742 @@
-from django.test import TestCase
+import asyncio
+import importlib
+import json
+import os
+import threading
+import tempfile
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time, timedelta
+from io import StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.apps import apps
+from django.conf import settings
+from django.contrib.admin import helpers
+from django.contrib.auth.models import Group, Permission, User
+from django.contrib.sessions.models import Session
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.sql import emit_post_migrate_signal
+from django.db import OperationalError, connection
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.template import engines
+from django.test.utils import CaptureQueriesContext
+from django.urls import clear_url_caches, get_resolver, resolve, reverse
+from django.utils import timezone
+
+from . import (
+    archive, async_views, benchmarks, cycle_times, data_export, event_log, events, health, rollups, routers, search,
+    signals, sla, startup, transitions, versioning, warmup,
+)
+from .fragments import fragment_stats
+from .management.commands.stress_transitions import check_invariants, create_stress_projects, run_stress
+from .models import (
+    DESCRIPTION_PREVIEW_CHARS, ArchivedProject, ArchivedTask, DailyStat, Project, SearchEntry, Task, TaskEvent,
+    TaskReminder, UserProfile,
+)
+from .query_budgets import QUERY_BUDGETS
+from .templatetags.status_badges import completion_rate_class, status_badge, status_badge_class
+from .urls import urlpatterns
+from .views import SECRET_KEY
+
+# إعدادات الكاش المشترك (CACHE_DIR): الجلسة والمستخدم وصلاحياته من الكاش
+shared_cache_auth = override_settings(
+    SESSION_ENGINE='django.contrib.sessions.backends.cached_db',
+    AUTHENTICATION_BACKENDS=['projects.auth_backends.CachedModelBackend'],
+)
+
+
+class SeedDataTests(TestCase):
+    def test_seed_creates_requested_volume(self):
+        call_command('seed_data', users=3, projects=10, seed=1, stdout=StringIO())
+
+        self.assertEqual(User.objects.count(), 3)
+        self.assertEqual(Project.objects.count(), 10)
+        self.assertEqual(Task.objects.count(), 10 * len(Task.TASK_CHOICES))
+        self.assertFalse(Project.objects.with_version().filter(version__isnull=True).exists())  # مفاتيح كاش البطاقات
+        self.assertFalse(User.objects.filter(is_superuser=True).exists())
+
+        call_command('seed_data', users=1, projects=0, prefix='bench', admin=True, stdout=StringIO())
+        self.assertTrue(User.objects.get(username='bench_user_0').is_superuser)
+
+    def test_seeded_tasks_match_project_status(self):
+        call_command('seed_data', users=2, projects=30, seed=2, stdout=StringIO())
+
+        for project in Project.objects.prefetch_related('tasks'):
+            statuses = [task.status for task in project.tasks.all()]
+            if project.status == 'مكتمل':
+                self.assertEqual(set(statuses), {'مكتمل'})
+            elif project.status == 'قيد التنفيذ':
+                self.assertEqual(statuses.count('قيد التنفيذ'), 1)
+            elif project.status == 'معلق':
+                self.assertEqual(statuses.count('معلق'), 1)
+
+
+class BenchmarkTests(TestCase):
+    def test_run_view_benchmarks_covers_hot_views(self):
+        call_command('seed_data', users=2, projects=3, seed=3, admin=True, stdout=StringIO())
+        statuses = list(Task.objects.order_by('pk').values_list('pk', 'status'))
+
+        results = benchmarks.run_view_benchmarks(iterations=2)
+
+        self.assertEqual(set(results), {
+            'index', 'project_list', 'project_detail', 'project_update',
+            'task_list', 'task_complete', 'export', 'import',
+        })
+        for name, result in results.items():
+            self.assertLess(result['status_code'] or 200, 400, name)
+            self.assertIsNotNone(result['p50_ms'], name)
+        self.assertEqual(list(Task.objects.order_by('pk').values_list('pk', 'status')), statuses)
+
+    def test_compare_with_baseline_flags_regressions(self):
+        baseline = {'index': {'p50_ms': 10.0, 'p90_ms': 20.0, 'queries': 5, 'peak_memory_kb': 100}}
+        current = {'index': {'p50_ms': 11.0, 'p90_ms': 40.0, 'queries': 6, 'peak_memory_kb': 100}}
+
+        regressions = benchmarks.compare_with_baseline(current, baseline, tolerance=0.25)
+
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(any('p90_ms' in line for line in regressions))
+        self.assertTrue(any('queries' in line for line in regressions))
+
+    def test_percentile(self):
+        self.assertEqual(benchmarks.percentile([5, 1, 3, 2, 4], 50), 3)
+        self.assertEqual(benchmarks.percentile([5, 1, 3, 2, 4], 99), 5)
+        self.assertIsNone(benchmarks.percentile([], 50))
+
+
+@shared_cache_auth
+class QueryBudgetTests(TestCase):
+    """ التأكد من أن عدد الاستعلامات لكل رابط ثابت ولا يتجاوز الحد المحدد في query_budgets """
+
+    def _requests(self):
+        user = User.objects.get(username='seed_user_0')
+        other = User.objects.exclude(pk=user.pk).order_by('pk').first()
+        project = Project.objects.order_by('pk').first()
+        archived, restorable = Project.objects.order_by('-pk').values_list('pk', flat=True)[:2]
+        Project.objects.filter(pk__in=[archived, restorable]).update(status='مكتمل')
+        archive.archive_batch({archived: date(2024, 1, 1), restorable: date(2024, 1, 1)})
+        rollups.rollup()
+        key = f'?key={SECRET_KEY}'
+        payload = json.dumps({'projects.project': [{
+            'model': 'projects.project', 'pk': 10**6,
+            'fields': {'title': 'مستورد', 'description': '', 'status': 'لم يبدأ بعد',
+                       'created_by': None, 'created_at': '2025-01-01T00:00:00Z'},
+        }]}).encode()
+
+        return user, {
+            'index': ('get', reverse('index'), None),
+            'login': ('get', reverse('login'), None),
+            'logout': ('get', reverse('logout'), None),
+            'profile': ('get', reverse('profile'), None),
+            'user_list': ('get', reverse('user_list'), None),
+            'user_create': ('get', reverse('user_create'), None),
+            'user_update': ('get', reverse('user_update', args=[other.pk]), None),
+            'user_delete': ('get', reverse('user_delete', args=[other.pk]), None),
+            'project_list': ('get', reverse('project_list'), None),
+            'project_detail': ('get', reverse('project_detail', args=[project.pk]), None),
+            'project_create': ('get', reverse('project_create'), None),
+            'project_update': ('get', reverse('project_update', args=[project.pk]), None),
+            'project_delete': ('post', reverse('project_delete', args=[project.pk]), {}),
+            'archive_list': ('get', reverse('archive_list'), None),
+            'archive_detail': ('get', reverse('archive_detail', args=[archived]), None),
+            'archive_restore': ('post', reverse('archive_restore', args=[restorable]), {}),
+            'reports': ('get', reverse('reports'), None),
+            'task_list': ('get', reverse('task_list'), None),
+            'task_events': ('get', reverse('task_events'), None),
+            'search': ('get', reverse('search') + '?q=المونتاج', None),
+            'api_project_list': ('get', reverse('api_project_list'), None),
+            'api_task_list': ('get', reverse('api_task_list') + '?fields=id,project,assigned_to', None),
+            'api_my_task_list': ('get', reverse('api_my_task_list'), None),
+            'send_whatsapp': ('get', reverse('send_whatsapp', args=['966500000000', 'مرحبا']), None),
+            'data_portal': ('get', reverse('data_portal') + key, None),
+            'export_all_data': ('get', reverse('export_all_data') + key, None),
+            'import_all_data': ('post', reverse('import_all_data') + key,
+                                lambda: {'file': SimpleUploadedFile('backup.json', payload)}),
+            'health_check': ('get', reverse('health_check') + key, None),
+            'admin:projects_project_changelist': ('get', reverse('admin:projects_project_changelist'), None),
+            'admin:projects_task_changelist': ('get', reverse('admin:projects_task_changelist'), None),
+            'admin:projects_userprofile_changelist': ('get', reverse('admin:projects_userprofile_changelist'), None),
+        }
+
+    def _measure(self, size):
+        cache.clear()  # أجزاء التصدير المخزنة من القياس السابق (data_export.py)
+        Project.objects.all().delete()
+        User.objects.all().delete()
+        call_command('seed_data', users=size, projects=size, seed=size, admin=True, stdout=StringIO())
+
+        user, requests = self._requests()
+        counts = {}
+        for name, (method, url, data) in requests.items():
+            client = Client()
+            client.force_login(user)
+            client.get(reverse('profile'))  # الحالة المستقرة: الجلسة والمستخدم وصلاحياته في الكاش
+            data = data() if callable(data) else data
+            with CaptureQueriesContext(connection) as queries:
+                response = getattr(client, method)(url, data or {})
+            self.assertLess(response.status_code, 400, name)
+            counts[name] = len(queries)
+        return counts
+
+    def test_every_url_has_a_budget(self):
+        names = {pattern.name for pattern in urlpatterns if pattern.name}
+        self.assertEqual(names - set(QUERY_BUDGETS), set())
+
+    def test_query_counts_are_constant_and_within_budget(self):
+        small = self._measure(3)
+        large = self._measure(15)
+
+        self.assertEqual(set(small), set(QUERY_BUDGETS))
+        for name, budget in QUERY_BUDGETS.items():
+            with self.subTest(name):
+                self.assertEqual(small[name], large[name], f"{name}: queries grow with rows ({small[name]} → {large[name]})")
+                self.assertLessEqual(large[name], budget, f"{name}: {large[name]} queries, budget {budget}")
+
+
+class TransitionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('editor', password='password')
+        self.project = Project.objects.create(title='مشروع', created_by=self.user)
+        self.project.tasks.update(assigned_to=self.user)
+        self.first = self.project.tasks.order_by('id').first()
+        self.first.status = 'قيد التنفيذ'
+        self.first.save()
+
+    def test_complete_starts_next_stage(self):
+        result = transitions.complete_task(self.first, self.user)
+
+        self.assertTrue(result.changed)
+        self.assertEqual(result.next_task.task_name, Task.TASK_CHOICES[1][0])
+        self.assertEqual(result.next_task.status, 'قيد التنفيذ')
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.status, 'قيد التنفيذ')
+        self.assertEqual(check_invariants([self.project.pk]), [])
+
+    def test_bulk_complete_starts_next_stage_not_lowest_id(self):
+        # مهمة المرحلة الثانية أُعيد إنشاؤها فصار معرفها أكبر من معرفات المراحل التالية
+        second_stage = Task.TASK_CHOICES[1][0]
+        self.project.tasks.filter(task_name=second_stage).delete()
+        Task.objects.create(project=self.project, task_name=second_stage, assigned_to=self.user, status='لم يبدأ بعد')
+
+        transitions.bulk_set_status(self.project.tasks.filter(pk=self.first.pk), 'مكتمل', self.user)
+
+        started = self.project.tasks.get(status='قيد التنفيذ')
+        self.assertEqual(started.task_name, second_stage)
+
+    def test_stale_duplicate_complete_is_a_noop(self):
+        stale = Task.objects.get(pk=self.first.pk)
+        transitions.complete_task(self.first, self.user)
+
+        result = transitions.complete_task(stale, self.user)
+
+        self.assertFalse(result.changed)
+        self.assertEqual(self.project.tasks.filter(status='قيد التنفيذ').count(), 1)
+        self.assertEqual(check_invariants([self.project.pk]), [])
+
+    def test_hold_then_complete_all(self):
+        transitions.hold_task(self.first, self.user)
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.status, 'معلق')
+
+        for _ in Task.TASK_CHOICES:
+            task = self.project.tasks.filter(status__in=['قيد التنفيذ', 'معلق']).first()
+            result = transitions.complete_task(task, self.user)
+
+        self.assertTrue(result.project_completed)
+        self.assertEqual(Project.objects.get(pk=self.project.pk).status, 'مكتمل')
+        self.assertEqual(check_invariants([self.project.pk]), [])
+
+    def test_task_list_post_completes_task(self):
+        self.client.force_login(self.user)
+
+        response = self.client.post(reverse('task_list'), {'task_id': self.first.pk, 'action': 'complete'})
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Task.objects.get(pk=self.first.pk).status, 'مكتمل')
+
+
+class StressTransitionTests(TransactionTestCase):
+    def test_concurrent_transitions_keep_invariants(self):
+        project_ids = create_stress_projects(3)
+
+        report = run_stress(project_ids, threads=4, max_operations=60, seed=1)
+
+        self.assertEqual(report['violations'], [])
+        self.assertEqual(report['error_count'], 0, report['errors'])
+        self.assertGreater(report['changed'], 0)
+
+    def test_exhausted_lock_retries_count_as_errors(self):
+        project_ids = create_stress_projects(1)
+
+        with mock.patch.object(transitions, 'complete_task', side_effect=OperationalError('database is locked')):
+            report = run_stress(project_ids, threads=2, hold_ratio=0, max_operations=4, seed=1)
+
+        self.assertEqual(report['error_count'], 4)
+        self.assertEqual(report['changed'], 0)
+
+
+class ConcurrencyBenchmarkTests(TransactionTestCase):
+    def test_compares_wsgi_and_asgi_paths(self):
+        call_command('seed_data', users=2, projects=3, seed=3, admin=True, stdout=StringIO())
+
+        results = benchmarks.run_concurrency_benchmarks(concurrency=3, requests=6, worker_threads=2)
+
+        self.assertEqual(set(results), {'wsgi', 'asgi'})
+        for path, result in results.items():
+            self.assertEqual(result['statuses'], {'200': 6}, path)
+            self.assertIsNotNone(result['throughput_rps'], path)
+
+
+class AdminPerformanceModeTests(TestCase):
+    def setUp(self):
+        call_command('seed_data', users=3, projects=5, seed=4, admin=True, stdout=StringIO())
+        self.client.force_login(User.objects.get(username='seed_user_0'))
+
+    @override_settings(ESTIMATED_COUNT_THRESHOLD=1)
+    def test_unfiltered_changelist_uses_estimated_count(self):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        total = Task.objects.count()
+        Task.objects.filter(pk=Task.objects.order_by('-pk').first().pk).delete()  # الإحصاءات لا تتغير حتى ANALYZE التالي
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('admin:projects_task_changelist'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(any('COUNT(' in query['sql'] for query in queries.captured_queries))
+        self.assertEqual(response.context['cl'].result_count, total)
+
+    @override_settings(ESTIMATED_COUNT_THRESHOLD=1)
+    def test_missing_statistics_fall_back_to_exact_count(self):
+        Task.objects.filter(pk=Task.objects.order_by('-pk').first().pk).delete()
+
+        response = self.client.get(reverse('admin:projects_task_changelist'))
+
+        self.assertEqual(response.context['cl'].result_count, Task.objects.count())
+
+    def test_filtered_count_is_exact_without_full_count(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('admin:projects_task_changelist'), {'status__exact': 'مكتمل'})
+
+        self.assertEqual(response.context['cl'].result_count, Task.objects.filter(status='مكتمل').count())
+        self.assertEqual(sum('COUNT(' in query['sql'] for query in queries.captured_queries), 1)
+
+    def test_search_matches_whole_title_prefix(self):
+        project = Project.objects.order_by('pk').first()
+
+        response = self.client.get(reverse('admin:projects_task_changelist'), {'q': project.title})
+
+        tasks = list(response.context['cl'].result_list)
+        self.assertEqual({task.project_id for task in tasks}, {project.pk})
+
+    def test_search_is_case_insensitive_prefix(self):
+        response = self.client.get(reverse('admin:projects_task_changelist'), {'q': 'SEED_USER_1'})
+
+        tasks = list(response.context['cl'].result_list)
+        self.assertTrue(tasks)
+        self.assertEqual({task.assigned_to.username for task in tasks}, {'seed_user_1'})
+        self.assertContains(response, 'وضع الأداء')
+
+    @override_settings(ADMIN_PERFORMANCE_MODE=False)
+    def test_performance_mode_can_be_disabled(self):
+        response = self.client.get(reverse('admin:projects_project_changelist'), {'q': 'مشروع'})
+
+        self.assertEqual(response.context['cl'].result_count, Project.objects.count())
+
+
+class AdminBulkActionTests(TestCase):
+    def setUp(self):
+        call_command('seed_data', users=3, projects=6, seed=5, admin=True, stdout=StringIO())
+        self.admin = User.objects.get(username='seed_user_0')
+        self.client.force_login(self.admin)
+
+    def _action(self, url_name, action, queryset, **extra):
+        return self.client.post(reverse(url_name), {
+            'action': action,
+            helpers.ACTION_CHECKBOX_NAME: [obj.pk for obj in queryset],
+            **extra,
+        })
+
+    def test_complete_projects_is_set_based(self):
+        projects = Project.objects.exclude(status='مكتمل')
+
+        with CaptureQueriesContext(connection) as queries:
+            self._action('admin:projects_project_changelist', 'complete_projects', projects)
+
+        self.assertFalse(Task.objects.exclude(status='مكتمل').exists())
+        self.assertFalse(Project.objects.exclude(status='مكتمل').exists())
+        self.assertLess(len(queries), 16)  # ثابت مهما كان عدد المهام، مع إدراج أحداثها دفعة واحدة
+
+    def test_mark_completed_starts_next_stage_once_per_project(self):
+        active = Task.objects.filter(status='قيد التنفيذ')
+        project_ids = set(active.values_list('project_id', flat=True))
+
+        self._action('admin:projects_task_changelist', 'mark_completed', active)
+
+        self.assertEqual(check_invariants(project_ids), [])
+
+    def test_mark_held_holds_projects(self):
+        active = Task.objects.filter(status='قيد التنفيذ')
+        project_ids = set(active.values_list('project_id', flat=True))
+
+        self._action('admin:projects_task_changelist', 'mark_held', active)
+
+        self.assertEqual(set(Project.objects.filter(pk__in=project_ids).values_list('status', flat=True)), {'معلق'})
+
+    def test_reassign_tasks_with_intermediate_page(self):
+        tasks = list(Task.objects.exclude(assigned_to=self.admin).order_by('pk')[:4])
+        confirm = self._action('admin:projects_task_changelist', 'reassign_tasks', tasks)
+        self.assertContains(confirm, 'تأكيد الإسناد')
+
+        self._action('admin:projects_task_changelist', 'reassign_tasks', tasks, apply='1', assigned_to=self.admin.pk)
+
+        self.assertEqual(Task.objects.filter(pk__in=[t.pk for t in tasks], assigned_to=self.admin).count(), 4)
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('مُحرِّر', password='password')
+        self.project = Project.objects.create(
+            title='سلسلة الإدارة المالية', description='حلقات تعليمية عن المحاسبة', created_by=self.user,
+        )
+        self.project.tasks.filter(task_name='المونتاج').update(assigned_to=self.user)
+        search.index_projects([self.project.pk])
+
+    def _results(self, query):
+        return list(search.search(query))
+
+    def test_normalize_arabic(self):
+        self.assertEqual(search.normalize_arabic('إِدارَةُ أحمد مدرسة إلى آخر'), 'اداره احمد مدرسه الي اخر')
+
+    def test_search_folds_alef_taa_marbuta_and_diacritics(self):
+        results = self._results('الادارَه')
+
+        self.assertIn(('project', self.project), [(r['kind'], r['object']) for r in results])
+
+    def test_search_matches_prefix_of_description(self):
+        self.assertEqual(len(self._results('المحاسب')), 1)
+
+    def test_search_tasks_by_stage_and_assignee(self):
+        results = self._results('المونتاج محرر')
+
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]['object'].task_name, 'المونتاج')
+
+    def test_index_updates_incrementally_on_save(self):
+        self.project.title = 'برنامج الطبخ'
+        self.project.save()
+
+        self.assertEqual(self._results('المالية'), [])
+        self.assertEqual(len(self._results('الطبخ')), 1 + len(Task.TASK_CHOICES))
+
+    def test_status_only_saves_skip_reindexing(self):
+        task = self.project.tasks.order_by('id').first()
+        with mock.patch.object(search, 'index_tasks') as index_tasks:
+            self.project.save(update_fields=['status'])
+            task.save(update_fields=['status', 'start_date'])
+            index_tasks.assert_not_called()
+
+            self.project.save(update_fields=['status', 'title'])
+            task.save(update_fields=['assigned_to'])
+        self.assertEqual(index_tasks.call_count, 2)
+
+    def test_deleted_task_leaves_the_index(self):
+        task = self.project.tasks.get(task_name='المونتاج')
+        task.delete()
+
+        self.assertEqual(self._results('المونتاج محرر'), [])
+
+    def test_search_view_paginates(self):
+        self.client.force_login(self.user)
+
+        response = self.client.get(reverse('search'), {'q': 'الادارة'})
+
+        self.assertEqual(response.context['page_obj'].paginator.count, 1 + len(Task.TASK_CHOICES))
+        self.assertContains(response, 'سلسلة الإدارة المالية')
+
+
+@shared_cache_auth
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('editor', password='password')
+        self.other = User.objects.create_user('reviewer', password='password')
+        self.project = Project.objects.create(title='مشروع', created_by=self.user)
+        self.project.tasks.update(assigned_to=self.user)
+        self.client.force_login(self.user)
+
+    def _revalidate(self, url):
+        self.client.get(url)  # أول زيارة تضبط كوكي CSRF
+        first = self.client.get(url)
+        return first, self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+
+    def test_unchanged_pages_return_304_without_page_queries(self):
+        for url in (reverse('project_list'), reverse('project_detail', args=[self.project.pk]), reverse('task_list')):
+            with self.subTest(url):
+                first, _ = self._revalidate(url)
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+
+                self.assertEqual(response.status_code, 304)
+                self.assertIn('Last-Modified', first)
+                self.assertLessEqual(len(queries), 1)  # الطوابع فقط؛ الجلسة والمستخدم من الكاش
+
+    def test_transition_changes_project_and_task_pages(self):
+        urls = [reverse('project_list'), reverse('project_detail', args=[self.project.pk]), reverse('task_list')]
+        etags = {url: self._revalidate(url)[0]['ETag'] for url in urls}
+
+        task = self.project.tasks.order_by('id').first()
+        task.status = 'قيد التنفيذ'
+        task.save()
+        transitions.complete_task(task, self.user)
+
+        for url in urls:
+            with self.subTest(url):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+                self.assertEqual(response.status_code, 200)
+
+    def test_reassign_changes_previous_assignee_task_list(self):
+        first, _ = self._revalidate(reverse('task_list'))
+
+        transitions.bulk_reassign(self.project.tasks.all(), self.other)
+
+        response = self.client.get(reverse('task_list'), HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['grouped_tasks'], {})
+
+    def test_group_changes_member_pages(self):
+        group = Group.objects.create(name='المحررون')
+        permission = Permission.objects.get(codename='view_user')
+        self.user.groups.add(group)
+        url = reverse('project_list')
+        changes = [
+            lambda: group.permissions.add(permission),
+            permission.group_set.clear,
+            lambda: group.user_set.remove(self.user),
+            lambda: group.user_set.add(self.user),
+            group.delete,
+        ]
+
+        for i, change in enumerate(changes):
+            first, _ = self._revalidate(url)
+            change()
+            with self.subTest(i):
+                self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 200)
+
+    def test_other_project_does_not_change_project_page(self):
+        url = reverse('project_detail', args=[self.project.pk])
+        first, _ = self._revalidate(url)
+
+        Project.objects.create(title='مشروع آخر', created_by=self.other)
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+
+    def test_etag_differs_per_user(self):
+        url = reverse('project_list')
+        first, _ = self._revalidate(url)
+
+        self.client.force_login(self.other)
+        _, response = self._revalidate(url)
+        self.assertNotEqual(response['ETag'], first['ETag'])
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 200)
+
+    def test_pending_messages_bypass_conditional_response(self):
+        first, _ = self._revalidate(reverse('task_list'))
+        task = self.project.tasks.order_by('id').first()
+        Task.objects.filter(pk=task.pk).update(status='قيد التنفيذ')
+
+        response = self.client.post(reverse('task_list'), {'task_id': task.pk, 'action': 'hold'})
+        self.assertEqual(response.status_code, 302)
+
+        # حتى لو لم يتغير شيء آخر تُعرض الصفحة كاملة لإظهار الرسالة
+        response = self.client.get(reverse('task_list'), HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('ETag', response)
+
+
+class FragmentCacheTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('editor', password='password')
+        self.projects = [Project.objects.create(title=f'مشروع {i}', created_by=self.user) for i in range(3)]
+        Task.objects.update(assigned_to=self.user)
+        versioning.bump_projects([project.pk for project in self.projects])
+        self.client.force_login(self.user)
+        fragment_stats.reset()
+
+    def test_unchanged_cards_are_served_from_cache(self):
+        first = self.client.get(reverse('project_list'))
+        self.assertEqual((fragment_stats.hits, fragment_stats.misses), (0, 3))
+
+        second = self.client.get(reverse('project_list'))
+        self.assertEqual((fragment_stats.hits, fragment_stats.misses), (3, 3))
+        for project in self.projects:
+            self.assertContains(second, project.title)
+        self.assertEqual(first.content.count(b'card-header'), second.content.count(b'card-header'))
+
+    def test_only_changed_project_is_rendered_again(self):
+        self.client.get(reverse('project_list'))
+        self.projects[0].title = 'مشروع معدل'
+        self.projects[0].save()
+        fragment_stats.reset()
+
+        response = self.client.get(reverse('project_list'))
+
+        self.assertEqual((fragment_stats.hits, fragment_stats.misses), (2, 1))
+        self.assertContains(response, 'مشروع معدل')
+
+    def test_task_items_follow_project_version(self):
+        self.client.get(reverse('task_list'))
+        task = self.projects[1].tasks.order_by('id').first()
+        Task.objects.filter(pk=task.pk).update(status='قيد التنفيذ', start_date='2025-03-01')
+        transitions.sync_projects([self.projects[1].pk])
+        fragment_stats.reset()
+
+        response = self.client.get(reverse('task_list'))
+
+        tasks_per_project = len(Task.TASK_CHOICES)
+        self.assertEqual(fragment_stats.misses, tasks_per_project)
+        self.assertEqual(fragment_stats.hits, 2 * tasks_per_project)
+        self.assertContains(response, '01-03-2025')
+
+    def test_csrf_token_is_not_cached(self):
+        self.client.get(reverse('project_list'))
+        other = Client()
+        other.force_login(self.user)
+
+        first = self.client.get(reverse('project_list'))
+        second = other.get(reverse('project_list'))
+
+        self.assertNotEqual(first.context['csrf_token'], second.context['csrf_token'])
+        self.assertContains(second, str(second.context['csrf_token']))
+
+    def test_file_based_backend(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+            'fragments': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': directory},
+        }):
+            self.client.get(reverse('project_detail', args=[self.projects[0].pk]))
+            response = self.client.get(reverse('project_detail', args=[self.projects[0].pk]))
+
+            self.assertEqual((fragment_stats.hits, fragment_stats.misses), (2, 2))
+            self.assertContains(response, self.projects[0].title)
+            self.assertTrue(os.listdir(directory))
+
+
+class ApiTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('editor', password='password')
+        self.projects = [Project.objects.create(title=f'مشروع {i}', created_by=self.user) for i in range(3)]
+        self.projects[0].tasks.update(assigned_to=self.user)
+        versioning.bump_projects([project.pk for project in self.projects])
+        self.client.force_login(self.user)
+
+    def test_requires_login(self):
+        response = Client().get(reverse('api_project_list'))
+
+        self.assertEqual(response.status_code, 401)
+
+    def test_sparse_fields(self):
+        response = self.client.get(reverse('api_project_list'), {'fields': 'title,current_task'})
+
+        self.assertEqual(response.json()['results'][0], {'title': 'مشروع 0', 'current_task': None})
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get(reverse('api_task_list'), {'fields': 'id,secret'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('secret', response.json()['error'])
+
+    def test_cursor_pagination_walks_all_rows_once(self):
+        url, params, seen = reverse('api_task_list'), {'fields': 'id', 'limit': 4}, []
+        while url:
+            data = self.client.get(url, params).json()
+            seen += [row['id'] for row in data['results']]
+            url, params = data['next'], None
+
+        self.assertEqual(seen, sorted(Task.objects.values_list('pk', flat=True)))
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('api_task_list'), {'cursor': '!!'})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_my_tasks_and_filters(self):
+        response = self.client.get(reverse('api_my_task_list'), {'project': self.projects[0].pk, 'fields': 'project,assigned_to'})
+
+        results = response.json()['results']
+        self.assertEqual(len(results), len(Task.TASK_CHOICES))
+        self.assertEqual(results[0], {'project': 'مشروع 0', 'assigned_to': 'editor'})
+        self.assertEqual(self.client.get(reverse('api_my_task_list'), {'project': self.projects[1].pk}).json()['results'], [])
+
+    def test_gzip_and_conditional_get(self):
+        url = reverse('api_task_list')
+        first = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(first['Content-Encoding'], 'gzip')
+
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+        Task.objects.filter(pk=self.projects[2].tasks.first().pk).update(status='قيد التنفيذ')
+        transitions.sync_projects([self.projects[2].pk])
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+
+
+class TaskEventTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('editor', password='password')
+        self.other = User.objects.create_user('reviewer', password='password')
+        self.project = Project.objects.create(title='مشروع', created_by=self.user)
+        self.project.tasks.update(assigned_to=self.user)
+        self.first, self.second = self.project.tasks.order_by('id')[:2]
+        Task.objects.filter(pk=self.second.pk).update(assigned_to=self.other)
+        Task.objects.filter(pk=self.first.pk).update(status='قيد التنفيذ')
+        self.first.refresh_from_db()
+
+    def test_broadcaster_delivers_across_threads(self):
+        broadcaster = events.Broadcaster()
+
+        async def listen():
+            subscription = broadcaster.subscribe(self.user.pk)
+            thread = threading.Thread(target=broadcaster.publish, args=([self.user.pk, self.other.pk], 'task', {'task_id': 1}))
+            thread.start()
+            message = await asyncio.wait_for(subscription[1].get(), 1)
+            thread.join()
+            broadcaster.unsubscribe(self.user.pk, subscription)
+            return message
+
+        message = asyncio.run(listen())
+
+        self.assertEqual((message['event'], message['data']), ('task', {'task_id': 1}))
+        self.assertEqual(broadcaster.connection_count(), 0)
+
+    def test_slow_consumer_keeps_latest_events(self):
+        broadcaster = events.Broadcaster(max_queue=2)
+
+        async def listen():
+            subscription = broadcaster.subscribe(self.user.pk)
+            for i in range(5):
+                broadcaster.publish([self.user.pk], 'task', {'task_id': i})
+            await asyncio.sleep(0)
+            queue = subscription[1]
+            return [queue.get_nowait()['data']['task_id'] for _ in range(queue.qsize())]
+
+        self.assertEqual(asyncio.run(listen()), [3, 4])
+
+    def test_complete_task_notifies_both_assignees_after_commit(self):
+        with mock.patch.object(events.broadcaster, 'publish') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                transitions.complete_task(self.first, self.user)
+                publish.assert_not_called()
+
+        published = {(tuple(call.args[0]), call.args[2]['task_id'], call.args[2]['status']) for call in publish.call_args_list}
+        self.assertEqual(published, {
+            ((self.user.pk,), self.first.pk, 'مكتمل'),
+            ((self.other.pk,), self.second.pk, 'قيد التنفيذ'),
+        })
+
+    def test_reassign_refreshes_previous_assignee(self):
+        with mock.patch.object(events.broadcaster, 'publish') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                transitions.bulk_reassign(Task.objects.filter(pk=self.first.pk), self.other)
+
+        user_ids, event, _ = publish.call_args.args
+        self.assertEqual(event, 'refresh')
+        self.assertEqual(set(user_ids), {self.user.pk, self.other.pk})
+
+    @override_settings(TASK_EVENTS_HEARTBEAT_SECONDS=1, TASK_EVENTS_MAX_SECONDS=5)
+    def test_stream_formats_events(self):
+        async def read():
+            stream = events.stream(self.user.pk)
+            chunks = [await anext(stream)]
+            events.broadcaster.publish([self.user.pk], 'task', {'task_name': 'المونتاج'})
+            chunks.append(await anext(stream))
+            await stream.aclose()
+            return chunks
+
+        retry, event = asyncio.run(read())
+
+        self.assertEqual(retry, f'retry: {events.RETRY_MS}\n\n')
+        self.assertIn('event: task\ndata: {"task_name": "المونتاج"}\n\n', event)
+        self.assertEqual(events.broadcaster.connection_count(), 0)
+
+    @override_settings(TASK_EVENTS_MAX_SECONDS=0)
+    async def test_endpoint(self):
+        response = await self.async_client.get(reverse('task_events'))
+        self.assertEqual(response.status_code, 403)
+
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse('task_events'))
+
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual([chunk async for chunk in response.streaming_content], [f'retry: {events.RETRY_MS}\n\n'.encode()])
+
+    def test_wsgi_disables_live_updates(self):
+        self.client.force_login(self.user)
+
+        self.assertEqual(self.client.get(reverse('task_events')).status_code, 204)
+        self.assertNotContains(self.client.get(reverse('task_list')), 'EventSource')
+
+    async def test_asgi_enables_live_updates(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse('task_list'))
+
+        self.assertContains(response, reverse('task_events'))
+
+@override_settings(ROOT_URLCONF='tasks_manager.asgi_urls')
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        call_command('seed_data', users=3, projects=4, seed=6, admin=True, stdout=StringIO())
+        self.user = User.objects.get(username='seed_user_0')
+        self.project = Project.objects.order_by('pk').first()
+
+    def test_asgi_urls_use_async_views(self):
+        resolved = {name: resolve(reverse(name, args=args)).func for name, args in (
+            ('index', []), ('task_list', []), ('project_detail', [self.project.pk]),
+        )}
+
+        self.assertEqual(resolved, {
+            'index': async_views.index,
+            'task_list': async_views.task_list,
+            'project_detail': async_views.project_detail,
+        })
+
+    async def test_index_matches_sync_dashboard(self):
+        await self.async_client.aforce_login(self.user)
+
+        response = await self.async_client.get(reverse('index'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['total_projects'], 4)
+        self.assertEqual(response.context['total_tasks'], 4 * len(Task.TASK_CHOICES))
+        self.assertEqual(len(response.context['user_task_stats']), 3)
+
+    async def test_login_required(self):
+        response = await self.async_client.get(reverse('task_list'))
+
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response['Location'].startswith('/login/'))
+
+    async def test_task_list_and_conditional_get(self):
+        await self.async_client.aforce_login(self.user)
+        url = reverse('task_list')
+
+        await self.async_client.get(url)
+        first = await self.async_client.get(url)
+        count = await Task.objects.filter(assigned_to=self.user).acount()
+        self.assertEqual(sum(len(tasks) for statuses in first.context['grouped_tasks'].values() for tasks in statuses.values()), count)
+
+        response = await self.async_client.get(url, headers={'If-None-Match': first['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+    async def test_task_list_post_uses_sync_transitions(self):
+        await self.async_client.aforce_login(self.user)
+        task = await Task.objects.filter(assigned_to=self.user, status='قيد التنفيذ').afirst()
+        if task is None:
+            task = await Task.objects.filter(assigned_to=self.user).afirst()
+            await Task.objects.filter(pk=task.pk).aupdate(status='قيد التنفيذ')
+
+        response = await self.async_client.post(reverse('task_list'), {'task_id': task.pk, 'action': 'hold'})
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual((await Task.objects.aget(pk=task.pk)).status, 'معلق')
+
+    async def test_project_detail(self):
+        await self.async_client.aforce_login(self.user)
+
+        response = await self.async_client.get(reverse('project_detail', args=[self.project.pk]))
+        missing = await self.async_client.get(reverse('project_detail', args=[10**6]))
+
+        self.assertContains(response, self.project.title)
+        self.assertEqual(missing.status_code, 404)
+
+    @override_settings(ASYNC_PARALLEL_QUERIES=True)
+    def test_gather_queries_runs_in_parallel(self):
+        barrier = threading.Barrier(2, timeout=5)  # ينجح فقط إذا نُفذت الدالتان في نفس الوقت
+
+        results = asyncio.run(async_views.gather_queries({
+            'a': lambda: (barrier.wait(), 'a')[1],
+            'b': lambda: (barrier.wait(), 'b')[1],
+        }))
+
+        self.assertEqual(results, {'a': 'a', 'b': 'b'})
+
+    def test_parallel_queries_default_to_pooled_connections_only(self):
+        import tasks_manager.settings as conf
+
+        env = {'DATABASE_URL': 'postgres://app@db/tasks', 'DB_POOL': 'False'}
+        with mock.patch.dict(os.environ, env):
+            os.environ.pop('ASYNC_PARALLEL_QUERIES', None)
+            parallel = importlib.reload(conf).ASYNC_PARALLEL_QUERIES
+        importlib.reload(conf)
+
+        self.assertFalse(parallel)  # بدون المجمع: اتصالات جديدة لكل استعلام
+
+    @override_settings(ASYNC_PARALLEL_QUERIES=True)
+    def test_gather_queries_releases_worker_connections(self):
+        main_thread = threading.get_ident()
+        closed_in = []
+
+        def close_all():
+            closed_in.append(threading.get_ident())
+
+        with mock.patch.object(async_views.connections, 'close_all', side_effect=close_all):
+            asyncio.run(async_views.gather_queries({'a': lambda: 1, 'b': lambda: 2}))
+            with self.assertRaises(ZeroDivisionError):
+                asyncio.run(async_views.gather_queries({'c': lambda: 1 / 0}))
+
+        self.assertEqual(len(closed_in), 3)  # حتى عند فشل الاستعلام
+        self.assertNotIn(main_thread, closed_in)
+
+
+@shared_cache_auth
+class AuthCacheTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('editor', password='password')
+        self.group = Group.objects.create(name='المحررون')
+        self.permission = Permission.objects.get(codename='view_user')
+        self.client.force_login(self.user)
+
+    def _user_list_status(self):
+        return self.client.get(reverse('user_list')).status_code
+
+    def test_process_local_cache_keeps_sessions_and_users_in_database(self):
+        with mock.patch.dict(os.environ, {'CACHE_DIR': ''}):
+            import tasks_manager.settings as conf
+            conf = importlib.reload(conf)
+
+        self.assertFalse(conf.SHARED_CACHE)
+        self.assertEqual(conf.SESSION_ENGINE, 'django.contrib.sessions.backends.db')
+        self.assertEqual(conf.AUTHENTICATION_BACKENDS, ['django.contrib.auth.backends.ModelBackend'])
+
+    def test_steady_state_needs_no_auth_queries(self):
+        self.client.get(reverse('profile'))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('profile'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(queries), 0)
+
+    def test_user_permission_change_invalidates_cache(self):
+        self.assertEqual(self._user_list_status(), 403)
+
+        self.user.user_permissions.add(self.permission)
+        self.assertEqual(self._user_list_status(), 200)
+
+        self.user.user_permissions.clear()
+        self.assertEqual(self._user_list_status(), 403)
+
+    def test_group_changes_invalidate_members(self):
+        self.user.groups.add(self.group)
+        self.assertEqual(self._user_list_status(), 403)
+
+        self.group.permissions.add(self.permission)
+        self.assertEqual(self._user_list_status(), 200)
+
+        self.permission.group_set.clear()
+        self.assertEqual(self._user_list_status(), 403)
+
+        self.group.permissions.add(self.permission)
+        self.assertEqual(self._user_list_status(), 200)
+        self.group.delete()
+        self.assertEqual(self._user_list_status(), 403)
+
+    def test_deactivated_user_is_logged_out(self):
+        self.client.get(reverse('profile'))
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.get(reverse('profile'))
+        self.assertEqual(response.status_code, 302)
+
+
+@override_settings(REPLICA_DATABASE='replica')
+class ReplicaRouterTests(SimpleTestCase):
+    def _read_database(self, method, url, model=Project, **cookies):
+        request = getattr(RequestFactory(), method)(url)
+        request.COOKIES.update(cookies)
+        seen = {}
+
+        def view(request):
+            request.resolver_match = resolve(request.path_info)
+            seen['db'] = routers.ReplicaRouter().db_for_read(model)
+            return HttpResponse()
+
+        response = routers.replica_routing_middleware(view)(request)
+        return seen['db'], response
+
+    def test_read_views_use_replica(self):
+        for url in (reverse('index'), reverse('project_list'), reverse('task_list'), reverse('api_task_list')):
+            with self.subTest(url):
+                self.assertEqual(self._read_database('get', url)[0], 'replica')
+
+    def test_other_requests_use_primary(self):
+        self.assertIsNone(self._read_database('get', reverse('user_list'))[0])
+        self.assertIsNone(self._read_database('post', reverse('task_list'))[0])
+        self.assertIsNone(self._read_database('get', reverse('project_list'), **{routers.PIN_COOKIE: '1'})[0])
+        self.assertEqual(self._read_database('get', reverse('project_list'), model=Session)[0], 'default')
+        self.assertIsNone(routers.ReplicaRouter().db_for_read(Project))  # خارج الطلب
+
+    def test_writes_pin_reads_to_primary(self):
+        _, response = self._read_database('post', reverse('task_list'))
+        self.assertEqual(response.cookies[routers.PIN_COOKIE]['max-age'], settings.REPLICA_PIN_SECONDS)
+
+        _, response = self._read_database('get', reverse('project_list'))
+        self.assertNotIn(routers.PIN_COOKIE, response.cookies)
+
+    @override_settings(REPLICA_DATABASE=None)
+    def test_disabled_without_replica(self):
+        db, response = self._read_database('post', reverse('project_list'))
+        self.assertIsNone(db)
+        self.assertNotIn(routers.PIN_COOKIE, response.cookies)
+
+
+@skipUnless(settings.REPLICA_DATABASE, "REPLICA_DATABASE_URL=sqlite:////tmp/replica.sqlite3 python manage.py test projects.tests.ReplicaRoutingTests")
+class ReplicaRoutingTests(TransactionTestCase):
+    """ قاعدتا SQLite منفصلتان دون نسخ بينهما، فيظهر مصدر كل قراءة في الصفحة """
+    databases = '__all__'
+
+    def setUp(self):
+        self.user = User.objects.create_superuser('admin', password='password')
+        User.objects.using('replica').bulk_create([User.objects.get(pk=self.user.pk)])  # نفس كلمة المرور لتبقى الجلسة صالحة
+        Project.objects.using('replica').bulk_create([Project(pk=10**6, title='مشروع في نسخة القراءة')])
+        self.client.force_login(self.user)
+
+    def test_reads_follow_replica_until_user_writes(self):
+        response = self.client.get(reverse('project_list'))
+        self.assertContains(response, 'مشروع في نسخة القراءة')
+
+        response = self.client.post(reverse('project_create'), {'title': 'مشروع جديد', 'description': ''})
+        self.assertIn(routers.PIN_COOKIE, response.cookies)
+
+        response = self.client.get(reverse('project_list'))
+        self.assertContains(response, 'مشروع جديد')
+        self.assertNotContains(response, 'مشروع في نسخة القراءة')
+
+    def test_parallel_export_reads_replica(self):
+        response = self.client.get(reverse('export_all_data') + f'?key={SECRET_KEY}&workers=2')
+        self.assertContains(response, 'مشروع في نسخة القراءة')
+
+    def test_pages_outside_read_views_use_primary(self):
+        response = self.client.get(reverse('project_update', args=[10**6]))
+        self.assertEqual(response.status_code, 404)
+
+
+class HealthCheckTests(TestCase):
+    def test_reports_every_database(self):
+        response = self.client.get(reverse('health_check'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['ok'])
+        self.assertEqual(set(response.json()['databases']), set(settings.DATABASES))
+        self.assertEqual(response.json()['databases']['default'], {'ok': True})
+
+    def test_pool_stats_require_key_and_pass_through_without_pool(self):
+        response = self.client.get(reverse('health_check') + f'?key={SECRET_KEY}')
+        self.assertIsNone(response.json()['databases']['default']['pool'])  # SQLite بدون مجمع
+
+    def test_unreachable_database_returns_503(self):
+        with mock.patch('projects.health.check_database', side_effect=lambda alias: {'ok': False, 'error': 'db.internal'}):
+            response = self.client.get(reverse('health_check'))
+            detailed = self.client.get(reverse('health_check') + f'?key={SECRET_KEY}')
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()['databases']['default'], {'ok': False})
+        self.assertNotContains(response, 'db.internal', status_code=503)
+        self.assertEqual(detailed.json()['databases']['default']['error'], 'db.internal')
+
+    def test_pool_saturation_and_wait_time(self):
+        pool = mock.Mock(max_size=4)
+        pool.get_stats.return_value = {
+            'pool_max': 4, 'pool_size': 4, 'pool_available': 1, 'requests_waiting': 2,
+            'requests_num': 10, 'requests_wait_ms': 55, 'requests_errors': 1,
+        }
+        with mock.patch.object(connection, 'pool', pool, create=True):
+            stats = health.pool_stats('default')
+
+        self.assertEqual(stats['saturation'], 0.75)
+        self.assertEqual(stats['avg_wait_ms'], 5.5)
+        self.assertEqual(stats['waiting'], 2)
+        self.assertEqual(stats['timeouts'], 1)
+
+
+class ArchiveTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_superuser('admin', password='password')
+        self.old = self._project('قديم مكتمل', 'مكتمل', days_ago=400)
+        self.recent = self._project('حديث مكتمل', 'مكتمل', days_ago=5)
+        self.active = self._project('قديم نشط', 'قيد التنفيذ', days_ago=400)
+        self.client.force_login(self.user)
+
+    def _project(self, title, status, days_ago):
+        project = Project.objects.create(title=title, created_by=self.user)
+        project.tasks.update(status=status, assigned_to=self.user, end_date=date.today() - timedelta(days=days_ago))
+        Project.objects.filter(pk=project.pk).update(status=status)
+        return project
+
+    def test_moves_only_old_completed_projects(self):
+        self.assertEqual(archive.archive_projects(days=180, dry_run=True), 1)
+        self.assertEqual(archive.archive_projects(days=180, batch_size=1), 1)
+
+        self.assertFalse(Project.objects.filter(pk=self.old.pk).exists())
+        self.assertFalse(Task.objects.filter(project_id=self.old.pk).exists())
+        self.assertFalse(SearchEntry.objects.filter(project_id=self.old.pk).exists())
+        archived = ArchivedProject.objects.get(pk=self.old.pk)
+        self.assertEqual(archived.completed_on, date.today() - timedelta(days=400))
+        self.assertEqual(archived.tasks.count(), len(Task.TASK_CHOICES))
+        self.assertEqual(Project.objects.count(), 2)
+
+    def test_batches_cover_all_projects(self):
+        self._project('قديم مكتمل 2', 'مكتمل', days_ago=300)
+        call_command('archive_projects', days=180, batch_size=1, stdout=StringIO())
+        self.assertEqual(ArchivedProject.objects.count(), 2)
+        self.assertEqual(ArchivedTask.objects.count(), 2 * len(Task.TASK_CHOICES))
+
+    def test_restore_keeps_ids_and_dates(self):
+        task_ids = set(self.old.tasks.values_list('pk', flat=True))
+        archive.archive_projects(days=180)
+
+        self.assertEqual(archive.restore_projects([self.old.pk]), 1)
+
+        project = Project.objects.get(pk=self.old.pk)
+        self.assertEqual(project.created_at, self.old.created_at)
+        self.assertEqual(set(project.tasks.values_list('pk', flat=True)), task_ids)
+        self.assertFalse(ArchivedProject.objects.exists())
+        self.assertFalse(ArchivedTask.objects.exists())
+        self.assertIn(self.old.pk, [result['object'].pk for result in search.search('قديم مكتمل', 1, 10)])
+
+    def test_archive_changes_project_list_version(self):
+        response = self.client.get(reverse('project_list'))
+        archive.archive_projects(days=180)
+
+        response = self.client.get(reverse('project_list'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, 'قديم مكتمل')
+
+    def test_read_only_views_and_restore(self):
+        archive.archive_projects(days=180)
+
+        response = self.client.get(reverse('archive_list') + '?q=قديم')
+        self.assertContains(response, 'قديم مكتمل')
+        response = self.client.get(reverse('archive_detail', args=[self.old.pk]))
+        self.assertContains(response, 'المونتاج')
+
+        response = self.client.post(reverse('archive_restore', args=[self.old.pk]))
+        self.assertRedirects(response, reverse('project_detail', args=[self.old.pk]))
+        self.assertEqual(self.client.post(reverse('archive_restore', args=[self.old.pk])).status_code, 404)
+
+    def test_archive_requires_permission(self):
+        other = User.objects.create_user('viewer', password='password')
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(reverse('archive_list')).status_code, 403)
+
+    def test_admin_actions(self):
+        self.client.post(reverse('admin:projects_project_changelist'), {
+            'action': 'archive_projects', helpers.ACTION_CHECKBOX_NAME: [self.recent.pk, self.active.pk],
+        })
+        self.assertEqual(list(ArchivedProject.objects.values_list('pk', flat=True)), [self.recent.pk])
+
+        self.client.post(reverse('admin:projects_archivedproject_changelist'), {
+            'action': 'restore_projects', helpers.ACTION_CHECKBOX_NAME: [self.recent.pk],
+        })
+        self.assertTrue(Project.objects.filter(pk=self.recent.pk).exists())
+
+
+class TransitionLogTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('editor', password='password')
+        self.project = Project.objects.create(title='مشروع', created_by=self.user)
+        self.project.tasks.update(assigned_to=self.user)
+        self.first, self.second = self.project.tasks.order_by('id')[:2]
+
+    def _events(self, **filters):
+        return list(
+            TaskEvent.objects.filter(**filters).order_by('id').values_list('task_id', 'old_status', 'new_status')
+        )
+
+    def test_new_tasks_are_logged(self):
+        self.assertEqual(
+            self._events(project_id=self.project.pk),
+            [(task.pk, None, 'لم يبدأ بعد') for task in self.project.tasks.order_by('id')],
+        )
+
+    def test_transitions_log_each_change_with_actor(self):
+        TaskEvent.objects.all().delete()
+        Task.objects.filter(pk=self.first.pk).update(status='قيد التنفيذ')
+        self.first.status = 'قيد التنفيذ'
+
+        transitions.hold_task(self.first, self.user)
+        transitions.complete_task(self.first, self.user)
+        transitions.complete_task(self.first, self.user)  # بلا تغيير: لا حدث
+
+        self.assertEqual(self._events(), [
+            (self.first.pk, 'قيد التنفيذ', 'معلق'),
+            (self.first.pk, 'معلق', 'مكتمل'),
+            (self.second.pk, 'لم يبدأ بعد', 'قيد التنفيذ'),
+        ])
+        self.assertEqual(set(TaskEvent.objects.values_list('actor_id', flat=True)), {self.user.pk})
+        self.assertEqual(set(TaskEvent.objects.values_list('assignee_id', flat=True)), {self.user.pk})
+
+    def test_task_save_logs_only_status_changes(self):
+        TaskEvent.objects.all().delete()
+        with event_log.acting_as(self.user):
+            self.first.status = 'قيد التنفيذ'
+            self.first.save()
+            self.first.save()
+
+        self.assertEqual(self._events(), [(self.first.pk, 'لم يبدأ بعد', 'قيد التنفيذ')])
+        self.assertEqual(TaskEvent.objects.get().actor, self.user)
+
+    def test_bulk_set_status_writes_events_in_one_insert(self):
+        Project.objects.create(title='مشروع آخر', created_by=self.user)
+        TaskEvent.objects.all().delete()
+
+        with CaptureQueriesContext(connection) as queries:
+            updated = transitions.bulk_set_status(Task.objects.all(), 'معلق', self.user)
+
+        inserts = [q for q in queries.captured_queries if 'INSERT INTO "projects_taskevent"' in q['sql']]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(TaskEvent.objects.filter(new_status='معلق', old_status='لم يبدأ بعد').count(), updated)
+
+    def test_batch_discards_events_on_error(self):
+        TaskEvent.objects.all().delete()
+        with self.assertRaises(RuntimeError), event_log.batch():
+            event_log.record(self.first, 'لم يبدأ بعد', 'قيد التنفيذ')
+            raise RuntimeError
+        self.assertFalse(TaskEvent.objects.exists())
+
+    def test_events_are_append_only(self):
+        event = TaskEvent.objects.first()
+        event.new_status = 'مكتمل'
+        with self.assertRaises(ValueError):
+            event.save()
+
+    def test_seeded_events_follow_task_dates(self):
+        TaskEvent.objects.all().delete()
+        call_command('seed_data', users=2, projects=10, seed=3, stdout=StringIO())
+
+        completed = Task.objects.filter(status='مكتمل')
+        self.assertEqual(TaskEvent.objects.filter(new_status='مكتمل').count(), completed.count())
+        for event in TaskEvent.objects.filter(new_status='مكتمل')[:5]:
+            self.assertEqual(timezone.localtime(event.occurred_at).date(), Task.objects.get(pk=event.task_id).end_date)
+
+
+class RollupTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('editor', password='password')
+        self.project = Project.objects.create(title='مشروع', created_by=self.user)
+        self.project.tasks.update(assigned_to=self.user)
+        self.first, self.second = self.project.tasks.order_by('id')[:2]
+        TaskEvent.objects.all().delete()
+        self.day = timezone.localdate() - timedelta(days=30)
+
+    def _record(self, task, new_status, day, hour=10):
+        at = timezone.make_aware(datetime.combine(day, time(hour)))
+        event_log.record(task, None, new_status, occurred_at=at)
+
+    def _stats(self):
+        return {
+            (stat.day, stat.user_id, stat.task_name): (stat.started, stat.completed, stat.held)
+            for stat in DailyStat.objects.all()
+        }
+
+    def test_rollup_counts_per_day_user_and_stage(self):
+        self._record(self.first, 'قيد التنفيذ', self.day, 9)
+        self._record(self.first, 'مكتمل', self.day, 15)
+        self._record(self.second, 'قيد التنفيذ', self.day, 23)  # آخر اليوم بالتوقيت المحلي
+        self._record(self.second, 'معلق', self.day + timedelta(days=1))
+
+        rollups.rollup()
+
+        self.assertEqual(self._stats(), {
+            (self.day, self.user.pk, self.first.task_name): (1, 1, 0),
+            (self.day, self.user.pk, self.second.task_name): (1, 0, 0),
+            (self.day + timedelta(days=1), self.user.pk, self.second.task_name): (0, 0, 1),
+        })
+
+    def test_rollup_only_rebuilds_days_with_new_events(self):
+        self._record(self.first, 'مكتمل', self.day)
+        rollups.rollup()
+        self.assertEqual(rollups.rollup(), 0)
+
+        late = self.day - timedelta(days=100)
+        self._record(self.second, 'مكتمل', late)
+        DailyStat.objects.filter(day=self.day).update(completed=99)  # يوم لم تصله أحداث: لا يُعاد حسابه
+
+        self.assertEqual(rollups.rollup(), 3)  # اليوم المتأخر + اليوم الجاري والسابق
+        stats = self._stats()
+        self.assertEqual(stats[late, self.user.pk, self.second.task_name], (0, 1, 0))
+        self.assertEqual(stats[self.day, self.user.pk, self.first.task_name], (0, 99, 0))
+
+        rollups.rollup(full=True)
+        self.assertEqual(self._stats()[self.day, self.user.pk, self.first.task_name], (0, 1, 0))
+
+    def test_reports_read_monthly_trend_from_rollups(self):
+        self._record(self.first, 'مكتمل', timezone.localdate())
+        rollups.rollup()
+        Task.objects.all().delete()  # التقرير لا يقرأ جدول المهام
+
+        admin = User.objects.create_superuser('admin', password='password')
+        self.client.force_login(admin)
+        response = self.client.get(reverse('reports'))
+
+        self.assertEqual(response.status_code, 200)
+        [month] = response.context['trend']
+        self.assertEqual(month['completed'], 1)
+        self.assertEqual(response.context['users'][0]['user__username'], 'editor')
+
+    def test_reports_require_permission(self):
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(reverse('reports')).status_code, 403)
+
+
+class CycleTimeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user('alice', password='password')
+        self.bob = User.objects.create_user('bob', password='password')
+        self.today = timezone.localdate()
+        self.project = Project.objects.create(title='مشروع', created_by=self.alice)
+        Task.objects.filter(project=self.project).delete()
+        # (المرحلة، المسؤول، المدة بالأيام)
+        durations = [('التسجيل', self.alice, days) for days in (1, 2, 3, 4, 10)]
+        durations += [('المونتاج', self.bob, 5), ('المونتاج', self.bob, 7)]
+        Task.objects.bulk_create([
+            Task(
+                project=self.project, task_name=name, assigned_to=user, status='مكتمل',
+                start_date=self.today - timedelta(days=days), end_date=self.today,
+            )
+            for name, user, days in durations
+        ])
+        # خارج الفترة أو غير مكتملة: لا تدخل في الإحصاءات
+        Task.objects.bulk_create([
+            Task(project=self.project, task_name='التسجيل', assigned_to=self.alice, status='مكتمل',
+                 start_date=self.today - timedelta(days=200), end_date=self.today - timedelta(days=100)),
+            Task(project=self.project, task_name='التسجيل', assigned_to=self.alice, status='قيد التنفيذ',
+                 start_date=self.today - timedelta(days=50)),
+        ])
+
+    def test_summarize_matches_nearest_rank_percentile(self):
+        values = [3, 1, 4, 1, 5, 9, 2, 6, 5, 3, 5]
+        summary = cycle_times.summarize(Counter(values), weeks=1)
+        for pct in cycle_times.PERCENTILES:
+            self.assertEqual(summary[f'p{pct}'], benchmarks.percentile(values, pct))
+        self.assertEqual(summary['mean'], round(sum(values) / len(values), 2))
+        self.assertEqual(summary['count'], len(values))
+        self.assertIsNone(cycle_times.summarize(Counter(), weeks=1)['p50'])
+
+    def test_stats_per_stage_and_assignee(self):
+        stats = cycle_times.compute(days=70)
+        stages = {stage['task_name']: stage for stage in stats['stages']}
+
+        self.assertEqual(
+            {key: stages['التسجيل'][key] for key in ('count', 'mean', 'p50', 'p90', 'throughput')},
+            {'count': 5, 'mean': 4.0, 'p50': 3, 'p90': 10, 'throughput': 0.5},
+        )
+        self.assertEqual(stages['المونتاج']['p99'], 7)
+        self.assertEqual(stages['الرفع']['count'], 0)
+        self.assertEqual([row['username'] for row in stats['assignees']], ['alice', 'bob'])
+        self.assertEqual(stats['overall']['count'], 7)
+
+    def test_stats_are_cached_until_a_new_completion(self):
+        cycle_times.cycle_time_stats()
+        with self.assertNumQueries(1):  # رقم آخر حدث اكتمال فقط (الجيل من الكاش)
+            cycle_times.cycle_time_stats()
+
+        task = Task.objects.create(project=self.project, task_name='الرفع', assigned_to=self.bob, status='معلق')
+        Task.objects.filter(pk=task.pk).update(start_date=self.today)
+        transitions.complete_task(task, self.bob)
+
+        stages = {stage['task_name']: stage for stage in cycle_times.cycle_time_stats()['stages']}
+        self.assertEqual(stages['الرفع']['count'], 1)
+
+    def test_writes_without_events_invalidate_the_stats(self):
+        self.assertEqual(cycle_times.cycle_time_stats()['overall']['count'], 7)
+
+        # الاستيراد (loaddata) يحفظ الصفوف خامًا دون أحداث
+        imported = Task(project=self.project, task_name='الرفع', assigned_to=self.bob, status='مكتمل',
+                        start_date=self.today - timedelta(days=1), end_date=self.today)
+        with self.captureOnCommitCallbacks(execute=True):
+            imported.save_base(raw=True)
+        self.assertEqual(cycle_times.cycle_time_stats()['overall']['count'], 8)
+
+        Project.objects.filter(pk=self.project.pk).update(status='مكتمل')
+        with self.captureOnCommitCallbacks(execute=True):
+            archive.archive_batch({self.project.pk: self.today})
+        self.assertEqual(cycle_times.cycle_time_stats()['overall']['count'], 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            archive.restore_projects([self.project.pk])
+        self.assertEqual(cycle_times.cycle_time_stats()['overall']['count'], 8)
+
+    def test_reports_show_bottleneck_stage(self):
+        admin = User.objects.create_superuser('admin', password='password')
+        self.client.force_login(admin)
+        response = self.client.get(reverse('reports'), {'cycle_days': 30})
+        self.assertEqual(response.context['bottleneck']['task_name'], 'التسجيل')
+        self.assertContains(response, 'عنق الزجاجة')
+
+
+class SLATests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('editor', password='password')
+        self.project = Project.objects.create(title='مشروع', created_by=self.user)
+        self.project.tasks.update(assigned_to=self.user)
+        self.today = timezone.localdate()
+
+    def _overdue(self, count):
+        """ بدء أول count مهمة قبل مدة أطول من مدة مراحلها """
+        tasks = list(self.project.tasks.order_by('id')[:count])
+        for task in tasks:
+            start = self.today - timedelta(days=settings.TASK_SLA_DAYS[task.task_name] + 5)
+            Task.objects.filter(pk=task.pk).update(
+                status='قيد التنفيذ', start_date=start, due_date=Task.sla_due_date(task.task_name, start),
+            )
+        return tasks
+
+    def test_starting_a_task_sets_its_due_date(self):
+        first, second = self.project.tasks.order_by('id')[:2]
+        Task.objects.filter(pk=first.pk).update(status='قيد التنفيذ')
+        transitions.complete_task(first, self.user)
+
+        second.refresh_from_db()
+        self.assertEqual(second.due_date, self.today + timedelta(days=settings.TASK_SLA_DAYS[second.task_name]))
+
+        transitions.bulk_set_status(self.project.tasks.all(), 'قيد التنفيذ', self.user)
+        for task in self.project.tasks.all():
+            self.assertEqual(task.due_date, Task.sla_due_date(task.task_name, self.today))
+        transitions.bulk_set_status(self.project.tasks.all(), 'لم يبدأ بعد', self.user)
+        self.assertFalse(self.project.tasks.filter(due_date__isnull=False).exists())
+
+    def test_scan_queues_one_reminder_per_due_date(self):
+        first, second = self._overdue(2)
+        Task.objects.filter(pk=second.pk).update(status='معلق')  # المعلقة لا تُفحص
+
+        self.assertEqual(sla.scan_overdue(), (1, 1))
+        self.assertEqual(sla.scan_overdue(), (1, 0))
+        reminder = TaskReminder.objects.get()
+        self.assertEqual((reminder.task_id, reminder.user_id, reminder.sent_at), (first.pk, self.user.pk, None))
+
+        # استئناف المهمة بموعد جديد ثم تجاوزه: تذكير جديد
+        Task.objects.filter(pk=first.pk).update(due_date=self.today - timedelta(days=1))
+        self.assertEqual(sla.scan_overdue(), (1, 1))
+        self.assertEqual(TaskReminder.objects.count(), 2)
+
+    def test_scan_processes_overdue_tasks_in_chunks(self):
+        self._overdue(5)
+        with CaptureQueriesContext(connection) as queries:
+            call_command('scan_overdue', chunk_size=2, stdout=StringIO())
+        selects = [q for q in queries.captured_queries if q['sql'].startswith('SELECT "projects_task"')]
+        inserts = [
+            q for q in queries.captured_queries if q['sql'].startswith('INSERT') and '"projects_taskreminder"' in q['sql']
+        ]
+        self.assertEqual((len(selects), len(inserts)), (3, 3))  # صفحة لكل دفعة، آخرها أقل من chunk_size
+        self.assertEqual(TaskReminder.objects.count(), 5)
+
+    def test_archiving_removes_reminders(self):
+        self._overdue(1)
+        sla.scan_overdue()
+        Project.objects.filter(pk=self.project.pk).update(status='مكتمل')
+        archive.archive_batch({self.project.pk: self.today})
+        self.assertFalse(TaskReminder.objects.exists())
+
+
+class ListProjectionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_superuser('admin', password='password')
+        UserProfile.objects.create(user=self.user, whatsapp_number='966500000000')
+        self.project = Project.objects.create(
+            title='مشروع', created_by=self.user, description=' '.join(f'كلمة{i}' for i in range(5000)),
+        )
+        self.project.tasks.update(assigned_to=self.user)
+        self.client.force_login(self.user)
+
+    def _sql(self, url):
+        """ استعلام القائمة نفسه (بدون استعلامات المصادقة) """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        [sql] = [q['sql'] for q in queries.captured_queries if ' AS "pk"' in q['sql']]
+        return response, sql
+
+    def test_project_list_fetches_card_columns_only(self):
+        response, sql = self._sql(reverse('project_list'))
+
+        [row] = response.context['projects']
+        self.assertNotIsInstance(row, Project)
+        self.assertEqual(row.creator, 'admin')
+        self.assertLessEqual(len(row.description_preview), DESCRIPTION_PREVIEW_CHARS)
+        self.assertContains(response, 'كلمة14 …')
+        self.assertEqual(sql.count('"projects_project"."description"'), 1)  # داخل SUBSTR فقط
+
+    def test_user_list_joins_profile_without_password(self):
+        response, sql = self._sql(reverse('user_list'))
+
+        [row] = response.context['users']
+        self.assertEqual((row.username, row.whatsapp_number), ('admin', '966500000000'))
+        self.assertContains(response, '966500000000')
+        self.assertNotIn('password', sql)
+
+    def test_task_list_rows_are_grouped_by_project_title(self):
+        response = self.client.get(reverse('task_list'))
+
+        self.assertEqual(list(response.context['grouped_tasks']), ['مشروع'])
+        [tasks] = response.context['grouped_tasks']['مشروع'].values()
+        self.assertEqual(len(tasks), len(Task.TASK_CHOICES))
+        self.assertEqual(tasks[0].project_title, 'مشروع')
+
+
+class StartupTests(SimpleTestCase):
+    def test_parse_importtime_skips_header(self):
+        stderr = (
+            'import time: self [us] | cumulative | imported package\n'
+            'import time:       120 |        450 |   projects.views\n'
+            'تحذير آخر\n'
+        )
+        self.assertEqual(startup.parse_importtime(stderr), {'projects.views': 450})
+
+    def test_cold_start_within_budget(self):
+        stats = startup.measure_cold_start()
+
+        self.assertLess(stats['seconds'], startup.STARTUP_BUDGET['seconds'])
+        self.assertLess(stats['peak_memory_kb'], startup.STARTUP_BUDGET['peak_memory_kb'])
+        self.assertIn('projects.views', stats['imports_us'])
+        for name in startup.LAZY_MODULES:
+            self.assertNotIn(name, stats['modules'])
+
+    def test_profile_imports_command(self):
+        out = StringIO()
+        call_command('profile_imports', '--json', '--top', '3', stdout=out)
+
+        report = json.loads(out.getvalue())
+        self.assertEqual(report['eager_optional'], [])
+        self.assertEqual(len(report['slowest_us']), 3)
+
+
+class WarmupTests(TestCase):
+    def setUp(self):
+        for backend in engines.all():
+            for loader in backend.engine.template_loaders:
+                loader.reset()
+        clear_url_caches()
+        ContentType.objects.clear_cache()
+
+    def test_warm_up_compiles_templates_and_resolves_urls(self):
+        # إغلاق الاتصالات يكسر معاملة الاختبار؛ يُختبر في العملية الرئيسية لـ gunicorn
+        with mock.patch.object(warmup, 'release_connections') as release:
+            stats = warmup.warm_up()
+
+        release.assert_called_once()
+        self.assertEqual(stats['template_errors'], [])
+        self.assertGreater(stats['templates'], 20)
+        [loader] = engines['django'].engine.template_loaders
+        self.assertIn('projects/list.html', loader.get_template_cache)
+        self.assertIn('index', get_resolver().reverse_dict)
+        with self.assertNumQueries(0):
+            ContentType.objects.get_for_model(Project)
+
+    def test_first_request_after_warm_up_reads_no_template_files(self):
+        with mock.patch.object(warmup, 'release_connections'):
+            warmup.warm_up()
+
+        with mock.patch('django.template.loaders.filesystem.Loader.get_contents') as get_contents:
+            response = self.client.get(reverse('login'))
+
+        self.assertEqual(response.status_code, 200)
+        get_contents.assert_not_called()
+
+
+class GunicornConfigTests(SimpleTestCase):
+    def _load(self, **env):
+        with mock.patch.dict(os.environ, env), mock.patch('multiprocessing.cpu_count', return_value=3):
+            import tasks_manager.gunicorn_conf as conf
+            return importlib.reload(conf)
+
+    def test_wsgi_defaults_preload_and_scale_with_cpus(self):
+        conf = self._load()
+
+        self.assertTrue(conf.preload_app)
+        self.assertEqual((conf.worker_class, conf.workers, conf.threads), ('gthread', 4, 4))
+        self.assertEqual(conf.wsgi_app, 'tasks_manager.wsgi:application')
+        self.assertGreater(conf.max_requests_jitter, 0)
+
+    def test_asgi_uses_uvicorn_workers(self):
+        conf = self._load(GUNICORN_ASGI='True', GUNICORN_WORKERS='2')
+
+        self.assertEqual((conf.worker_class, conf.workers, conf.threads), ('uvicorn_worker.UvicornWorker', 2, 1))
+        self.assertEqual(conf.wsgi_app, 'tasks_manager.asgi:application')
+
+    def test_hooks_warm_master_and_connect_workers(self):
+        conf = self._load()
+        server = mock.Mock(**{'cfg.preload_app': True})
+        with mock.patch.object(warmup, 'warm_up', return_value={'template_errors': []}) as warm_up, \
+                mock.patch.object(warmup, 'connect_databases', return_value={'default': {'ok': True}}) as connect:
+            conf.when_ready(server)
+            conf.post_worker_init(server)
+
+        warm_up.assert_called_once_with()  # في العملية الرئيسية فقط مع preload_app
+        connect.assert_called_once_with()
+
+
+class StatusBadgeTests(TestCase):
+    def test_status_badge_uses_precomputed_markup(self):
+        self.assertEqual(status_badge_class('مكتمل'), 'bg-success')
+        self.assertEqual(status_badge_class('لم يبدأ بعد'), 'bg-secondary')
+        self.assertIs(status_badge('معلق'), status_badge('معلق'))
+        self.assertEqual(status_badge('معلق'), '<span class="badge bg-danger">معلق</span>')
+        self.assertEqual(status_badge('<b>'), '<span class="badge bg-secondary">&lt;b&gt;</span>')
+
+    def test_completion_rate_class(self):
+        self.assertEqual(
+            [completion_rate_class(rate) for rate in (100, 80, 79.9, 50, 10, None)],
+            ['bg-success', 'bg-success', 'bg-warning', 'bg-warning', 'bg-danger', 'bg-danger'],
+        )
+
+    def test_pages_render_badges_through_the_library(self):
+        user = User.objects.create_superuser('admin', password='password')
+        project = Project.objects.create(title='مشروع', created_by=user)
+        project.tasks.filter(task_name='اختيار الموضوع').update(status='مكتمل')
+        self.client.force_login(user)
+
+        response = self.client.get(reverse('project_detail', args=[project.pk]))
+
+        self.assertContains(response, '<span class="badge bg-success">مكتمل</span>', html=True)
+        self.assertContains(response, '<span class="badge bg-secondary">لم يبدأ بعد</span>', html=True, count=5)
+
+    def test_templates_use_cached_loader(self):
+        [loader] = engines['django'].engine.template_loaders
+        self.assertEqual(type(loader).__module__, 'django.template.loaders.cached')
+
+    def test_template_benchmarks_report_per_row_cost(self):
+        results = benchmarks.run_template_benchmarks(iterations=2, rows=40)
+
+        self.assertEqual(set(results), {
+            'badges_if_chain', 'badges_filter', 'template_load_uncached', 'template_load_cached',
+        })
+        self.assertEqual(results['badges_filter']['rows'], 40)
+        self.assertIn('saved_per_row_us', results['badges_filter'])
+
+
+class ExportCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('writer', password='password')
+        UserProfile.objects.create(user=self.user, whatsapp_number='966500000000')
+        Project.objects.create(title='مشروع', created_by=self.user)
+
+    def _export(self):
+        """ (البيانات، تسميات النماذج التي سُلسلت في هذا التصدير) """
+        with mock.patch.object(data_export, 'serialize_model', wraps=data_export.serialize_model) as serialize:
+            output = data_export.export_json()
+        return output, {call.args[0]._meta.label_lower for call in serialize.call_args_list}
+
+    def test_output_matches_single_json_dump(self):
+        output, _ = self._export()
+
+        data = json.loads(output)
+        self.assertEqual(output, json.dumps(data, indent=4, ensure_ascii=False))
+        self.assertEqual(data['projects.project'][0]['fields']['title'], 'مشروع')
+        self.assertNotIn('projects.searchentry', data)
+
+    def test_repeat_export_serializes_only_changed_models(self):
+        first, serialized = self._export()
+        self.assertTrue({'auth.user', 'projects.userprofile', 'projects.project'} <= serialized)
+
+        second, serialized = self._export()
+        self.assertEqual(second, first)
+        self.assertFalse(serialized & {label.lower() for label in settings.EXPORT_CACHED_MODELS})
+        self.assertIn('projects.project', serialized)  # غير مخزن: يُسلسل دائمًا
+
+        self.user.profile.whatsapp_number = '966511111111'
+        self.user.profile.save()
+        third, serialized = self._export()
+        self.assertIn('projects.userprofile', serialized)
+        self.assertNotIn('auth.user', serialized)
+        self.assertIn('966511111111', third)
+
+    def test_group_membership_and_deletion_refresh_user_chunk(self):
+        group = Group.objects.create(name='محررون')
+        self._export()
+
+        self.user.groups.add(group)
+        output, serialized = self._export()
+        self.assertIn('auth.user', serialized)
+        [user] = [obj for obj in json.loads(output)['auth.user'] if obj['pk'] == self.user.pk]
+        self.assertEqual(user['fields']['groups'], [group.pk])
+
+        group.delete()
+        output, serialized = self._export()
+        self.assertTrue({'auth.user', 'auth.group'} <= serialized)
+        [user] = [obj for obj in json.loads(output)['auth.user'] if obj['pk'] == self.user.pk]
+        self.assertEqual(user['fields']['groups'], [])
+
+    def test_migrate_bump_only_for_projects_and_existing_table(self):
+        with mock.patch.object(signals.versioning, 'bump') as bump:
+            emit_post_migrate_signal(0, False, 'default')
+            bump.assert_called_once()
+
+            bump.reset_mock()
+            with mock.patch.object(connection.introspection, 'table_names', return_value=['auth_user']):
+                signals.bump_export_after_migrate(sender=apps.get_app_config('projects'))
+            bump.assert_not_called()
+
+
+class ParallelExportTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        call_command('seed_data', users=3, projects=4, seed=4, stdout=StringIO())
+
+    def test_parallel_ranges_assemble_to_serial_output(self):
+        self.assertEqual(data_export.pk_ranges(Session), [None])  # مفتاح نصي: النموذج كاملًا
+        serial = data_export.export_json(use_cache=False)
+
+        with mock.patch.object(data_export, 'PK_RANGE_SIZE', 5):
+            self.assertGreater(len(data_export.pk_ranges(Task)), 1)
+            with mock.patch.object(data_export, 'serialize_range', wraps=data_export.serialize_range) as job:
+                parallel = data_export.export_json(workers=3, use_cache=False)
+
+        self.assertEqual(parallel, serial)
+        self.assertGreater(job.call_count, len(data_export.export_models()))
+
+    def test_workers_read_from_the_caller_database(self):
+        with mock.patch.object(data_export.router, 'db_for_read', return_value='default') as db_for_read, \
+                mock.patch.object(data_export, 'serialize_range', wraps=data_export.serialize_range) as job:
+            data_export.serialize_parallel([Project, Task], workers=2)
+
+        self.assertEqual(db_for_read.call_count, 2)
+        self.assertEqual({call.args[2] for call in job.call_args_list}, {'default'})
+
+    def test_process_workers_fork_after_closing_the_pool(self):
+        pool = mock.Mock()
+        forked = []
+
+        def executor(max_workers, mp_context):
+            forked.append(connection.close_pool.called)  # حالة المجمع لحظة التفرع
+            return ThreadPoolExecutor(max_workers)
+
+        connection.ensure_connection()
+        with mock.patch.object(connection, 'pool', pool, create=True), \
+                mock.patch.object(connection, 'close_pool', create=True) as close_pool, \
+                mock.patch.dict(data_export.EXECUTORS, {'process': executor}):
+            chunks = data_export.serialize_parallel([Project], workers=2, executor='process')
+
+        close_pool.assert_called_once()
+        self.assertEqual(forked, [True])
+        self.assertIn('"projects.project"', chunks[Project])
+
+    def test_export_view_accepts_workers(self):
+        url = reverse('export_all_data') + f'?key={SECRET_KEY}'
+
+        serial = self.client.get(url).content
+        parallel = self.client.get(url + '&workers=3').content
+
+        self.assertEqual(parallel, serial)
+        self.assertEqual(self.client.get(url + '&workers=x').status_code, 200)
+
+    def test_export_benchmarks_report_speedup(self):
+        results = benchmarks.run_export_benchmarks(workers=(2,), executor='thread', iterations=1)
+
+        self.assertEqual(set(results), {'export_thread_1', 'export_thread_2'})
+        self.assertEqual(results['export_thread_1']['speedup'], 1.0)
+        self.assertIn('cpu_count', results['export_thread_2'])
@@ -0,0 +1,248 @@
+"""
+انتقالات حالة المهام (إكمال / تعليق) وما يتبعها من تحديث المشروع.
+
+كل انتقال يُنفذ داخل معاملة واحدة: يُقفل صف المشروع (على Postgres)، ثم تُحدّث
+المهمة بتحديث مشروط على حالتها الحالية، فإذا سبق طلب آخر إلى نفس الانتقال لا
+يتغير شيء بدل بدء المهمة التالية مرتين أو حساب حالة المشروع من بيانات قديمة.
+على SQLite تُعاد محاولة المعاملة عند تعارض الأقفال ("database is locked").
+"""
+import functools
+import random
+import threading
+import time
+from collections import namedtuple
+
+from django.db import OperationalError, transaction
+from django.db.models import Case, Count, IntegerField, OuterRef, Q, Subquery, Value, When
+from django.utils import timezone
+
+from .models import Project, Task
+from . import event_log, events, search, sla, versioning
+
+TransitionResult = namedtuple('TransitionResult', 'task project changed project_completed next_task')
+
+# عدد مرات إعادة المحاولة عند تعارض الأقفال على SQLite
+MAX_LOCK_RETRIES = 10
+
+
+class LockStats:
+    """ عداد إعادة المحاولات وزمن الانتظار بسبب الأقفال (يستخدمه stress_transitions) """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.retries = 0
+            self.wait_seconds = 0.0
+
+    def record(self, seconds):
+        with self._lock:
+            self.retries += 1
+            self.wait_seconds += seconds
+
+
+lock_stats = LockStats()
+
+
+def _with_lock_retry(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        for attempt in range(MAX_LOCK_RETRIES):
+            try:
+                return func(*args, **kwargs)
+            except OperationalError as e:
+                # داخل معاملة خارجية لا يمكن إعادة المحاولة، ونترك الخطأ لمن استدعى
+                if 'locked' not in str(e) or transaction.get_connection().in_atomic_block:
+                    raise
+                if attempt == MAX_LOCK_RETRIES - 1:
+                    raise
+                delay = random.uniform(0, 0.005 * 2 ** attempt)
+                time.sleep(delay)
+                lock_stats.record(delay)
+    return wrapper
+
+
+def _in_stage_order(queryset):
+    """ ترتيب المهام حسب مراحل TASK_CHOICES ثم المعرف """
+    stage = Case(
+        *[When(task_name=name, then=Value(index)) for index, (name, _) in enumerate(Task.TASK_CHOICES)],
+        default=Value(len(Task.TASK_CHOICES)),
+        output_field=IntegerField(),
+    )
+    return queryset.annotate(stage=stage).order_by('stage', 'id')
+
+
+def _next_task(project, task):
+    """ المهمة التالية حسب ترتيب المراحل في TASK_CHOICES (أو أول مهمة لم تبدأ بعد عند آخر مرحلة) """
+    stages = [name for name, _ in Task.TASK_CHOICES]
+    index = stages.index(task.task_name)
+    pending = Task.objects.filter(project=project, status='لم يبدأ بعد')
+    if index + 1 < len(stages):
+        pending = pending.filter(task_name=stages[index + 1])
+    return _in_stage_order(pending.select_related('assigned_to__profile')).first()
+
+
+@_with_lock_retry
+@transaction.atomic
+def complete_task(task, user=None):
+    """ إكمال مهمة (قيد التنفيذ أو معلقة) وبدء المرحلة التالية وتحديث حالة المشروع """
+    project = Project.objects.select_for_update().get(pk=task.project_id)
+    today = timezone.now().date()
+
+    old_status = Task.objects.filter(pk=task.pk).values_list('status', flat=True).first()
+    changed = Task.objects.filter(
+        pk=task.pk, status__in=['قيد التنفيذ', 'معلق']
+    ).update(status='مكتمل', end_date=today)
+    if not changed:
+        return TransitionResult(task, project, False, False, None)
+    task.status, task.end_date = 'مكتمل', today
+    event_log.record(task, old_status, 'مكتمل', user)
+
+    next_task = _next_task(project, task)
+    if next_task and Task.objects.filter(
+        pk=next_task.pk, status='لم يبدأ بعد'
+    ).update(status='قيد التنفيذ', start_date=today, due_date=sla.due_date_case(today)):
+        next_task.status, next_task.start_date = 'قيد التنفيذ', today
+        next_task.due_date = Task.sla_due_date(next_task.task_name, today)
+        event_log.record(next_task, 'لم يبدأ بعد', 'قيد التنفيذ', user)
+    else:
+        next_task = None
+
+    project_completed = not project.tasks.exclude(status='مكتمل').exists()
+    project.status = 'مكتمل' if project_completed else 'قيد التنفيذ'
+    project.save(update_fields=['status'])  # post_save يغير طوابع الإصدار (signals.py)
+
+    events.publish_tasks([t for t in (task, next_task) if t], project)
+    return TransitionResult(task, project, True, project_completed, next_task)
+
+
+@_with_lock_retry
+@transaction.atomic
+def hold_task(task, user=None):
+    """ تعليق مهمة قيد التنفيذ وتعليق المشروع معها """
+    project = Project.objects.select_for_update().get(pk=task.project_id)
+
+    changed = Task.objects.filter(pk=task.pk, status='قيد التنفيذ').update(status='معلق')
+    if not changed:
+        return TransitionResult(task, project, False, False, None)
+    task.status = 'معلق'
+    event_log.record(task, 'قيد التنفيذ', 'معلق', user)
+
+    project.status = 'معلق'
+    project.save(update_fields=['status'])
+
+    events.publish_tasks([task], project)
+    return TransitionResult(task, project, True, False, None)
+
+
+def _project_status(completed, active, held, total):
+    """ حالة المشروع المشتقة من أعداد مهامه """
+    if total and completed == total:
+        return 'مكتمل'
+    if held:
+        return 'معلق'
+    if active or completed:
+        return 'قيد التنفيذ'
+    return 'لم يبدأ بعد'
+
+
+def sync_projects(project_ids, user=None):
+    """
+    إعادة حساب الحالة المشتقة لمجموعة مشاريع مرة واحدة بعد التحديثات الجماعية:
+    بدء المرحلة التالية للمشاريع التي توقفت دون مهمة نشطة، ثم تحديث حالة كل مشروع.
+    عدد الاستعلامات ثابت مهما كان عدد المشاريع (استعلام تجميع وتحديث لكل حالة).
+    """
+    project_ids = set(project_ids)
+    if not project_ids:
+        return {}
+
+    def counts():
+        return {
+            row['project_id']: row
+            for row in Task.objects.filter(project_id__in=project_ids).values('project_id').annotate(
+                total=Count('id'),
+                completed=Count('id', filter=Q(status='مكتمل')),
+                active=Count('id', filter=Q(status='قيد التنفيذ')),
+                held=Count('id', filter=Q(status='معلق')),
+            )
+        }
+
+    stats = counts()
+    # المشاريع التي بدأت ولم يعد فيها مهمة قيد التنفيذ أو معلقة تنتقل لأول مهمة لم تبدأ بعد
+    # حسب ترتيب المراحل (كما في _next_task)
+    stalled = [
+        pk for pk, row in stats.items()
+        if row['completed'] and not row['active'] and not row['held'] and row['completed'] < row['total']
+    ]
+    if stalled:
+        first_pending = _in_stage_order(
+            Task.objects.filter(project_id=OuterRef('project_id'), status='لم يبدأ بعد')
+        ).values('pk')[:1]
+        started = list(
+            Task.objects.filter(project_id__in=stalled, status='لم يبدأ بعد', pk=Subquery(first_pending))
+            .values_list('pk', 'project_id', 'task_name', 'assigned_to_id', 'status')
+        )
+        today = timezone.now().date()
+        if started and Task.objects.filter(pk__in=[row[0] for row in started], status='لم يبدأ بعد').update(
+            status='قيد التنفيذ', start_date=today, due_date=sla.due_date_case(today)
+        ):
+            event_log.record_many(started, 'قيد التنفيذ', user)
+            stats = counts()
+
+    by_status = {}
+    for pk in project_ids:
+        row = stats.get(pk, {'total': 0, 'completed': 0, 'active': 0, 'held': 0})
+        status = _project_status(row['completed'], row['active'], row['held'], row['total'])
+        by_status.setdefault(status, []).append(pk)
+
+    for status, pks in by_status.items():
+        Project.objects.filter(pk__in=pks).exclude(status=status).update(status=status)
+    # update() لا يرسل post_save، فنغير طوابع الإصدار ونبلغ المسؤولين هنا
+    user_ids = versioning.bump_projects(project_ids)
+    events.publish_on_commit(user_ids, 'refresh', {'project_ids': sorted(project_ids)})
+    return by_status
+
+
+@transaction.atomic
+def bulk_set_status(tasks, status, user=None):
+    """
+    تغيير حالة مجموعة مهام بتحديث واحد بدل حفظ كل مهمة على حدة (Task.save)،
+    ثم إعادة حساب حالة المشاريع المتأثرة مرة واحدة لكل مشروع.
+    """
+    tasks = Task.objects.filter(pk__in=tasks.exclude(status=status).values('pk'))
+    # الحالات السابقة لسجل الانتقالات؛ القفل يضمن أنها نفس الصفوف التي يغيرها التحديث
+    rows = list(tasks.select_for_update().values_list('pk', 'project_id', 'task_name', 'assigned_to_id', 'status'))
+    project_ids = {row[1] for row in rows}
+
+    today = timezone.now().date()
+    fields = {'status': status}
+    if status == 'مكتمل':
+        fields['end_date'] = today
+    elif status == 'قيد التنفيذ':
+        fields['start_date'] = today
+        fields['end_date'] = None
+        fields['due_date'] = sla.due_date_case(today)
+    elif status == 'لم يبدأ بعد':
+        fields['start_date'] = fields['end_date'] = fields['due_date'] = None
+
+    updated = tasks.update(**fields)
+    with event_log.batch():  # أحداث التحديث وبدء المراحل التالية في bulk_create واحد
+        event_log.record_many(rows, status, user)
+        sync_projects(project_ids, user)
+    return updated
+
+
+@transaction.atomic
+def bulk_reassign(tasks, assignee):
+    """ إسناد مجموعة مهام لمستخدم آخر بتحديث واحد """
+    rows = list(tasks.values_list('pk', 'project_id', 'assigned_to_id'))
+    task_ids = [pk for pk, _, _ in rows]
+    updated = Task.objects.filter(pk__in=task_ids).update(assigned_to=assignee)
+    search.index_tasks(task_ids)  # اسم المسؤول جزء من نص البحث
+    # المسؤولون السابقون لم يعودوا ضمن مهام المشروع لكن قوائم مهامهم تغيرت
+    project_ids = {project_id for _, project_id, _ in rows}
+    user_ids = versioning.bump_projects(project_ids, {user_id for _, _, user_id in rows})
+    events.publish_on_commit(user_ids, 'refresh', {'project_ids': sorted(project_ids)})
+    return updated
@@ -1,6 +1,6 @@
 from django.contrib.auth import views as auth_views
 from django.urls import path
-from . import views
+from . import api, views
 
 urlpatterns = [
     path('', views.IndexView.as_view(), name='index'),
@@ -19,13 +19,25 @@ urlpatterns = [
     path('projects/create/', views.ProjectFormView.as_view(), name='project_create'),
     path('projects/<int:pk>/update/', views.ProjectFormView.as_view(), name='project_update'),
     path('projects/<int:pk>/delete/', views.ProjectDeleteView.as_view(), name='project_delete'),
+    path('archive/', views.ArchiveListView.as_view(), name='archive_list'),
+    path('archive/<int:pk>', views.ArchiveDetailView.as_view(), name='archive_detail'),
+    path('archive/<int:pk>/restore/', views.ArchiveRestoreView.as_view(), name='archive_restore'),
+    path('reports/', views.ReportView.as_view(), name='reports'),
 
     path('tasks/', views.TaskListView.as_view(), name='task_list'),
+    path('tasks/events/', views.task_events, name='task_events'),
+    path('search/', views.SearchView.as_view(), name='search'),
     path('send_whatsapp/<str:phone_number>/<str:message>/', views.send_whatsapp, name='send_whatsapp'),
 
+    # API (قراءة فقط)
+    path('api/projects/', api.project_list, name='api_project_list'),
+    path('api/tasks/', api.task_list, name='api_task_list'),
+    path('api/my-tasks/', api.my_task_list, name='api_my_task_list'),
+
     path('data-portal/', views.data_portal, name='data_portal'),
     path('export/', views.export_all_data, name='export_all_data'),
     path('import/', views.import_all_data, name='import_all_data'),
+    path('health/', views.health_check, name='health_check'),
 ]
 
 handler403 = 'projects.views.custom_403'
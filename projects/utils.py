@@ -1,7 +1,5 @@
-from twilio.rest import Client
 from django.conf import settings
 import logging
-import webbrowser
 
 # 13FHRLH1T7T5ZNKCNT8JWFPC
 logger = logging.getLogger(__name__)
@@ -14,6 +12,8 @@ def send_whatsapp_message1(recipient_number, message_body):
     :return: معرف الرسالة إذا تم الإرسال بنجاح
     """
     try:
+        from twilio.rest import Client  # تكامل اختياري: يُحمل عند أول إرسال فقط
+
         client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
         
         message = client.messages.create(
@@ -31,11 +31,20 @@ def send_whatsapp_message1(recipient_number, message_body):
     
 from urllib.parse import quote
 
+
+def _open_in_browser(url):
+    import webbrowser  # لا يُحمل عند بدء العامل
+
+    webbrowser.open(url)
+
+
 def send_whatsapp_message(recipient_number, message_body):
     """
     إرسال رسالة واتساب باستخدام Twilio مع توفير رابط يدوي في حالة الفشل.
     """
     try:
+        from twilio.rest import Client  # تكامل اختياري: يُحمل عند أول إرسال فقط
+
         client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
         
         message = client.messages.create(
@@ -48,7 +57,7 @@ def send_whatsapp_message(recipient_number, message_body):
         phone_number = recipient_number.replace("whatsapp:+", "")  # إزالة "whatsapp:+"
         encoded_message = quote(message_body)  # تحويل النص إلى صيغة URL
         whatsapp_url = f"https://wa.me/{phone_number}/?text={encoded_message}"
-        webbrowser.open(whatsapp_url)
+        _open_in_browser(whatsapp_url)
         
         logger.info(f"تم إرسال رسالة واتساب إلى {recipient_number}: {message.sid}")
         return {"status": "sent", "message_id": message.sid, "whatsapp_url": whatsapp_url}
@@ -60,6 +69,6 @@ def send_whatsapp_message(recipient_number, message_body):
         phone_number = recipient_number.replace("whatsapp:+", "")  # إزالة "whatsapp:+"
         encoded_message = quote(message_body)  # تحويل النص إلى صيغة URL
         whatsapp_url = f"https://wa.me/{phone_number}/?text={encoded_message}"
-        webbrowser.open(whatsapp_url)
+        _open_in_browser(whatsapp_url)
 
         return {"status": "failed", "error": str(e), "whatsapp_url": whatsapp_url}
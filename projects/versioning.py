@@ -0,0 +1,139 @@
+"""
+طوابع الإصدار للطلبات الشرطية (ETag / Last-Modified).
+
+كل كتابة تمس مشروعًا أو مهمة تغيّر طابع النطاقات التي تعرضها:
+- projects: قائمة المشاريع
+- project:<id>: صفحة المشروع
+- user:<id>: قائمة مهام المستخدم ورأس الصفحة (الاسم والصلاحيات)
+- export:<app.model>: جزء النموذج في التصدير (data_export.py) للنماذج قليلة التغير
+يُحدّث الطابع داخل معاملة الكتابة نفسها، فلا يرى القارئ إصدارًا جديدًا قبل بياناته.
+الإصدار قيمة عشوائية (وليس عدادًا) ليُكتب بـ upsert واحد دون قراءة القيمة السابقة.
+"""
+import hashlib
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import messages
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from .models import Task, VersionStamp
+
+PROJECTS_SCOPE = 'projects'
+
+
+def project_scope(project_id):
+    return f'project:{project_id}'
+
+
+def user_scope(user_id):
+    return f'user:{user_id}'
+
+
+def export_scope(label):
+    return f'export:{label.lower()}'
+
+
+def bump(scopes):
+    """ تغيير طوابع النطاقات المعطاة باستعلام واحد """
+    scopes = set(scopes)
+    if not scopes:
+        return
+    now = timezone.now()
+    VersionStamp.objects.bulk_create(
+        [VersionStamp(scope=scope, version=uuid.uuid4().hex, updated_at=now) for scope in scopes],
+        update_conflicts=True,
+        unique_fields=['scope'],
+        update_fields=['version', 'updated_at'],
+    )
+
+
+def bump_projects(project_ids, user_ids=()):
+    """
+    بعد تغيير مشاريع أو مهامها: قائمة المشاريع وصفحة كل مشروع وقوائم مهام
+    المسؤولين عن مهامه (تعرض عنوان المشروع وحالة المهام). يرجع معرفات هؤلاء المستخدمين.
+    """
+    project_ids = set(project_ids)
+    user_ids = set(user_ids) - {None}
+    if project_ids:
+        user_ids.update(
+            Task.objects.filter(project_id__in=project_ids, assigned_to__isnull=False)
+            .values_list('assigned_to_id', flat=True).distinct()
+        )
+    bump(
+        [PROJECTS_SCOPE]
+        + [project_scope(pk) for pk in project_ids]
+        + [user_scope(pk) for pk in user_ids]
+    )
+    return user_ids
+
+
+def current_versions(scopes):
+    """ {النطاق: (الإصدار، وقت التغيير)} مع إنشاء طوابع النطاقات التي لم تُكتب بعد """
+    stamps = {
+        scope: (version, updated_at)
+        for scope, version, updated_at in VersionStamp.objects.filter(scope__in=scopes)
+        .values_list('scope', 'version', 'updated_at')
+    }
+    missing = set(scopes) - set(stamps)
+    if missing:
+        # ignore_conflicts: لا نغير طابعًا أنشأته كتابة متزامنة. إن حدث ذلك فلن يطابق
+        # الإصدار المُرجع أي طابع محفوظ، وأسوأ الحالات إعادة الحساب في المرة القادمة
+        now = timezone.now()
+        created = [VersionStamp(scope=scope, version=uuid.uuid4().hex, updated_at=now) for scope in missing]
+        VersionStamp.objects.bulk_create(created, ignore_conflicts=True)
+        stamps.update((stamp.scope, (stamp.version, stamp.updated_at)) for stamp in created)
+    return stamps
+
+
+def get_validators(request, scopes):
+    """
+    (etag, last_modified) للصفحة، أو None إذا كانت هناك رسائل معلقة يجب عرضها مرة واحدة.
+    """
+    if len(messages.get_messages(request)):
+        return None
+
+    stamps = current_versions(scopes)
+
+    # الصفحة تحوي رمز CSRF، فتتغير ETag عند تغير كوكي CSRF (مثلًا بعد تسجيل الدخول)
+    parts = [request.get_full_path(), str(request.user.pk), request.COOKIES.get(settings.CSRF_COOKIE_NAME, '')]
+    parts += [f'{scope}={stamps[scope][0]}' for scope in sorted(stamps)]
+    etag = '"%s"' % hashlib.md5('|'.join(parts).encode(), usedforsecurity=False).hexdigest()
+    last_modified = max(updated_at for _, updated_at in stamps.values())
+    return etag, last_modified
+
+
+def _not_modified(request, validators):
+    etag, last_modified = validators
+    return get_conditional_response(request, etag=etag, last_modified=http_date(last_modified.timestamp()))
+
+
+def _add_validators(response, validators):
+    etag, last_modified = validators
+    response.headers['ETag'] = etag
+    response.headers['Last-Modified'] = http_date(last_modified.timestamp())
+    # المتصفح يحتفظ بالنسخة لكن يتحقق منها في كل زيارة
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def conditional_response(request, scopes, render):
+    """
+    ردّ 304 إذا طابقت نسخة المتصفح طوابع النطاقات، وإلا render() مع ETag و Last-Modified.
+    لا يُنفذ render (استعلامات الصفحة والقالب) عند الرد بـ 304.
+    """
+    validators = get_validators(request, scopes) if request.user.is_authenticated else None
+    if validators is None:
+        return render()
+    return _add_validators(_not_modified(request, validators) or render(), validators)
+
+
+async def aconditional_response(request, scopes, render):
+    """ نسخة conditional_response للواجهات غير المتزامنة (render دالة غير متزامنة) """
+    user = await request.auser()
+    validators = await sync_to_async(get_validators)(request, scopes) if user.is_authenticated else None
+    if validators is None:
+        return await render()
+    return _add_validators(_not_modified(request, validators) or await render(), validators)
@@ -2,26 +2,28 @@ from django.urls import reverse_lazy, reverse
 from django.forms import HiddenInput, inlineformset_factory
 from django.shortcuts import render, redirect, get_object_or_404
 
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth import logout, update_session_auth_hash
 from django.contrib.auth.models import User
 from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
 from django.contrib.auth.forms import PasswordChangeForm
-from django.db.models import Count, Case, When, Value, F, Q, IntegerField, FloatField
+from django.db import transaction
+from django.db.models import Count, Case, When, Value, F, Q, IntegerField, FloatField, OuterRef, Prefetch
 
-from django.views.generic import TemplateView, RedirectView, ListView, FormView, DetailView, DeleteView
+from django.views.generic import TemplateView, RedirectView, ListView, FormView, DetailView, DeleteView, View
 
-from .models import Project, Task, UserProfile
+from .models import ArchivedProject, ArchivedTask, Project, Task, UserProfile, VersionStamp
+from . import archive, cycle_times, data_export, event_log, events, health, rollups, search, transitions, versioning
+from .pagination import EstimatedCountPaginator
 from .forms import (
-    UserForm, ProfileForm , ProjectForm, TaskForm, TaskFilterForm
+    UserForm, ProfileForm , ProjectForm, TaskForm, TaskFilterForm, UploadFileForm
 )
 
-from django.http import JsonResponse, HttpResponseForbidden, HttpResponse
+from django.http import Http404, JsonResponse, HttpResponseForbidden, HttpResponse, StreamingHttpResponse
 from django.shortcuts import render
-from django.core import serializers
 from django.core.serializers import deserialize
 from django.apps import apps
-from .forms import UploadFileForm
 import json
 
 SECRET_KEY = 'SECRET123'  # مفتاح الوصول
@@ -47,19 +49,12 @@ def export_all_data(request):
     if key != SECRET_KEY:
         return HttpResponseForbidden("Access denied")
 
-    all_models = apps.get_models()
-    data = {}
-
-    for model in all_models:
-        model_name = model._meta.model_name
-        app_label = model._meta.app_label
-        full_model_name = f"{app_label}.{model_name}"
-
-        queryset = model.objects.all()
-        serialized = serializers.serialize("json", queryset, ensure_ascii=False)  # لدعم العربية
-        data[full_model_name] = json.loads(serialized)  # نحول السلسلة إلى JSON حقيقي ليسهل تنسيقه لاحقًا
-
-    pretty_data = json.dumps(data, indent=4, ensure_ascii=False)  # تنسيق جميل + دعم العربية
+    # أجزاء النماذج التي لم تتغير من الكاش، والباقي على workers خيطًا (بحد EXPORT_MAX_WORKERS)
+    try:
+        workers = min(max(int(request.GET.get('workers', 1)), 1), settings.EXPORT_MAX_WORKERS)
+    except ValueError:
+        workers = 1
+    pretty_data = data_export.export_json(workers=workers)
 
     response = HttpResponse(pretty_data, content_type='application/json; charset=utf-8')
     response['Content-Disposition'] = 'attachment; filename="backup.json"'
@@ -99,6 +94,19 @@ def import_all_data(request):
                 })
 
 
+def health_check(request):
+    """
+    لموازن الأحمال: 503 إذا تعذر الوصول لأي قاعدة بيانات. التفاصيل (نص الخطأ والزمن وإحصاءات
+    مجمع الاتصالات) مع المفتاح فقط: رسائل أخطاء قاعدة البيانات قد تكشف اسم الخادم والمستخدم.
+    """
+    detailed = request.GET.get('key') == SECRET_KEY
+    databases = health.check_databases(include_pool_stats=detailed)
+    ok = all(result['ok'] for result in databases.values())
+    if not detailed:
+        databases = {alias: {'ok': result['ok']} for alias, result in databases.items()}
+    return JsonResponse({'ok': ok, 'databases': databases}, status=200 if ok else 503)
+
+
 def custom_403(request, exception):
     return render(request, '403.html', {}, status=403)
 
@@ -108,40 +116,58 @@ def custom_404(request, exception):
 def custom_500(request):
     return render(request, '500.html', status=500)
 
+def user_task_stats():
+    """ نسبة المهام المكتملة لكل مستخدم """
+    return User.objects.annotate(
+        total_tasks=Count(Case(When(Q(task__status="قيد التنفيذ") | Q(task__status="مكتمل") | Q(task__status="معلق") | Q(task__status="لم يبدأ بعد"), then=1), output_field=IntegerField())),
+        notstart_tasks=Count(Case(When(task__status="لم يبدأ بعد", then=1), output_field=IntegerField())),
+        inprogress_tasks=Count(Case(When(task__status="قيد التنفيذ", then=1), output_field=IntegerField())),
+        hold_tasks=Count(Case(When(task__status="معلق", then=1), output_field=IntegerField())),
+        completed_tasks=Count(Case(When(task__status="مكتمل", then=1), output_field=IntegerField()))
+    ).annotate(
+        completion_rate=Case(
+            When(total_tasks__gt=0, then=F('completed_tasks') * 100.0 / F('total_tasks')),
+            default=Value(0),
+            output_field=FloatField()
+        )
+    ).order_by('-completion_rate')
+
+
+def dashboard_queries(user):
+    """
+    استعلامات لوحة التحكم المستقلة عن بعضها (اسم في السياق ← دالة تنفذه).
+    IndexView ينفذها بالتتابع، و async_views.index بالتوازي.
+    """
+    queries = {
+        'total_projects': Project.objects.count,
+        'task_counts': lambda: Task.objects.aggregate(
+            total_tasks=Count('id'),
+            completed_tasks=Count('id', filter=Q(status="مكتمل")),
+        ),
+        'total_users': User.objects.count,
+        'projects': lambda: list(Project.objects.all()),
+    }
+    # جدول الإحصاءات يظهر للمدير فقط
+    if user.is_superuser:
+        queries['user_task_stats'] = lambda: list(user_task_stats())
+    return queries
+
+
+def dashboard_context(results):
+    context = dict(results)
+    context.update(context.pop('task_counts'))
+    return context
+
+
 class IndexView(LoginRequiredMixin, TemplateView):
     """عرض الصفحة الرئيسية"""
     template_name = 'index.html'
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        user = self.request.user
-
-        # البيانات العامة
-        context["total_projects"] = Project.objects.count()
-        context["total_tasks"] = Task.objects.count()
-        context["completed_tasks"] = Task.objects.filter(status="مكتمل").count()
-        in_progress_tasks = Task.objects.filter(status="قيد التنفيذ").count()
-        pending_tasks = Task.objects.filter(status="معلق").count()
-        context["total_users"] = User.objects.count()
-
-        # حساب نسبة المهام المكتملة لكل مستخدم
-        context["user_task_stats"] = User.objects.annotate(
-            total_tasks=Count(Case(When(Q(task__status="قيد التنفيذ") | Q(task__status="مكتمل") | Q(task__status="معلق") | Q(task__status="لم يبدأ بعد"), then=1), output_field=IntegerField())),
-            notstart_tasks=Count(Case(When(task__status="لم يبدأ بعد", then=1), output_field=IntegerField())),
-            inprogress_tasks=Count(Case(When(task__status="قيد التنفيذ", then=1), output_field=IntegerField())),
-            hold_tasks=Count(Case(When(task__status="معلق", then=1), output_field=IntegerField())),
-            completed_tasks=Count(Case(When(task__status="مكتمل", then=1), output_field=IntegerField()))
-        ).annotate(
-            completion_rate=Case(
-                When(total_tasks__gt=0, then=F('completed_tasks') * 100.0 / F('total_tasks')),
-                default=Value(0),
-                output_field=FloatField()
-            )
-        ).order_by('-completion_rate')
-
-        context["projects"] = Project.objects.all()
-        context["user"] = user
-
+        results = {name: query() for name, query in dashboard_queries(self.request.user).items()}
+        context.update(dashboard_context(results))
+        context["user"] = self.request.user
         return context
 
 class LogoutView(LoginRequiredMixin, RedirectView):
@@ -249,6 +275,11 @@ class FormViewMixin(FormView):
 # User Views
 class UserListView(PermissionRequiredMixin, ListView):
     model = User
+    # أعمدة الجدول فقط (بدون كلمة المرور وبقية أعمدة User) ورقم الواتساب بـ JOIN في نفس الاستعلام
+    queryset = User.objects.annotate(whatsapp_number=F('profile__whatsapp_number')).values_list(
+        'pk', 'username', 'first_name', 'last_name', 'email', 'whatsapp_number', 'is_active', 'is_superuser',
+        named=True,
+    )
     template_name = 'users/user_list.html'
     context_object_name = 'users'
     permission_required = 'auth.view_user'
@@ -277,18 +308,43 @@ class UserFormView(PermissionRequiredMixin, FormViewMixin):
     permission_required = ['auth.add_user', 'auth.change_user']
 
 
+class ConditionalGetMixin:
+    """
+    ردّ 304 دون تنفيذ استعلامات الصفحة أو عرض القالب إذا لم يتغير أي من نطاقات
+    get_version_scopes منذ آخر زيارة (انظر versioning.py).
+    """
+
+    def get_version_scopes(self):
+        return [versioning.user_scope(self.request.user.pk)]
+
+    def get(self, request, *args, **kwargs):
+        return versioning.conditional_response(
+            request, self.get_version_scopes(), lambda: super(ConditionalGetMixin, self).get(request, *args, **kwargs)
+        )
+
+
 # Project Views
-class ProjectListView(ListView):
+class ProjectListView(ConditionalGetMixin, ListView):
     model = Project
+    queryset = Project.objects.card_rows()
     template_name = 'projects/list.html'
     context_object_name = 'projects'
     # permission_required = 'projects.view_project'
 
-class ProjectDetailView(DetailView):
+    def get_version_scopes(self):
+        return super().get_version_scopes() + [versioning.PROJECTS_SCOPE]
+
+class ProjectDetailView(ConditionalGetMixin, DetailView):
     model = Project
+    queryset = Project.objects.select_related('created_by').with_version().prefetch_related(
+        Prefetch('tasks', queryset=Task.objects.select_related('assigned_to'))
+    )
     template_name = 'projects/detail.html'
     # permission_required = 'projects.view_project'
 
+    def get_version_scopes(self):
+        return super().get_version_scopes() + [versioning.project_scope(self.kwargs['pk'])]
+
 class ProjectDeleteView(PermissionRequiredMixin, DeleteView):
     model = Project
     template_name = 'projects/delete.html'
@@ -309,6 +365,11 @@ class ProjectFormView(PermissionRequiredMixin, FormViewMixin):
     success_url = reverse_lazy('project_update')
     permission_required = ['projects.add_project', 'projects.change_project']
 
+    def post(self, request, *args, **kwargs):
+        # المشروع ومهامه في معاملة واحدة، وأحداث انتقالات المهام تُكتب معًا (event_log.py)
+        with transaction.atomic(), event_log.acting_as(request.user), event_log.batch():
+            return super().post(request, *args, **kwargs)
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         obj = self.get_object()  # معرفة هل المشروع جديد أم تعديل
@@ -351,7 +412,7 @@ class ProjectFormView(PermissionRequiredMixin, FormViewMixin):
                     first_task = tasks.order_by('id').first()
                     if first_task:
                         first_task.status = 'قيد التنفيذ'
-                        first_task.save(update_fields=['status', 'start_date'])
+                        first_task.save(update_fields=['status', 'start_date', 'due_date'])
     
             else:
                 messages.error(self.request, "حدث خطأ أثناء حفظ المهام.")
@@ -361,6 +422,111 @@ class ProjectFormView(PermissionRequiredMixin, FormViewMixin):
         return redirect(reverse('project_update', kwargs={'pk': obj.pk}))
 
 
+# Archive Views (قراءة فقط، انظر archive.py)
+class ArchiveListView(PermissionRequiredMixin, ListView):
+    model = ArchivedProject
+    queryset = ArchivedProject.objects.select_related('created_by')
+    template_name = 'projects/archive_list.html'
+    context_object_name = 'projects'
+    paginate_by = 50
+    paginator_class = EstimatedCountPaginator
+    permission_required = 'projects.view_archivedproject'
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        query = self.request.GET.get('q', '').strip()
+        if query:
+            queryset = queryset.filter(title__startswith=query)  # بالبادئة لاستخدام الفهرس
+        return queryset
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['search_query'] = self.request.GET.get('q', '').strip()
+        return context
+
+class ArchiveDetailView(PermissionRequiredMixin, DetailView):
+    model = ArchivedProject
+    queryset = ArchivedProject.objects.select_related('created_by').prefetch_related(
+        Prefetch('tasks', queryset=ArchivedTask.objects.select_related('assigned_to'))
+    )
+    template_name = 'projects/archive_detail.html'
+    context_object_name = 'project'
+    permission_required = 'projects.view_archivedproject'
+
+class ArchiveRestoreView(PermissionRequiredMixin, View):
+    permission_required = ['projects.add_project', 'projects.delete_archivedproject']
+
+    def post(self, request, pk):
+        if not archive.restore_projects([pk]):
+            raise Http404("No archived project found matching the query")
+        messages.success(request, "تمت استعادة المشروع من الأرشيف.")
+        return redirect('project_detail', pk=pk)
+
+
+# Reports View (من ملخصات DailyStat فقط، انظر rollups.py)
+class ReportView(PermissionRequiredMixin, TemplateView):
+    template_name = 'projects/reports.html'
+    permission_required = 'projects.view_dailystat'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        try:
+            months = min(max(int(self.request.GET.get('months', 12)), 1), 36)
+        except ValueError:
+            months = 12
+        try:
+            cycle_days = min(max(int(self.request.GET.get('cycle_days', 90)), 7), 365)
+        except ValueError:
+            cycle_days = 90
+        user_id = self.request.GET.get('user')
+        user_id = int(user_id) if user_id and user_id.isdigit() else None
+
+        stages = [name for name, _ in Task.TASK_CHOICES]
+        trend = {}
+        for row in rollups.monthly_trend(months, user_id):
+            month = trend.setdefault(row['month'], {
+                'month': row['month'], 'stages': dict.fromkeys(stages, 0), 'started': 0, 'completed': 0, 'held': 0,
+            })
+            month['stages'][row['task_name']] = row['completed']
+            for field in rollups.FIELDS:
+                month[field] += row[field]
+        for month in trend.values():
+            month['stages'] = [month['stages'][name] for name in stages]
+
+        users = rollups.user_totals(months)
+        cycle = cycle_times.cycle_time_stats(cycle_days)
+        context.update({
+            'months': months,
+            'stages': stages,
+            'trend': list(trend.values()),
+            'users': users,
+            'selected_user': next((u for u in users if u['user_id'] == user_id), None),
+            'user_id': user_id,
+            'last_rollup': rollups.last_rollup(),
+            'cycle_days': cycle_days,
+            'cycle_times': cycle,
+            # المرحلة الأبطأ (أعلى p90) هي عنق الزجاجة
+            'bottleneck': max(
+                (stage for stage in cycle['stages'] if stage['p90'] is not None),
+                key=lambda stage: stage['p90'], default=None,
+            ),
+        })
+        return context
+
+# Search View
+class SearchView(LoginRequiredMixin, TemplateView):
+    """البحث في المشاريع والمهام مع ترتيب النتائج حسب الصلة"""
+    template_name = 'search.html'
+    paginate_by = 20
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.request.GET.get('q', '').strip()
+        context["search_query"] = query
+        context["page_obj"] = search.search(query, self.request.GET.get('page'), self.paginate_by)
+        return context
+
+
 # Task Views
 from urllib.parse import quote
 
@@ -391,7 +557,15 @@ def send_whatsapp(request, phone_number, message):
     return render(request, 'tasks/send_whatsapp.html', context)
 
 
-class TaskListView(ListView):
+def group_tasks(tasks):
+    """ 🔹 تقسيم المهام حسب المشروع ثم الحالة """
+    grouped_tasks = {}
+    for task in tasks:
+        grouped_tasks.setdefault(task.project_title, {}).setdefault(task.status, []).append(task)
+    return grouped_tasks
+
+
+class TaskListView(ConditionalGetMixin, ListView):
     model = Task
     template_name = 'tasks/list.html'
     context_object_name = 'tasks'
@@ -400,33 +574,26 @@ class TaskListView(ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["filter_form"] = self.filter_form
-        
-        # 🔹 تقسيم المهام حسب المشروع ثم الحالة
-        grouped_tasks = {}
-        for task in self.get_queryset():
-            project_title = task.project.title
-            status = task.status
-            
-            if project_title not in grouped_tasks:
-                grouped_tasks[project_title] = {}
-
-            if status not in grouped_tasks[project_title]:
-                grouped_tasks[project_title][status] = []
-
-            grouped_tasks[project_title][status].append(task)
-
-        context["grouped_tasks"] = grouped_tasks
+        # نفس قائمة الصفحة (object_list) بدل تنفيذ الاستعلام مرة ثانية
+        context["grouped_tasks"] = group_tasks(self.object_list)
+        context["live_updates"] = events.supports_streaming(self.request)
         return context
     
     def get_queryset(self):
-        queryset = Task.objects.select_related('project').filter(assigned_to=self.request.user)
+        queryset = Task.objects.filter(assigned_to=self.request.user).annotate(
+            project_title=F('project__title'),
+            project_version=VersionStamp.project_version(OuterRef('project_id')),
+        )
 
         self.filter_form = TaskFilterForm(self.request.GET)
         if self.filter_form.is_valid():
             status_filter = self.filter_form.cleaned_data.get("status")
             queryset = queryset.filter(status__in=status_filter) if status_filter else queryset
 
-        return queryset.order_by('-start_date', '-id')
+        # صفوف خفيفة بأعمدة القائمة فقط (group_tasks والقالب)
+        return queryset.order_by('-start_date', '-id').values_list(
+            'pk', 'task_name', 'status', 'start_date', 'end_date', 'project_title', 'project_version', named=True,
+        )
 
     def post(self, request, *args, **kwargs):
         """Handles task status update from buttons"""
@@ -435,68 +602,42 @@ class TaskListView(ListView):
 
         if task_id and action:
             task = get_object_or_404(Task, pk=task_id, assigned_to=request.user)
-            if task:
-                project = task.project
-                if action == "complete" and task.status in ["قيد التنفيذ", "معلق"]:
-                    total_tasks = project.tasks.count()
-                    completed_tasks = project.tasks.filter(status="مكتمل").count() + 1  # Include the current task update                    
-
-                    task.status = "مكتمل"
-                    task.save()
+            if action == "complete" and task.status in ["قيد التنفيذ", "معلق"]:
+                result = transitions.complete_task(task, request.user)
+                if result.changed:
                     messages.success(request, "تم إكمال المهمة!")
-                    if completed_tasks == total_tasks:
-                        project.status = "مكتمل"
-                        project.save()
-                        messages.success(request, f"تم إكمال جميع مهام المشروع {project}!")
-                    else:
-                        project.status = "قيد التنفيذ"
-                        project.save()
-                           
-                elif action == "hold" and task.status == "قيد التنفيذ":
-                    task.status = "معلق"
-                    project.status = "معلق"
-                    task.save()
-                    project.save()
-                    messages.warning(request, f"بعض المهام معلقة، تم تعليق المشروع {project}!")
+                    if result.project_completed:
+                        messages.success(request, f"تم إكمال جميع مهام المشروع {result.project}!")
 
-        return redirect("task_list")
-    def post(self, request, *args, **kwargs):
-        task_id = request.POST.get("task_id")
-        action = request.POST.get("action")
-    
-        if task_id and action:
-            task = get_object_or_404(Task, pk=task_id, assigned_to=request.user)
-            if task:
-                project = task.project
-                if action == "complete" and task.status in ["قيد التنفيذ", "معلق"]:
-                    total_tasks = project.tasks.count()
-                    completed_tasks = project.tasks.filter(status="مكتمل").count() + 1  
-    
-                    task.status = "مكتمل"
-                    task.save()
-                    messages.success(request, "تم إكمال المهمة!")
-    
-                    if completed_tasks == total_tasks:
-                        project.status = "مكتمل"
-                        project.save()
-                        messages.success(request, f"تم إكمال جميع مهام المشروع {project}!")
-                    else:
-                        project.status = "قيد التنفيذ"
-                        project.save()
-                    
                     # 🔹 إرسال إشعار عبر واتساب إذا كانت هناك مهمة جديدة
-                    next_task = project.tasks.filter(status="قيد التنفيذ").order_by('id').first()
-                    if next_task and next_task.assigned_to:
-                        phone_number = next_task.assigned_to.profile.whatsapp_number
-                        message_body = f"لديك مهمة جديدة: {next_task.task_name} في مشروع {next_task.project.title}."
+                    next_task = result.next_task
+                    profile = getattr(next_task.assigned_to, 'profile', None) if next_task else None
+                    if profile and profile.whatsapp_number:
+                        phone_number = profile.whatsapp_number
+                        message_body = f"لديك مهمة جديدة: {next_task.task_name} في مشروع {result.project.title}."
                         return redirect(reverse('send_whatsapp', args=[phone_number, message_body]))
-    
-                elif action == "hold" and task.status == "قيد التنفيذ":
-                    task.status = "معلق"
-                    project.status = "معلق"
-                    task.save()
-                    project.save()
-                    messages.warning(request, f"بعض المهام معلقة، تم تعليق المشروع {project}!")
-    
+
+            elif action == "hold" and task.status == "قيد التنفيذ":
+                result = transitions.hold_task(task, request.user)
+                if result.changed:
+                    messages.warning(request, f"بعض المهام معلقة، تم تعليق المشروع {result.project}!")
+
         return redirect("task_list")
-    
+
+
+async def task_events(request):
+    """
+    بث تغييرات مهام المستخدم الحالي (Server-Sent Events) بدل إعادة تحميل قائمة المهام دوريًا.
+    يجب تشغيله عبر ASGI (tasks_manager/asgi.py) حتى لا يحجز كل اتصال مفتوح خيطًا كاملًا.
+    """
+    user = await request.auser()
+    if not user.is_authenticated:
+        return HttpResponseForbidden()
+    if not events.supports_streaming(request):
+        # عبر WSGI: 204 يوقف إعادة اتصال EventSource بدل حجز خيط عامل لكل صفحة مفتوحة
+        return HttpResponse(status=204)
+
+    response = StreamingHttpResponse(events.stream(user.pk), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # تعطيل التخزين المؤقت في nginx
+    return response
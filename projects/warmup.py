@@ -0,0 +1,129 @@
+"""
+تسخين العملية قبل خدمة أول طلب.
+
+مع preload_app في gunicorn (tasks_manager/gunicorn_conf.py) يُستدعى warm_up() مرة واحدة
+في العملية الرئيسية قبل التفرع، فيرث كل عامل نسخة جاهزة بدل أن يدفع كلفة التحميل في
+طلباته الأولى بعد كل نشر أو إعادة تدوير:
+
+- القوالب: ترجمة كل قوالب .html في محركات القوالب (ومحرك النماذج) إلى كاش المُحمِّل
+  المخزن (cached.Loader) الذي يستخدمه Django افتراضيًا.
+- الروابط: بناء جداول reverse و resolve لملف الروابط الجذر.
+- النماذج: علاقات _meta وكاش ContentType (لوحة الإدارة وفحص الصلاحيات).
+- الترجمة: تحميل كتالوج LANGUAGE_CODE.
+- الخلفيات المحملة عند أول طلب: محرك الجلسات وتخزين الرسائل ومشفرات كلمات المرور
+  وملف manifest للملفات الثابتة.
+
+في النهاية تُغلق اتصالات قاعدة البيانات (والمجمع إن وُجد): الاتصال المفتوح قبل التفرع
+يتشاركه كل العمال عبر نفس المقبس. كل عامل يفتح اتصاله (ومجمعه) بعد التفرع عبر
+connect_databases().
+"""
+import logging
+import os
+import time
+from importlib import import_module
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.hashers import get_hashers
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.db import DatabaseError, connections
+from django.forms.renderers import get_default_renderer
+from django.template import TemplateSyntaxError, engines
+from django.urls import get_resolver
+from django.utils import translation
+from django.utils.module_loading import import_string
+
+from . import health
+
+logger = logging.getLogger(__name__)
+
+
+def _template_names(engine):
+    """ أسماء كل قوالب .html التي تجدها مُحمِّلات المحرك """
+    names = set()
+    for loader in engine.template_loaders:
+        for directory in loader.get_dirs():
+            for root, _, files in os.walk(directory):
+                for filename in files:
+                    if filename.endswith('.html'):
+                        names.add(os.path.relpath(os.path.join(root, filename), directory).replace(os.sep, '/'))
+    return sorted(names)
+
+
+def compile_templates():
+    """ ترجمة القوالب إلى كاش المُحمِّل ← (عدد القوالب، أسماء ما فشل) """
+    backends = [backend for backend in engines.all() if hasattr(backend, 'engine')]
+    renderer = get_default_renderer()
+    if hasattr(renderer, 'engine'):
+        backends.append(renderer.engine)
+    compiled, failed = 0, []
+    for backend in backends:
+        for name in _template_names(backend.engine):
+            try:
+                backend.engine.get_template(name)
+            except TemplateSyntaxError:
+                # أجزاء لا تُترجم وحدها (تعتمد على مكتبات وسوم تحملها القوالب الأم)
+                failed.append(name)
+            else:
+                compiled += 1
+    return compiled, failed
+
+
+def resolve_urls():
+    """ بناء جداول الروابط ← عدد أسماء الروابط """
+    resolver = get_resolver()
+    resolver.url_patterns
+    return len(resolver.reverse_dict)
+
+
+def load_models():
+    """ علاقات النماذج وكاش ContentType ← عدد النماذج """
+    from django.contrib.contenttypes.models import ContentType
+
+    models = apps.get_models()
+    for model in models:
+        model._meta.get_fields()
+    ContentType.objects.get_for_models(*models)
+    return len(models)
+
+
+def load_backends():
+    import_module(settings.SESSION_ENGINE)
+    import_string(settings.MESSAGE_STORAGE)
+    get_hashers()
+    staticfiles_storage.base_url  # يقرأ manifest عند الإنشاء
+
+
+def release_connections():
+    for connection in connections.all(initialized_only=True):
+        connection.close()
+        if getattr(connection, 'pool', None) is not None:
+            connection.close_pool()
+
+
+def connect_databases():
+    """ في العامل بعد التفرع: فتح المجمع (أو التحقق من الاتصال) قبل أول طلب """
+    results = health.check_databases()
+    connections.close_all()  # مع المجمع يعود الاتصال إليه، وبدونه لا يبقى اتصال لخيط غير مستخدم
+    return results
+
+
+def warm_up():
+    """ تسخين العملية الحالية ← {الخطوة: النتيجة} مع الزمن بالمللي ثانية """
+    started = time.perf_counter()
+    stats = {}
+    try:
+        with translation.override(settings.LANGUAGE_CODE):
+            stats['templates'], stats['template_errors'] = compile_templates()
+            stats['urls'] = resolve_urls()
+            load_backends()
+            try:
+                stats['models'] = load_models()
+            except DatabaseError as e:
+                # قاعدة البيانات غير متاحة وقت البدء: العمال يحملون ContentType عند الحاجة
+                logger.warning("تعذر تحميل ContentType أثناء التسخين: %s", e)
+                stats['models'] = None
+    finally:
+        release_connections()
+    stats['ms'] = round((time.perf_counter() - started) * 1000, 1)
+    return stats
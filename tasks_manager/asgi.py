@@ -5,6 +5,12 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
+
+بث تغييرات المهام (projects.views.task_events) يحتاج خادم ASGI، مثلًا:
+    GUNICORN_ASGI=True gunicorn -c python:tasks_manager.gunicorn_conf
+
+عبر ASGI تُخدم لوحة التحكم وقائمة المهام وتفاصيل المشروع بنسخها غير المتزامنة
+(projects/async_views.py) من خلال tasks_manager.asgi_urls.
 """
 
 import os
@@ -12,5 +18,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tasks_manager.settings')
+os.environ.setdefault('ROOT_URLCONF', 'tasks_manager.asgi_urls')
 
 application = get_asgi_application()
@@ -0,0 +1,13 @@
+"""
+روابط خادم ASGI (asgi.py): نفس روابط tasks_manager.urls، مع خدمة صفحات القراءة
+الأكثر طلبًا بنسخها غير المتزامنة (projects.asgi_urls).
+"""
+from django.contrib import admin
+from django.urls import path, include
+from projects.admin import create_superuser_view
+
+urlpatterns = [
+    path('create-superuser/', create_superuser_view, name='create_superuser'),
+    path('admin/', admin.site.urls),
+    path('', include('projects.asgi_urls')),
+]
@@ -0,0 +1,62 @@
+"""
+إعدادات gunicorn للإنتاج:
+    gunicorn -c python:tasks_manager.gunicorn_conf
+
+التطبيق يُحمَّل في العملية الرئيسية (preload_app) ويُسخَّن قبل التفرع (projects/warmup.py):
+القوالب المترجمة وجداول الروابط وكاش ContentType في ذاكرة كل عامل من البداية، فأول طلب
+بعد النشر أو إعادة تدوير عامل بسرعة الطلبات التالية. كل عامل يفتح اتصال قاعدة البيانات
+(أو مجمعه) بعد التفرع.
+
+عدد العمال والخيوط من عدد المعالجات، ويمكن تجاوزه بمتغيرات البيئة GUNICORN_*.
+الافتراضي WSGI بعمال gthread، وفيه يُعطَّل بث تغييرات المهام (events.supports_streaming).
+GUNICORN_ASGI=True يشغل tasks_manager.asgi بعمال uvicorn من حزمة uvicorn-worker (بث
+تغييرات المهام والصفحات غير المتزامنة).
+"""
+import multiprocessing
+import os
+
+CPU_COUNT = multiprocessing.cpu_count()
+ASGI = os.environ.get('GUNICORN_ASGI', 'False') == 'True'
+
+wsgi_app = 'tasks_manager.asgi:application' if ASGI else 'tasks_manager.wsgi:application'
+bind = os.environ.get('GUNICORN_BIND', f"0.0.0.0:{os.environ.get('PORT', '8000')}")
+
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'True') == 'True'
+# الطلبات تنتظر قاعدة البيانات أغلب وقتها: عامل لكل معالج (+1) وعدة خيوط في كل عامل،
+# وحلقة أحداث واحدة لكل عامل مع ASGI
+worker_class = 'uvicorn_worker.UvicornWorker' if ASGI else 'gthread'
+workers = int(os.environ.get('GUNICORN_WORKERS', CPU_COUNT + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 1 if ASGI else 4))
+
+# إعادة تدوير العمال تدريجيًا (jitter) حتى لا يُعاد تشغيلهم جميعًا في نفس اللحظة
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', max_requests // 10))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+
+def when_ready(server):
+    """ في العملية الرئيسية بعد تحميل التطبيق وقبل تشغيل العمال """
+    if not server.cfg.preload_app:
+        return
+    from projects import warmup
+
+    stats = warmup.warm_up()
+    server.log.info("تسخين التطبيق: %s", stats)
+    if stats['template_errors']:
+        server.log.warning("قوالب لم تُترجم: %s", ', '.join(stats['template_errors']))
+
+
+def post_worker_init(worker):
+    """ في كل عامل بعد التفرع وتحميل التطبيق، قبل قبول الطلبات """
+    from projects import warmup
+
+    if not worker.cfg.preload_app:
+        worker.log.info("تسخين التطبيق: %s", warmup.warm_up())
+    for alias, result in warmup.connect_databases().items():
+        if not result['ok']:
+            worker.log.warning("قاعدة البيانات %s غير متاحة: %s", alias, result['error'])
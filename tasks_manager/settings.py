@@ -42,17 +42,18 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'projects.routers.replica_routing_middleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-ROOT_URLCONF = 'tasks_manager.urls'
+# asgi.py يستبدل بعض الصفحات بنسخها غير المتزامنة (tasks_manager/asgi_urls.py)
+ROOT_URLCONF = os.environ.get('ROOT_URLCONF', 'tasks_manager.urls')
 
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
@@ -60,6 +61,14 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            # القوالب تُترجم مرة واحدة لكل عملية (تُسخَّن قبل التفرع في projects/warmup.py)؛
+            # مع DEBUG يُفرغ الكاش تلقائيًا عند تعديل قالب
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
         },
     },
 ]
@@ -70,14 +79,146 @@ WSGI_APPLICATION = 'tasks_manager.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-DATABASES = {
-    'default': dj_database_url.config(
-        default=os.environ.get('DATABASE_URL'),
-        conn_max_age=600,
-        ssl_require=True
+DATABASE_URL = os.environ.get('DATABASE_URL', '')
+
+# مجمع اتصالات PostgreSQL (يتطلب psycopg 3 و psycopg_pool): بدل اتصال دائم لكل عامل،
+# مجمع محدود الحجم يُفحص كل اتصال منه قبل إعطائه للطلب، فلا تظهر الاتصالات المنقطعة
+# بعد تبديل الخادم (failover) كأخطاء. مع SQLite يُتجاهل ويبقى الاتصال الدائم كما هو.
+# إحصاءات الانتظار والتشبع في /health/?key=... (projects/health.py)
+DB_POOL = os.environ.get('DB_POOL', 'False') == 'True'
+DB_POOL_MIN_SIZE = int(os.environ.get('DB_POOL_MIN_SIZE', 2))
+DB_POOL_MAX_SIZE = int(os.environ.get('DB_POOL_MAX_SIZE', 10))
+DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 10))
+
+
+def database_config(url):
+    if not url:
+        return {}
+    sqlite = url.startswith('sqlite')
+    pooled = DB_POOL and not sqlite
+    config = dj_database_url.parse(
+        url,
+        conn_max_age=0 if pooled else 600,  # المجمع يدير عمر الاتصالات بنفسه
+        conn_health_checks=True,  # فحص الاتصال الدائم قبل إعادة استخدامه في طلب جديد
+        # SQLite لا يدعم SSL (قواعد البيانات المحلية للاختبار وقياس الأداء)
+        ssl_require=not sqlite,
     )
+    if pooled:
+        from psycopg_pool import ConnectionPool
+
+        config.setdefault('OPTIONS', {})['pool'] = {
+            'min_size': DB_POOL_MIN_SIZE,
+            'max_size': DB_POOL_MAX_SIZE,
+            'timeout': DB_POOL_TIMEOUT,
+            'check': ConnectionPool.check_connection,
+        }
+    return config
+
+
+DATABASES = {
+    'default': database_config(DATABASE_URL),
 }
 
+# نسخة القراءة (اختيارية): صفحات REPLICA_READ_VIEWS تُقرأ منها، إلا لمدة REPLICA_PIN_SECONDS
+# بعد كتابة المستخدم (projects/routers.py)
+REPLICA_DATABASE_URL = os.environ.get('REPLICA_DATABASE_URL', '')
+REPLICA_DATABASE = 'replica' if REPLICA_DATABASE_URL else None
+if REPLICA_DATABASE:
+    DATABASES[REPLICA_DATABASE] = database_config(REPLICA_DATABASE_URL)
+
+DATABASE_ROUTERS = ['projects.routers.ReplicaRouter']
+REPLICA_READ_VIEWS = [
+    'index', 'project_list', 'project_detail', 'task_list', 'export_all_data', 'reports',
+    'api_project_list', 'api_task_list', 'api_my_task_list',
+]
+REPLICA_PIN_SECONDS = int(os.environ.get('REPLICA_PIN_SECONDS', 10))
+
+# المشاريع المكتملة منذ أكثر من ARCHIVE_AFTER_DAYS يومًا تُنقل للأرشيف (الأمر archive_projects)
+ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS', 180))
+
+# مدة كل مرحلة بالأيام من بدئها حتى موعد استحقاقها (Task.due_date)؛ الأمر scan_overdue
+# يضيف تذكيرًا للمهام قيد التنفيذ التي تجاوزت موعدها (projects/sla.py)
+TASK_SLA_DAYS = {
+    'اختيار الموضوع': 2,
+    'كتابة المحتوى': 5,
+    'التسجيل': 3,
+    'المونتاج': 7,
+    'الثامنايل': 2,
+    'الرفع': 1,
+}
+
+# أجزاء التصدير (export_all_data) المحفوظة في الكاش حتى تتغير بيانات النموذج (projects/data_export.py)؛
+# للنماذج قليلة التغير التي تمر كتاباتها عبر save و delete (الإشارات تغير طابع الإصدار)
+EXPORT_CACHED_MODELS = [
+    'auth.permission',
+    'auth.group',
+    'auth.user',
+    'contenttypes.contenttype',
+    'projects.userprofile',
+]
+EXPORT_CACHE_TIMEOUT = int(os.environ.get('EXPORT_CACHE_TIMEOUT', 60 * 60 * 24))
+# أقصى عدد خيوط للتصدير المتوازي عبر الرابط (?workers=N)؛ كل خيط يأخذ اتصال قاعدة بيانات خاصًا
+EXPORT_MAX_WORKERS = int(os.environ.get('EXPORT_MAX_WORKERS', 4))
+
+# وضع الأداء في لوحة الإدارة: الجداول التي يتجاوز عدد صفوفها ESTIMATED_COUNT_THRESHOLD
+# تُعرض بعدد تقديري بدل COUNT(*)، والبحث بالبادئة على أعمدة مفهرسة
+ADMIN_PERFORMANCE_MODE = os.environ.get('ADMIN_PERFORMANCE_MODE', 'True') == 'True'
+ESTIMATED_COUNT_THRESHOLD = int(os.environ.get('ESTIMATED_COUNT_THRESHOLD', 100000))
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+# كاش أجزاء القوالب (بطاقات المشاريع والمهام): ذاكرة العملية افتراضيًا،
+# أو ملفات مشتركة بين العمليات إذا حُدد FRAGMENT_CACHE_DIR
+FRAGMENT_CACHE_ENABLED = os.environ.get('FRAGMENT_CACHE_ENABLED', 'True') == 'True'
+FRAGMENT_CACHE_DIR = os.environ.get('FRAGMENT_CACHE_DIR', '')
+# الكاش الافتراضي: مشترك بين العمليات عبر CACHE_DIR، وإلا ذاكرة كل عملية
+CACHE_DIR = os.environ.get('CACHE_DIR', '')
+
+CACHES = {
+    'default': {
+        'BACKEND': (
+            'django.core.cache.backends.filebased.FileBasedCache' if CACHE_DIR
+            else 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': CACHE_DIR,
+    },
+    'fragments': {
+        'BACKEND': (
+            'django.core.cache.backends.filebased.FileBasedCache' if FRAGMENT_CACHE_DIR
+            else 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': FRAGMENT_CACHE_DIR or 'fragments',
+        'TIMEOUT': 60 * 60 * 24,
+        'OPTIONS': {'MAX_ENTRIES': 20000},
+    },
+}
+
+# مع كاش مشترك (CACHE_DIR): الجلسات من الكاش مع حفظها في قاعدة البيانات (تبقى صالحة بعد
+# إعادة التشغيل)، والمستخدم وصلاحياته من الكاش (projects/auth_backends.py) لمدة أقصاها
+# AUTH_CACHE_TIMEOUT. مع LocMemCache لكل عامل كاشه، فتسجيل الخروج وإلغاء الصلاحيات لا
+# يُحذفان إلا من كاش العامل الذي نفذهما؛ لذلك تُقرأ الجلسات والمستخدمون من قاعدة البيانات
+SHARED_CACHE = bool(CACHE_DIR)
+if SHARED_CACHE:
+    SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+    AUTHENTICATION_BACKENDS = ['projects.auth_backends.CachedModelBackend']
+else:
+    SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+    AUTHENTICATION_BACKENDS = ['django.contrib.auth.backends.ModelBackend']
+AUTH_CACHE_TIMEOUT = int(os.environ.get('AUTH_CACHE_TIMEOUT', 300))
+
+# بث تغييرات المهام (SSE) عبر ASGI: تعليق keepalive كل TASK_EVENTS_HEARTBEAT_SECONDS،
+# وإغلاق الاتصال بعد TASK_EVENTS_MAX_SECONDS ليعيد المتصفح الاتصال
+TASK_EVENTS_HEARTBEAT_SECONDS = int(os.environ.get('TASK_EVENTS_HEARTBEAT_SECONDS', 15))
+TASK_EVENTS_MAX_SECONDS = int(os.environ.get('TASK_EVENTS_MAX_SECONDS', 600))
+
+# تنفيذ استعلامات لوحة التحكم المستقلة بالتوازي في الصفحات غير المتزامنة (لا فائدة منه مع SQLite).
+# كل استعلام يأخذ اتصالًا ويعيده بعد انتهائه، فهو افتراضي مع المجمع فقط (DB_POOL)؛ بدونه
+# يفتح كل طلب اتصالات جديدة بعدد الاستعلامات
+ASYNC_PARALLEL_QUERIES = os.environ.get(
+    'ASYNC_PARALLEL_QUERIES', str(DB_POOL and not DATABASE_URL.startswith('sqlite'))
+) == 'True'
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 